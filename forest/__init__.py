@@ -23,6 +23,12 @@ forecasts alongside observations.
 
 .. automodule:: forest.geo
 
+.. automodule:: forest.cache
+
+.. automodule:: forest.pyramid
+
+.. automodule:: forest.watch
+
 .. automodule:: forest.presets
 
 .. automodule:: forest.services
@@ -15,6 +15,12 @@ changes.
 .. autoclass:: ProfileLocator
     :members:
 
+Profiles are extracted with netCDF4 rather than iris, coordinates
+of each file are read once and the nearest grid point found by
+binary search. Files rechunked into a
+:class:`forest.point_store.PointStore` are read from the store, a
+profile is then a single chunk read.
+
 Reducer
 ~~~~~~~
 
@@ -45,24 +51,16 @@ from collections import defaultdict
 import bokeh.palettes
 import numpy as np
 import netCDF4
-try:
-    import xarray
-except ModuleNotFoundError:
-    xarray = None
+import forest.disk
+import forest.series
+import forest.point_store
 from forest import geo
 from forest.observe import Observable
 from forest.redux import Action
 from forest.util import initial_time as _initial_time
 from forest.util import to_datetime as _to_datetime
 from forest.screen import SET_POSITION
-try:
-    import iris
-except ModuleNotFoundError:
-    iris = None
-    # ReadTheDocs can't import iris
 
-#Nanoseconds per second
-NS = 1e-9
 
 def select_args(state):
     """Select args needed by :func:`ProfileView.render`
@@ -88,11 +86,6 @@ def select_args(state):
             state["position"]["y"],
             state["tools"]["profile"]) + optional
 
-def _find_nearest(value, array):
-    idx = (np.abs(array - value)).argmin()
-    return array[np.array(idx)]
-
-
 class ProfileView(Observable):
     """Profile view
 
@@ -162,7 +155,9 @@ class ProfileView(Observable):
         for group in groups:
             if group.file_type == "unified_model":
                 pattern = group.full_pattern
-                loaders[group.label] = ProfileLoader.from_pattern(pattern)
+                loaders[group.label] = ProfileLoader.from_pattern(
+                    pattern,
+                    point_store=forest.point_store.from_group(group))
         return cls(figure, loaders)
 
     def render(self, initial_time, variable, x, y, visible, time=None):
@@ -183,13 +178,28 @@ class ProfileView(Observable):
 
 
 class ProfileLoader(object):
-    """Profile loader"""
-    def __init__(self, paths):
+    """Profile loader
+
+    Coordinates of each file are read once with netCDF4 and kept,
+    together with the values at each grid point, in
+    :data:`forest.series.point_cache`. Nearest grid points are
+    found with a binary search
+
+    :param paths: NetCDF files
+    :param point_store: optional :class:`forest.point_store.PointStore`
+    :param cache: optional :class:`forest.cache.ImageCache`, defaults
+                  to :data:`forest.series.point_cache`
+    """
+    def __init__(self, paths, point_store=None, cache=None):
+        if cache is None:
+            cache = forest.series.point_cache
         self.locator = ProfileLocator(paths)
+        self.point_store = point_store
+        self.cache = cache
 
     @classmethod
-    def from_pattern(cls, pattern):
-        return cls(sorted(glob.glob(os.path.expanduser(pattern))))
+    def from_pattern(cls, pattern, **kwargs):
+        return cls(sorted(glob.glob(os.path.expanduser(pattern))), **kwargs)
 
     def profile(self,
             initial_time,
@@ -212,59 +222,125 @@ class ProfileLoader(object):
 
     def profile_file(self, *args, **kwargs):
         """ Read profile data from a file."""
-        return self._load_cube(*args, **kwargs)
-
-    def _load_cube(self, path, variable, lon0, lat0, time=None):
-        """ Load vertical profile slice from file via iris. """
-
-        try:
-            cube = iris.load_cube(path, variable)
-        except iris.exceptions.ConstraintMismatchError as e:
-            print("WARNING: {} No data found for profile plot".format(type(e).__name__))
+        return self._load_netcdf4(*args, **kwargs)
+
+    def _load_netcdf4(self, path, variable, lon0, lat0, time=None):
+        """Vertical profile at grid point nearest to lon0, lat0"""
+        version = forest.series.SeriesLoader._version(path)
+        axes = self.cache.get_or_load(
+            (path, version, variable, "profile"),
+            lambda: self._load_axes(path, variable),
+            path=path)
+        if len(axes) == 0:
+            print("WARNING: No data found for profile plot: {} {}".format(
+                path, variable))
             return {
                 "x": [],
                 "y": []}
-
-        # reference longitude axis by "axis='X'" and latitude axis as axis='Y',
-        # to accommodate various types of coordinate system.
-        # e.g. 'grid_longitude'. See iris.utils.guess_coord_axis.
-        if cube.coord(axis='X').points[-1] > 180.0:
-            # get circular longitude values
-            lon0 = iris.analysis.cartography.wrap_lons(np.asarray(lon0), 0, 360)
-        # Construct constraint
-        lon_nearest = _find_nearest(lon0, cube.coord(axis='X').points)
-        lat_nearest = _find_nearest(lat0, cube.coord(axis='Y').points)
-        coord_values={
-            cube.coord(axis='X').standard_name: (lambda cell: lon_nearest == cell.point),
-            cube.coord(axis='Y').standard_name: (lambda cell: lat_nearest == cell.point),
-            }
-        if time is not None and 'time' in [coord.name() for coord in cube.coords()]:
-            coord_values['time'] = (
-                lambda cell: _to_datetime(time) == cell
-            )
-        constraint = iris.Constraint(coord_values=coord_values)
-
-        # Extract nearest profile
-        cube = cube.extract(constraint)
-        assert cube is not None, ("Error: No profile data found for {}\n\t"
-                                  "at these coordinates: time,lat,lon {},{},{}").format(
-                                  path, _to_datetime(time), lat_nearest, lon_nearest)
-
-        # Get level info and data values
-        if 'pressure' in [coord.name() for coord in cube.coords()]:
-            pressure_coord = cube.coord('pressure')
-            pressures = pressure_coord.points.tolist()
+        if axes["lons"].values.max() > 180.0:
+            lon0 = lon0 % 360  # Circular longitudes
+        i = axes["lons"].nearest(lon0)
+        j = axes["lats"].nearest(lat0)
+        column = None
+        if self.point_store is not None:
+            column = self.point_store.read(path, variable, j, i)
+        if column is None:
+            # Key shared with forest.series.SeriesLoader
+            column = self.cache.get_or_load(
+                (path, version, variable, i, j),
+                lambda: self._load_point(path, variable, j, i),
+                path=path)["values"]
+        return _select_profile(column, axes, time)
+
+    @staticmethod
+    def _load_axes(path, variable):
+        """Searchable coordinates, empty if variable is not supported"""
+        with forest.disk.NETCDF_LOCK, netCDF4.Dataset(path) as dataset:
+            try:
+                var = dataset.variables[variable]
+            except KeyError:
+                return {}
+            axes = _point_axes(dataset, var)
+        if axes is None:
+            return {}
+        axes["lons"] = forest.disk.CoordinateIndex(axes["lons"])
+        axes["lats"] = forest.disk.CoordinateIndex(axes["lats"])
+        return axes
+
+    @staticmethod
+    def _load_point(path, variable, j, i):
+        with forest.disk.NETCDF_LOCK, netCDF4.Dataset(path) as dataset:
+            var = dataset.variables[variable]
+            return {"values": forest.disk.read_point(var, j, i)}
+
+
+def _point_axes(dataset, var):
+    """Coordinates of a variable broadcast to its leading axes
+
+    :returns: dict or None if coordinates are not 1D or scalar
+    """
+    dims = var.dimensions
+    if len(dims) < 2:
+        return None
+    leading = dims[:-2]
+    shape = var.shape[:-2]
+    result = {}
+    for key, name in [("lons", dims[-1]), ("lats", dims[-2])]:
+        if (name not in dataset.variables) or (
+                dataset.variables[name].dimensions != (name,)):
+            return None
+        values = np.ma.asarray(dataset.variables[name][:]).astype("d")
+        result[key] = np.ma.filled(values, np.nan)
+    coords = getattr(var, "coordinates", "")
+    for coord in ("time", "pressure"):
+        name = forest.disk.coord_var(coord, leading, coords)
+        if (name is None) or (name not in dataset.variables):
+            result[coord] = None
+            continue
+        obj = dataset.variables[name]
+        if coord == "time":
+            values = forest.disk.decode_times(obj)
         else:
-            pressures = [0,]
-        if time is None and 'time' in [coord.name() for coord in cube.coords()]:
-            print("Warning: no time specified, selecting first element of array")
-            values = cube.data[0,...]
+            values = np.ravel(obj[:]).astype("d")
+        if obj.dimensions == ():
+            values = np.full(shape, values[0])
+        elif (len(obj.dimensions) == 1) and (obj.dimensions[0] in leading):
+            axis = leading.index(obj.dimensions[0])
+            values = np.broadcast_to(
+                values.reshape([-1 if k == axis else 1
+                                for k in range(len(shape))]),
+                shape)
         else:
-            values = cube.data
+            return None
+        result[coord] = values
+    return result
+
+
+def _select_profile(column, axes, time=None):
+    """Values and pressures of a column at a valid time
 
-        return {
-            "x": values,
-            "y": pressures}
+    If time is None the first valid time is selected
+
+    :param column: values at a point, ``var[..., j, i]``
+    :param axes: dict returned by :func:`_point_axes`
+    """
+    column = np.ma.asarray(column)
+    mask = np.ones(column.shape, dtype=bool)
+    times = axes["time"]
+    if times is not None:
+        if time is None:
+            print("Warning: no time specified, selecting first element of array")
+            mask &= times == times.flat[0]
+        else:
+            mask &= times == np.datetime64(_to_datetime(time), "s")
+    values = np.atleast_1d(column[mask])
+    if axes["pressure"] is None:
+        pressures = np.zeros(len(values))
+    else:
+        pressures = axes["pressure"][mask]
+    return {
+        "x": values,
+        "y": pressures.tolist()}
 
 
 class ProfileLocator(object):
@@ -272,6 +348,7 @@ class ProfileLocator(object):
     def __init__(self, paths):
         self.paths = paths
         self.valid_times_to_paths = defaultdict(list)
+        self._indexed = set()
         self._ini_times_to_paths = None
 
     @property
@@ -288,7 +365,7 @@ class ProfileLocator(object):
         for path in paths:
             initial_time = _initial_time(path)
             try:
-                with netCDF4.Dataset(path) as dataset:
+                with forest.disk.NETCDF_LOCK, netCDF4.Dataset(path) as dataset:
                     if initial_time is None:
                         var = dataset.variables["forecast_reference_time"]
                         initial_time = netCDF4.num2date(var[:], units=var.units)
@@ -311,25 +388,32 @@ class ProfileLocator(object):
             initial_time_paths = self.ini_times_to_paths[self.key(initial_time)]
         if valid_time is None:
             return initial_time_paths
-        elif xarray is None:
-            return []  # Always return list
-        else:
-            # set valid times
-            for path in initial_time_paths:
-                with xarray.open_dataset(path) as xr_ds:
-                    for name in xr_ds.coords:
-                        if getattr(xr_ds.coords[name], "standard_name", None) == 'time':
-                            times = xr_ds.coords[name].values
-                            try:
-                                for time in times:
-                                    time = dt.datetime.utcfromtimestamp(time.astype(int)*NS)
-                                    self.valid_times_to_paths[self.key(time)].append(path)
-                            except TypeError:
-                                time = dt.datetime.utcfromtimestamp(times.astype(int)*NS)
-                                self.valid_times_to_paths[self.key(time)].append(path)
-                            break
-            valid_time_paths = self.valid_times_to_paths[self.key(valid_time)]
-            return list(set(initial_time_paths).intersection(set(valid_time_paths)))
+        self._index_valid_times(initial_time_paths)
+        valid_time_paths = set(self.valid_times_to_paths[self.key(valid_time)])
+        return [path for path in initial_time_paths
+                if path in valid_time_paths]
+
+    def _index_valid_times(self, paths):
+        """Add valid times of files not seen before to valid_times_to_paths"""
+        for path in paths:
+            if path in self._indexed:
+                continue
+            self._indexed.add(path)
+            for time in self._valid_times(path):
+                self.valid_times_to_paths[self.key(time)].append(path)
+
+    @staticmethod
+    def _valid_times(path):
+        """Distinct times of first variable with standard_name time"""
+        try:
+            with forest.disk.NETCDF_LOCK, netCDF4.Dataset(path) as dataset:
+                for var in dataset.variables.values():
+                    if getattr(var, "standard_name", None) == "time":
+                        times = forest.disk.decode_times(var)
+                        return sorted(set(times.astype(dt.datetime)))
+        except OSError:
+            pass
+        return []
 
     def key(self, time):
         return "{:%Y-%m-%d %H:%M:%S}".format(time)
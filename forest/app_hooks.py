@@ -1,29 +1,178 @@
 import sys
 import os
+import hashlib
+import multiprocessing
+from functools import partial
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
 import forest.main
+import forest.cache
 import forest.cli.main
+import forest.cli.pyramid
+import forest.cli.rechunk
+import forest.series
+import forest.util
+import forest.services
+import forest.watch
 import forest.data as data
 
 
-class DatasetSyncCallback:
-    """Process to synchronize datasets"""
-    def __init__(self, datasets):
+class WatchCallback:
+    """Push new and overwritten files to datasets and discard stale caches
+
+    :param watcher: :class:`forest.watch.Watcher`
+    :param sync: False to only discard caches of this process, e.g.
+                 when another worker keeps databases up to date
+    """
+    def __init__(self, watcher, datasets, sync=True):
+        self.watcher = watcher
         self.datasets = datasets
+        self.sync = sync
+        self.watcher.add_subscriber(self.on_new_files)
 
     def __call__(self):
+        self.watcher.poll()
+
+    def on_new_files(self, paths):
+        for path in paths:
+            forest.util.invalidate_caches(path)
+            # Overwritten files must not be served from memory
+            forest.cache.image_cache.invalidate(path)
+            forest.series.point_cache.invalidate(path)
+            for dataset in self.datasets:
+                index = getattr(getattr(dataset, "locator", None),
+                                "index", None)
+                if index is not None:
+                    index.invalidate(path)
+        forest.services.data.invalidate()
+        if not self.sync:
+            return
         for dataset in self.datasets:
             if hasattr(dataset, "sync"):
-                dataset.sync()
+                dataset.sync(paths)
+
+    @staticmethod
+    def directories(datasets):
+        """Directories holding files of any dataset"""
+        result = set()
+        for dataset in datasets:
+            if hasattr(dataset, "sync"):
+                result |= set(dataset.sync.directories())
+            elif isinstance(getattr(dataset, "pattern", None), str):
+                result |= set(forest.watch.directories(dataset.pattern))
+        return sorted(result)
+
+
+class PyramidBuildCallback:
+    """Build image pyramids in a separate process
+
+    HDF5 is not thread-safe, so the build does not share a process
+    with request handlers reading the same files. Calls made while a
+    previous build is still running are ignored
+
+    :param argv: forest command line arguments used to configure datasets
+    """
+    target = staticmethod(forest.cli.pyramid.main)
+
+    def __init__(self, argv):
+        self.argv = argv
+        self.process = None
+
+    def __call__(self):
+        if (self.process is not None) and self.process.is_alive():
+            return
+        context = multiprocessing.get_context("spawn")
+        self.process = context.Process(
+            target=self.target,
+            args=(self.argv,),
+            daemon=True)
+        self.process.start()
+
+
+class PointStoreBuildCallback(PyramidBuildCallback):
+    """Rechunk files for time series and profiles in a separate process"""
+    target = staticmethod(forest.cli.rechunk.main)
+
+
+_HOST_LOCK = None
+
+
+def acquire_host_lock(argv, directory=None):
+    """Elect one process per host to run background jobs
+
+    ``forest --num-procs N`` forks N workers that each call
+    :func:`on_server_loaded`. The first worker to take an exclusive
+    lock on a file named after its arguments holds it until it
+    exits, the others are refused. Servers started with different
+    arguments elect separately
+
+    :param argv: forest command line arguments
+    :param directory: location of lock files, defaults to
+                      :meth:`forest.cache.SharedStore.default_directory`
+    :returns: open lock file or None if another process holds the lock
+    """
+    if fcntl is None:
+        return open(os.devnull)  # No fcntl, every process is elected
+    if directory is None:
+        directory = forest.cache.SharedStore.default_directory()
+    os.makedirs(directory, exist_ok=True)
+    digest = hashlib.sha1(" ".join(argv).encode("utf-8")).hexdigest()
+    path = os.path.join(directory, "background-{}.lock".format(digest))
+    stream = open(path, "w")
+    try:
+        fcntl.flock(stream, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        stream.close()
+        return None
+    return stream
 
 
 def on_server_loaded(server_context):
+    global _HOST_LOCK
     data.on_server_loaded()
 
-    # Add periodic callback to keep database(s) up to date
-    config = forest.main.configure(parse_forest_args())
-    interval_ms = 15 * 60 * 1000  # 15 minutes in miliseconds
-    callback = DatasetSyncCallback(list(config.datasets))
-    server_context.add_periodic_callback(callback, interval_ms)
+    argv = parse_forest_args()
+    config = forest.main.configure(argv)
+    datasets = list(config.datasets)
+
+    # Only one worker per host updates databases and builds stores
+    if _HOST_LOCK is None:
+        _HOST_LOCK = acquire_host_lock(argv)
+    background = _HOST_LOCK is not None
+
+    # Watch directories to keep database(s) and glob caches up to date,
+    # every worker discards caches held in its own memory. Patterns are
+    # expanded again periodically to find new directories, e.g. new runs
+    if any(hasattr(dataset, "sync") or
+           isinstance(getattr(dataset, "pattern", None), str)
+           for dataset in datasets):
+        watcher = forest.watch.Watcher(
+            partial(WatchCallback.directories, datasets),
+            use_inotify=config.use_inotify)
+        callback = WatchCallback(watcher, datasets, sync=background)
+        server_context.add_periodic_callback(callback,
+                                             config.watch_interval_ms)
+
+    if not background:
+        return
+
+    # Pre-compute image pyramids for datasets that use them
+    if any(getattr(dataset, "pyramid", None) is not None
+           for dataset in datasets):
+        interval_ms = 15 * 60 * 1000  # 15 minutes in miliseconds
+        callback = PyramidBuildCallback(argv)
+        callback()
+        server_context.add_periodic_callback(callback, interval_ms)
+
+    # Rechunk files for fast time series and profiles
+    if any(getattr(dataset, "point_store", None) is not None
+           for dataset in datasets):
+        interval_ms = 15 * 60 * 1000
+        callback = PointStoreBuildCallback(argv)
+        callback()
+        server_context.add_periodic_callback(callback, interval_ms)
 
 
 def parse_forest_args(argv=None):
@@ -0,0 +1,450 @@
+"""
+Memory-aware caching
+--------------------
+
+Decoded images are expensive to produce and expensive to keep.
+Caches in this module are bounded by the number of bytes they
+hold rather than the number of entries, so that full resolution
+fields can not exhaust server memory.
+
+The budget of the process-wide cache can be set with the
+``FOREST_IMAGE_CACHE_MB`` environment variable or the ``image_cache``
+section of the configuration file, see
+:attr:`forest.config.Config.image_cache_max_bytes`.
+
+.. autoclass:: ImageCache
+    :members:
+
+.. autoclass:: CacheStats
+    :members:
+
+Sessions served by the same process share caches. When several
+sessions ask for the same value at once, :class:`SingleFlight` makes
+sure it is only computed once, the other callers wait for and share
+the result.
+
+.. autoclass:: SingleFlight
+    :members:
+
+Sharing between processes
+~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Worker processes started with ``forest --num-procs N`` do not share
+memory. A :class:`SharedStore` keeps decoded and regridded images in
+memory-mapped files, by default in ``/dev/shm``, so that a field is
+loaded once per host rather than once per worker. Arrays are mapped
+read-only, the operating system shares their pages between workers.
+
+.. code-block:: python
+
+    image_cache.shared = SharedStore("/dev/shm/forest")
+
+.. autoclass:: SharedStore
+    :members:
+
+"""
+import os
+import mmap
+import pickle
+import hashlib
+import tempfile
+import threading
+import concurrent.futures
+from collections import OrderedDict
+from dataclasses import dataclass
+import numpy as np
+
+
+DEFAULT_MAX_BYTES = int(
+    os.environ.get("FOREST_IMAGE_CACHE_MB", 512)) * 1024 ** 2
+DEFAULT_SHARED_MAX_BYTES = int(
+    os.environ.get("FOREST_SHARED_MEMORY_MB", 2048)) * 1024 ** 2
+
+
+@dataclass
+class CacheStats:
+    """Snapshot of cache performance
+
+    :param hits: number of successful lookups
+    :param misses: number of failed lookups
+    :param evictions: number of entries removed to stay within budget
+    :param nbytes: number of bytes currently held
+    :param entries: number of entries currently held
+    """
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    nbytes: int = 0
+    entries: int = 0
+
+
+def nbytes(value):
+    """Estimate memory held by arrays inside a data structure"""
+    if isinstance(value, np.ma.MaskedArray):
+        return value.data.nbytes + np.ma.getmaskarray(value).nbytes
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sum(nbytes(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(nbytes(v) for v in value)
+    return 0
+
+
+class SingleFlight:
+    """De-duplicate concurrent calls that compute the same value
+
+    .. code-block:: python
+
+        flight = SingleFlight()
+        flight.do(key, lambda: expensive(path))  # One call per key at a time
+
+    Exceptions raised by the first caller are re-raised in callers
+    that waited for it
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._futures = {}
+        self.calls = 0
+        self.shared = 0
+
+    def do(self, key, compute):
+        """Compute value or wait for a call already in flight"""
+        with self._lock:
+            future = self._futures.get(key)
+            if future is not None:
+                self.shared += 1
+                owner = False
+            else:
+                future = concurrent.futures.Future()
+                self._futures[key] = future
+                self.calls += 1
+                owner = True
+        if not owner:
+            return future.result()
+        try:
+            value = compute()
+        except BaseException as error:
+            future.set_exception(error)
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            with self._lock:
+                del self._futures[key]
+
+
+class ImageCache:
+    """Least recently used cache with a byte budget
+
+    Entries are associated with the file they were read from so
+    that they can be discarded when that file changes, see
+    :class:`forest.app_hooks.WatchCallback`
+
+    .. code-block:: python
+
+        cache = ImageCache(max_bytes=100 * 1024 ** 2)
+        cache.put(key, data, path=path)
+        cache.get(key)
+        cache.invalidate(path)
+
+    :param max_bytes: upper limit on memory held by cached values
+    :param shared: optional :class:`SharedStore` consulted by
+                   :meth:`get_or_load` before loading
+    """
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, shared=None):
+        self.max_bytes = max_bytes
+        self.shared = shared
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        self._nbytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._flight = SingleFlight()
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        """Retrieve value, marking it as recently used"""
+        with self._lock:
+            try:
+                value, _, _ = self._entries[key]
+            except KeyError:
+                self._misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def put(self, key, value, path=None):
+        """Store value, evicting least recently used entries if needed
+
+        .. note:: Values larger than the budget are not stored
+        """
+        size = nbytes(value)
+        with self._lock:
+            self._remove(key)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (value, size, path)
+            self._nbytes += size
+            while self._nbytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._evictions += 1
+
+    def get_or_load(self, key, load, path=None):
+        """Cached value or load() once however many threads ask
+
+        :param load: function that returns value on a cache miss
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        def compute():
+            # Another caller may have finished while this one waited
+            with self._lock:
+                if key in self._entries:
+                    return self._entries[key][0]
+            value = None
+            if self.shared is not None:
+                value = self.shared.get(key)
+            if value is None:
+                value = load()
+                if self.shared is not None:
+                    self.shared.put(key, value)
+            self.put(key, value, path=path)
+            return value
+        return self._flight.do(key, compute)
+
+    def resize(self, max_bytes):
+        """Change budget, evicting least recently used entries if needed"""
+        with self._lock:
+            self.max_bytes = max_bytes
+            while self._nbytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._evictions += 1
+
+    def invalidate(self, path):
+        """Discard entries read from a file"""
+        with self._lock:
+            keys = [key for key, (_, _, _path) in self._entries.items()
+                    if _path == path]
+            for key in keys:
+                self._remove(key)
+
+    def clear(self):
+        """Discard all entries"""
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+
+    @property
+    def stats(self):
+        """Current :class:`CacheStats`"""
+        with self._lock:
+            return CacheStats(hits=self._hits,
+                              misses=self._misses,
+                              evictions=self._evictions,
+                              nbytes=self._nbytes,
+                              entries=len(self._entries))
+
+    def _remove(self, key):
+        try:
+            _, size, _ = self._entries.pop(key)
+        except KeyError:
+            return
+        self._nbytes -= size
+
+
+class SharedStore:
+    """Images shared between processes through memory-mapped files
+
+    Keys must have a stable ``repr`` since files are named by its
+    digest. Include file status in keys, entries are never invalidated,
+    only evicted oldest first when the store exceeds its budget
+
+    :param directory: location of files, preferably a tmpfs such as
+                      ``/dev/shm``
+    :param max_bytes: upper limit on bytes held in directory
+    """
+    suffix = ".image"
+
+    def __init__(self, directory=None, max_bytes=DEFAULT_SHARED_MAX_BYTES):
+        if directory is None:
+            directory = self.default_directory()
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def default_directory():
+        """Per-user directory in /dev/shm if available"""
+        if os.path.isdir("/dev/shm"):
+            root = "/dev/shm"
+        else:
+            root = tempfile.gettempdir()
+        return os.path.join(root, "forest-{}".format(os.getuid()))
+
+    def path(self, key):
+        digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, digest + self.suffix)
+
+    def get(self, key, default=None):
+        """Value with read-only arrays mapped from shared memory"""
+        path = self.path(key)
+        try:
+            with open(path, "rb") as stream:
+                buffer = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            self.misses += 1
+            return default
+        try:
+            value = _unpack(buffer)
+        except Exception as error:
+            print("shared store: {}: {}".format(path, error))
+            self.misses += 1
+            return default
+        try:
+            os.utime(path)  # Mark as recently used
+        except OSError:
+            pass
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """Write value atomically, other processes never see partial files"""
+        header, arrays = _pack(value)
+        size = len(header) + sum(array.nbytes for array in arrays)
+        if size > self.max_bytes:
+            return
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as stream:
+                stream.write(header)
+                for array in arrays:
+                    stream.write(array.tobytes())
+            os.replace(tmp, self.path(key))
+        except OSError as error:
+            print("shared store: {}".format(error))
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            return
+        self.evict()
+
+    def evict(self):
+        """Remove least recently used files until within budget"""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(self.suffix):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue  # Removed by another process
+            entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+    def clear(self):
+        """Remove all files"""
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(self.suffix):
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+
+
+class _Array:
+    """Placeholder for an array stored after the header"""
+    def __init__(self, dtype, shape, offset):
+        self.dtype = dtype
+        self.shape = shape
+        self.offset = offset
+
+
+class _Masked:
+    """Placeholder for a masked array stored as data and mask"""
+    def __init__(self, data, mask):
+        self.data = data
+        self.mask = mask
+
+
+def _pack(value):
+    """Header bytes and arrays to write after it"""
+    arrays = []
+    offset = [0]
+
+    def replace(value):
+        if isinstance(value, np.ma.MaskedArray):
+            return _Masked(replace(np.ma.getdata(value)),
+                           replace(np.ma.getmaskarray(value)))
+        if isinstance(value, np.ndarray) and (value.dtype != object):
+            value = np.ascontiguousarray(value)
+            placeholder = _Array(value.dtype.str, value.shape, offset[0])
+            arrays.append(value)
+            offset[0] += value.nbytes
+            return placeholder
+        if isinstance(value, dict):
+            return {k: replace(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [replace(v) for v in value]
+        if isinstance(value, tuple):
+            return tuple(replace(v) for v in value)
+        return value
+
+    structure = pickle.dumps(replace(value))
+    # Align arrays to 64 bytes after fixed-size length prefix
+    start = _align(8 + len(structure))
+    header = (start.to_bytes(8, "little") +
+              structure +
+              bytes(start - 8 - len(structure)))
+    return header, arrays
+
+
+def _unpack(buffer):
+    start = int.from_bytes(buffer[:8], "little")
+    structure = pickle.loads(buffer[8:start])
+
+    def restore(value):
+        if isinstance(value, _Masked):
+            return np.ma.masked_array(restore(value.data),
+                                      mask=restore(value.mask))
+        if isinstance(value, _Array):
+            return np.ndarray(value.shape, dtype=np.dtype(value.dtype),
+                              buffer=buffer, offset=start + value.offset)
+        if isinstance(value, dict):
+            return {k: restore(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [restore(v) for v in value]
+        if isinstance(value, tuple):
+            return tuple(restore(v) for v in value)
+        return value
+
+    return restore(structure)
+
+
+def _align(n, alignment=64):
+    return ((n + alignment - 1) // alignment) * alignment
+
+
+# Process-wide cache shared by image loaders
+image_cache = ImageCache()
@@ -27,6 +27,11 @@ def bokeh_command(app_path, argv):
         opts += ["--port", str(bokeh_args.port)]
     if bokeh_args.allow_websocket_origin:
         opts += ["--allow-websocket-origin", str(bokeh_args.allow_websocket_origin)]
+    if bokeh_args.num_procs is not None:
+        opts += ["--num-procs", str(bokeh_args.num_procs)]
+        # Workers load each field once per host
+        if (bokeh_args.num_procs != 1) and ("--shared-memory" not in forest_opts):
+            forest_opts = forest_opts + ["--shared-memory"]
     if len(forest_opts) > 0:
         opts += ["--args"] + forest_opts
     return opts
@@ -67,3 +72,7 @@ def add_bokeh_arguments(parser):
     parser.add_argument(
         "--allow-websocket-origin", metavar="HOST[:PORT]",
         help="public hostnames that may connect to the websocket")
+    parser.add_argument(
+        "--num-procs", type=int, metavar="N",
+        help=("number of worker processes, 0 for one per core, "
+              "implies --shared-memory if not 1"))
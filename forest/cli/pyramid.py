@@ -0,0 +1,24 @@
+"""
+Build multi-resolution image pyramids for FOREST datasets
+
+Datasets with a ``pyramid_path`` in their configuration are
+scanned and any missing overview levels are written to disk
+"""
+import forest.main
+
+
+def main(argv=None):
+    """Accepts the same arguments as the forest command"""
+    config = forest.main.configure(argv)
+    build_pyramids(config.datasets)
+
+
+def build_pyramids(datasets):
+    """Write pyramids for every dataset that supports them"""
+    for dataset in datasets:
+        if hasattr(dataset, "build_pyramids"):
+            dataset.build_pyramids()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,25 @@
+"""
+Rechunk files of FOREST datasets for time series and profiles
+
+Datasets with a ``point_store_path`` in their configuration are
+scanned and files not already stored, or changed since, are copied
+into a :class:`forest.point_store.PointStore`
+"""
+import forest.main
+
+
+def main(argv=None):
+    """Accepts the same arguments as the forest command"""
+    config = forest.main.configure(argv)
+    build_point_stores(config.datasets)
+
+
+def build_point_stores(datasets):
+    """Write point stores for every dataset that supports them"""
+    for dataset in datasets:
+        if hasattr(dataset, "build_point_stores"):
+            dataset.build_point_stores()
+
+
+if __name__ == '__main__':
+    main()
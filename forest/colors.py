@@ -91,14 +91,14 @@ and either update state or generate new actions
 .. autofunction:: set_invisible_max
 
 """
-import copy
 import bokeh.palettes
 import bokeh.colors
 import bokeh.layouts
 import numpy as np
 import forest.mark
+import forest.encode
 from forest.observe import Observable
-from forest.rx import Stream
+from forest.redux import set_in, merge_in
 from forest.db.util import autolabel
 from dataclasses import dataclass, asdict
 
@@ -302,35 +302,20 @@ def reducer(state, action):
     :returns: new state
     :rtype: dict
     """
-    state = copy.deepcopy(state)
     kind = action["kind"]
     if kind in [SET_PALETTE, SET_INVISIBLE]:
-        state["colorbar"] = state.get("colorbar", {})
-        state["colorbar"].update(action["payload"])
+        state = merge_in(state, ("colorbar",), action["payload"])
     return state
 
 
 def limits_reducer(state, action):
-    state = copy.deepcopy(state)
-
     if action["kind"] == SET_LIMITS_ORIGIN:
-        # Build/traverse tree
-        node = state
-        keys = ("colorbar", "limits")
-        for key in keys:
-            node[key] = node.get(key, {})
-            node = node[key]
-        node.update({"origin": action["payload"]})
+        keys = ("colorbar", "limits", "origin")
+        state = set_in(state, keys, action["payload"])
 
     elif meta_origin(action) in {"user", "column_data_source"}:
-        # Build/traverse tree
-        node = state
         keys = ("colorbar", "limits", meta_origin(action))
-        for key in keys:
-            node[key] = node.get(key, {})
-            node = node[key]
-        node.update(action["payload"])
-        return state
+        state = merge_in(state, keys, action["payload"])
 
     return state
 
@@ -504,10 +489,13 @@ class SourceLimits(Observable):
         for source in sources:
             if len(source.data["image"]) == 0:
                 continue
-            images.append(source.data["image"][0])
+            image = forest.encode.decode_image(source.data, 0)
+            if image.count() == 0:
+                continue
+            images.append(image)
         if len(images) > 0:
-            low = np.min([np.min(x) for x in images])
-            high = np.max([np.max(x) for x in images])
+            low = np.min([x.min() for x in images])
+            high = np.max([x.max() for x in images])
             return low, high
         else:
             return 0, 1
@@ -683,21 +671,18 @@ def connect(view, store):
     safely ignored.
 
     To implement component specific updates this helper method
-    listens to store dispatch events, converts them
-    to a stream of states, maps the states to
-    props and filters out duplicates.
+    subscribes to the store with a selector that maps states
+    to props, views are only rendered when props change.
     """
     view.add_subscriber(store.dispatch)
     one_way_connect(view, store)
 
 
 def one_way_connect(view, store):
-    stream = (Stream()
-                .listen_to(store)
-                .map(state_to_props)
-                .filter(lambda x: x is not None)
-                .distinct())
-    stream.map(lambda props: view.render(props))
+    def render(props):
+        if props is not None:
+            view.render(props)
+    store.subscribe(state_to_props, render)
 
 
 class ColorMapperView:
@@ -1,5 +1,6 @@
 from .time import TimeUI
 from .colorbar import ColorbarUI
 from .headline import Headline
+from .loading import Loading
 from .modal import Modal
 from .tiles import TilePicker
@@ -4,6 +4,7 @@ import bokeh.layouts
 import forest.actions
 from forest import data
 from forest.observe import Observable
+from forest.redux import select_keys
 from forest.state import State
 from forest.mark import component
 
@@ -53,7 +54,7 @@ class View:
         self.renderers["all"].append(renderer)
 
     def connect(self, store):
-        store.add_subscriber(self.render)
+        store.subscribe(select_keys("borders"), self.render)
 
     def render(self, state):
         if isinstance(state, dict):
@@ -86,7 +87,7 @@ class UI(Observable):
 
     def connect(self, store):
         self.add_subscriber(store.dispatch)
-        store.add_subscriber(self.render)
+        store.subscribe(select_keys("borders"), self.render)
 
     def render(self, state):
         if isinstance(state, dict):
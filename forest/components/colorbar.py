@@ -3,6 +3,7 @@ import bokeh.plotting
 import forest.state
 import forest.data
 from forest.colors import colorbar_figure, parse_color_spec
+from forest.redux import select_keys
 
 
 class ColorbarUI:
@@ -18,7 +19,7 @@ class ColorbarUI:
         self.layout = bokeh.layouts.column(*self.figures, name="colorbar")
 
     def connect(self, store):
-        store.add_subscriber(self.render)
+        store.subscribe(select_keys("colorbar", "layers"), self.render)
 
     def render(self, state):
         """Query state for color_mapper settings"""
@@ -2,8 +2,8 @@
 Component to detect page-loaded event
 """
 import forest.actions
-import forest.state
 from forest.observe import Observable
+from forest.redux import set_in
 
 
 class HTMLReady(Observable):
@@ -28,8 +28,6 @@ def reducer(state, action):
         except TypeError:
             # TODO: Remove try/except when Actions are supported
             return state
-    if isinstance(state, dict):
-        state = forest.state.State.from_dict(state)
     if action.kind == forest.actions.HTML_LOADED:
-        state.bokeh.html_loaded = True
-    return state.to_dict()
+        state = set_in(state, ("bokeh", "html_loaded"), True)
+    return state
@@ -0,0 +1,31 @@
+"""Indicate images are loading in the background"""
+import bokeh.io
+import bokeh.models
+import forest.loading
+
+
+class Loading:
+    """Show loading state of a document
+
+    .. note:: Loads only run in the background inside a Bokeh
+              server session, see :mod:`forest.loading`
+    """
+    def __init__(self):
+        self._template = "<b>{}</b>"
+        self.div = bokeh.models.Div(text="", name="loading")
+        self.layout = self.div
+
+    def connect(self, executor=None, document=None):
+        """Listen to loads started by views in a document"""
+        if executor is None:
+            executor = forest.loading.executor
+        if document is None:
+            document = bokeh.io.curdoc()
+        executor.add_listener(document, self.render)
+        return self
+
+    def render(self, pending):
+        if pending > 0:
+            self.div.text = self._template.format("Loading...")
+        else:
+            self.div.text = ""
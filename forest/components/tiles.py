@@ -1,9 +1,8 @@
 """Select web map tiling services to show map"""
-import copy
 import bokeh.models
 import forest.mark
 from forest.observe import Observable
-from forest.redux import Action, State
+from forest.redux import Action, State, set_in
 
 
 # Labels to identify tile servers
@@ -90,15 +89,11 @@ def set_label_visible(value: bool) -> Action:
 
 def reducer(state: State, action: Action) -> State:
     """Reducer to handle web map tiling settings"""
-    state = copy.deepcopy(state)
     kind = action["kind"]
-    if kind in [SET_TILE, SET_LABEL_VISIBLE]:
-        tree = state.get("tile", {})
-        if kind == SET_TILE:
-            tree["name"] = action["payload"]
-        elif kind == SET_LABEL_VISIBLE:
-            tree["labels"] = action["payload"]
-        state["tile"] = tree
+    if kind == SET_TILE:
+        state = set_in(state, ("tile", "name"), action["payload"])
+    elif kind == SET_LABEL_VISIBLE:
+        state = set_in(state, ("tile", "labels"), action["payload"])
     return state
 
 
@@ -1,6 +1,6 @@
 """Time navigation component"""
 import forest.mark
-from forest import rx
+from forest import redux
 from forest.observe import Observable
 from forest.util import to_datetime as _to_datetime
 import forest.db.control
@@ -259,19 +259,25 @@ class TimeUI(Observable):
         for use with render method
         """
         self.add_subscriber(store.dispatch)
-        stream = (rx.Stream()
-                    .listen_to(store)
-                    .map(self.to_props)
-                    .filter(lambda x: x is not None)
-                    .distinct())
-        stream.map(lambda props: self.render(*props))
+        selector = redux.create_selector(redux.select("valid_time"),
+                                         redux.select("valid_times"),
+                                         combiner=self._to_props)
+        store.subscribe(selector, self._render)
         return self
 
+    def _to_props(self, time, times):
+        if (time is None) or (times is None):
+            return
+        return time, sorted(times)
+
+    def _render(self, props):
+        if props is not None:
+            self.render(*props)
+
     def to_props(self, state):
         """Convert state to properties needed by component"""
-        if ('valid_time' not in state) or ('valid_times' not in state):
-            return
-        return state['valid_time'], sorted(state['valid_times'])
+        return self._to_props(state.get('valid_time'),
+                              state.get('valid_times'))
 
     def render(self, time, times):
         """React to state changes"""
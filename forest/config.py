@@ -166,6 +166,98 @@ class Config(object):
         lat_range = viewport.get('lat_range', (-80, 80))
         return Viewport(lon_range, lat_range)
 
+    @property
+    def watch_interval_ms(self):
+        """Time between checks for new files, default 5 seconds
+
+        .. code-block:: yaml
+
+            watch:
+              interval_ms: 5000
+              inotify: false  # Always poll, e.g. for S3 mounts
+        """
+        return self.data.get("watch", {}).get("interval_ms", 5000)
+
+    @property
+    def use_inotify(self):
+        """Use inotify if available, see :attr:`watch_interval_ms`"""
+        return self.data.get("watch", {}).get("inotify", None)
+
+    @property
+    def image_cache_max_bytes(self):
+        """Memory budget of the process-wide image cache
+
+        .. code-block:: yaml
+
+            image_cache:
+              max_mb: 2048
+
+        :returns: number of bytes or None to use the default
+        """
+        max_mb = self.data.get("image_cache", {}).get("max_mb", None)
+        if max_mb is None:
+            return None
+        return int(max_mb) * 1024 ** 2
+
+    @property
+    def loader_workers(self):
+        """Threads used to load images off the Bokeh event loop
+
+        .. code-block:: yaml
+
+            loader:
+              workers: 8
+
+        Set workers to 0 to load images synchronously
+
+        :returns: number of threads or None to use the default
+        """
+        workers = self.data.get("loader", {}).get("workers", None)
+        if workers is None:
+            return None
+        return int(workers)
+
+    @property
+    def prefetch(self):
+        """Budget of speculative loads around the current image
+
+        .. code-block:: yaml
+
+            prefetch:
+              valid_times: 2
+              pressures: 1
+              workers: 1
+
+        Set workers to 0 to disable prefetch, see :mod:`forest.prefetch`
+
+        :returns: dict of settings given in the file
+        """
+        settings = self.data.get("prefetch", {})
+        result = {}
+        for key, name in [("valid_times", "valid_times"),
+                          ("pressures", "pressures"),
+                          ("workers", "max_workers")]:
+            if key in settings:
+                result[name] = int(settings[key])
+        return result
+
+    @property
+    def image_transport(self):
+        """Format used to send images to the browser
+
+        One of ``float64``, ``float32``, ``uint16`` or ``uint8``, see
+        :mod:`forest.encode`. Images are sent as ``float64`` unless
+        another format is chosen. Smaller formats halve or quarter
+        the size of each frame, quantised formats lose precision
+
+        .. code-block:: yaml
+
+            image_transport: uint16
+
+        :returns: transport name or None to send ``float64``
+        """
+        return self.data.get("image_transport", None)
+
     @property
     def presets_file(self):
         """Colorbar presets JSON file
@@ -256,7 +348,12 @@ class Config(object):
                 "pattern": group.pattern,
                 "locator": group.locator,
                 "database_path": group.database_path,
-                "directory": group.directory
+                "directory": group.directory,
+                "index_path": group.index_path,
+                "read_mode": group.read_mode,
+                "pyramid_path": group.pyramid_path,
+                "point_store_path": group.point_store_path,
+                "sync_jobs": group.sync_jobs
             }
             yield forest.drivers.get_dataset(group.file_type, settings)
 
@@ -277,6 +374,11 @@ class FileGroup(object):
     :param locator: keyword describing search method (default: 'file_system')
     :param file_type: keyword describing file contents (default: 'unified_model')
     :param directory: leaf/absolute directory where file(s) are stored (default: None)
+    :param index_path: sqlite3 file to persist coordinate meta-data (default: None)
+    :param read_mode: either 'full' or 'window' to read visible region only (default: 'full')
+    :param pyramid_path: directory of pre-computed image pyramids (default: None)
+    :param point_store_path: directory of files rechunked for time series and profiles (default: None)
+    :param sync_jobs: processes used to add new files to database (default: None)
     """
     def __init__(self,
             label,
@@ -284,13 +386,23 @@ class FileGroup(object):
             locator="file_system",
             file_type="unified_model",
             directory=None,
-            database_path=None):
+            database_path=None,
+            index_path=None,
+            read_mode="full",
+            pyramid_path=None,
+            point_store_path=None,
+            sync_jobs=None):
         self.label = label
         self.pattern = pattern
         self.locator = locator
         self.file_type = file_type
         self.directory = directory
         self.database_path = database_path
+        self.index_path = index_path
+        self.read_mode = read_mode
+        self.pyramid_path = pyramid_path
+        self.point_store_path = point_store_path
+        self.sync_jobs = sync_jobs
 
     @property
     def full_pattern(self):
@@ -316,7 +428,12 @@ class FileGroup(object):
             "locator",
             "file_type",
             "directory",
-            "database_path"]
+            "database_path",
+            "index_path",
+            "read_mode",
+            "pyramid_path",
+            "point_store_path",
+            "sync_jobs"]
         kwargs = [
             "{}={}".format(attr, self._str(getattr(self, attr)))
                 for attr in kwarg_attrs]
@@ -20,3 +20,15 @@ class Connection(object):
     def close(self):
         self.connection.commit()
         self.connection.close()
+
+    def query_plan(self, query, parameters=None):
+        """Steps SQLite will take to execute a query
+
+        Useful to check that a query is served by an index,
+        e.g. ``"SEARCH t USING COVERING INDEX time_value (value=?)"``
+
+        :returns: list of EXPLAIN QUERY PLAN detail strings
+        """
+        cursor = self.connection.cursor()
+        cursor.execute("EXPLAIN QUERY PLAN " + query, parameters or {})
+        return [row[-1] for row in cursor.fetchall()]
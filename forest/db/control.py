@@ -1,5 +1,4 @@
 """Control navigation of FOREST data"""
-import copy
 import datetime as dt
 import numpy as np
 import pandas as pd
@@ -8,6 +7,7 @@ import bokeh.layouts
 from collections import namedtuple
 from forest import data
 from forest.observe import Observable
+from forest.redux import set_in, batch
 from forest.util import to_datetime as _to_datetime
 from forest.export import export
 from forest.mark import component
@@ -95,11 +95,12 @@ State = namedtuple("State", (
     "valid_times",
     "pressure",
     "pressures",
-    "valid_format"))
+    "valid_format",
+    "viewport"))
 State.__new__.__defaults__ = (None,) * len(State._fields)
 
 def statehash(self):
-    return hash((self.pattern, str(self.patterns), self.variable, self.initial_time, str(self.initial_times), self.valid_time, str(self.valid_times), self.pressure, str(self.pressures), self.valid_format))
+    return hash((self.pattern, str(self.patterns), self.variable, self.initial_time, str(self.initial_times), self.valid_time, str(self.valid_times), self.pressure, str(self.pressures), self.valid_format, str(self.viewport)))
 
 def time_equal(a, b):
     if (a is None) and (b is None):
@@ -112,8 +113,8 @@ def time_equal(a, b):
 _vto_datetime = np.vectorize(_to_datetime)
 
 def time_array_equal(x, y):
-    if (x is None) and (y is None):
-        return True
+    if x is y:
+        return True  # Shared by unchanged states
     elif (x is None) or (y is None):
         return False
     elif (len(x) == 0) or (len(y) == 0):
@@ -134,7 +135,7 @@ def _as_datetime_array(x):
         return pd.to_datetime(x)
 
 def equal_value(a, b):
-    if (a is None) and (b is None):
+    if a is b:
         return True
     elif (a is None) or (b is None):
         return False
@@ -156,7 +157,8 @@ def state_eq(self, other):
             time_array_equal(self.valid_times, other.valid_times) and
             equal_value(self.pressure, other.pressure) and
             np.shape(self.pressures) == np.shape(other.pressures) and
-            equal_value(self.pressures, other.pressures)
+            equal_value(self.pressures, other.pressures) and
+            (self.viewport == other.viewport)
     )
 
 State.__hash__ = statehash
@@ -198,12 +200,11 @@ def initial_state(navigator, pattern=None):
 
 @export
 def reducer(state, action):
-    state = copy.deepcopy(state)
     kind = action["kind"]
     if kind == SET_VALUE:
         payload = action["payload"]
         key, value = payload["key"], payload["value"]
-        state[key] = value
+        state = set_in(state, (key,), value)
     return state
 
 
@@ -314,6 +315,7 @@ class Navigator(object):
 
 
 @export
+@batch
 class Controls(object):
     def __init__(self, navigator):
         self.navigator = navigator
@@ -3,6 +3,7 @@ try:
 except ImportError:
     # ReadTheDocs can't install iris
     pass
+import sqlite3
 import netCDF4
 import jinja2
 import numpy as np
@@ -17,6 +18,35 @@ __all__ = [
 ]
 
 
+# Covering indexes used by Database and Locator queries
+INDEXES = [
+    """
+    CREATE INDEX IF NOT EXISTS file_reference
+        ON file (reference, name)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS variable_file
+        ON variable (file_id, name, time_axis, pressure_axis)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS time_value
+        ON time (value, i)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS pressure_value
+        ON pressure (value, i)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS time_to_variable
+        ON variable_to_time (time_id, variable_id)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS pressure_to_variable
+        ON variable_to_pressure (pressure_id, variable_id)
+    """
+]
+
+
 class CoordinateDB(Connection):
     def __init__(self, connection):
         self.connection = connection
@@ -172,10 +202,19 @@ class CoordinateDB(Connection):
 
 
 class Database(Connection):
-    """Stores index and paths of forecast diagnostics"""
+    """Stores index and paths of forecast diagnostics
+
+    Row ids of files, variables and coordinate values are cached
+    so that bulk inserts can be made with pre-resolved ids
+    """
+    # Maximum number of host parameters in a single SQLite statement
+    max_parameters = 999
+
     def __init__(self, connection):
         self.connection = connection
         self.cursor = self.connection.cursor()
+        self._variable_ids = {}
+        self._coordinate_ids = {"time": {}, "pressure": {}}
         self.cursor.execute("""
             CREATE TABLE IF NOT EXISTS file (
                     id INTEGER PRIMARY KEY,
@@ -224,9 +263,28 @@ class Database(Connection):
                     FOREIGN KEY(variable_id) REFERENCES variable(id),
                     FOREIGN KEY(time_id) REFERENCES time(id))
         """)
+        self.migrate()
+
+    def migrate(self):
+        """Add indexes and enable write-ahead logging
+
+        Safe to call on existing databases, statements that need
+        write access are skipped for read-only files
+        """
+        try:
+            self.cursor.execute("PRAGMA journal_mode=WAL")
+            for statement in INDEXES:
+                self.cursor.execute(statement)
+            self.connection.commit()
+        except sqlite3.OperationalError:
+            pass
 
     def insert_netcdf(self, path):
-        """Coordinate and meta-data information taken from NetCDF file"""
+        """Coordinate and meta-data information taken from NetCDF file
+
+        .. note:: All rows related to a file are written in a single
+                  transaction, a failure leaves the database unchanged
+        """
         with netCDF4.Dataset(path) as dataset:
             try:
                 obj = dataset.variables["forecast_reference_time"]
@@ -234,9 +292,39 @@ class Database(Connection):
             except KeyError:
                 reference_time = None
 
-        self.insert_file_name(path, reference_time=reference_time)
-
         cubes = iris.load(path)
+        try:
+            self._insert_cubes(path, reference_time, cubes)
+        except:
+            self.rollback()
+            raise
+        self.connection.commit()
+
+    def rollback(self):
+        """Discard uncommitted rows and the ids cached for them"""
+        self.connection.rollback()
+        self._variable_ids.clear()
+        self._coordinate_ids = {"time": {}, "pressure": {}}
+
+    def insert_record(self, record):
+        """Insert meta-data extracted by :func:`forest.db.ingest.extract`
+
+        .. note:: Caller is responsible for committing
+        """
+        self.insert_file_name(record.path,
+                              reference_time=record.reference_time)
+        for variable in record.variables:
+            self.insert_variable(
+                record.path,
+                variable.name,
+                time_axis=variable.time_axis,
+                pressure_axis=variable.pressure_axis)
+            self.insert_times(record.path, variable.name, variable.times)
+            self.insert_pressures(record.path, variable.name,
+                                  variable.pressures)
+
+    def _insert_cubes(self, path, reference_time, cubes):
+        self.insert_file_name(path, reference_time=reference_time)
         for cube in cubes:
             variable = cube.var_name
             time_axis = self._axis(cube, 'time')
@@ -357,8 +445,7 @@ class Database(Connection):
 
     def insert_pressures(self, path, variable, values):
         """Helper method to insert a coordinate related to a variable"""
-        for i, value in enumerate(values):
-            self.insert_pressure(path, variable, value, i)
+        self._insert_coordinate("pressure", path, variable, list(values))
 
     def insert_pressure(self, path, variable, pressure, i):
         self.insert_variable(path, variable)
@@ -475,8 +562,57 @@ class Database(Connection):
 
     def insert_times(self, path, variable, times):
         """Helper method to insert a time coordinate related to a variable"""
-        for i, time in enumerate(times):
-            self.insert_time(path, variable, time, i)
+        self._insert_coordinate("time", path, variable,
+                                [str(time) for time in times])
+
+    def _insert_coordinate(self, table, path, variable, values):
+        """Insert coordinate values and junction rows with executemany
+
+        Equivalent to calling insert_time/insert_pressure for each
+        value but with ids resolved once rather than per row
+        """
+        if len(values) == 0:
+            return
+        variable_id = self._variable_id(path, variable)
+        ids = self._coordinate_ids[table]
+        keys = list(enumerate(values))
+        missing = [key for key in keys if key not in ids]
+        if len(missing) > 0:
+            self.cursor.executemany("""
+                INSERT OR IGNORE INTO {table} (i, value) VALUES (?, ?)
+            """.format(table=table), missing)
+            for chunk in self._chunks(sorted(set(values)),
+                                      self.max_parameters):
+                self.cursor.execute("""
+                    SELECT id, i, value FROM {table}
+                     WHERE value IN ({params})
+                """.format(
+                    table=table,
+                    params=", ".join("?" * len(chunk))), chunk)
+                for row_id, i, value in self.cursor.fetchall():
+                    ids[(i, value)] = row_id
+        self.cursor.executemany("""
+            INSERT OR IGNORE INTO variable_to_{table} (variable_id, {table}_id)
+            VALUES (?, ?)
+        """.format(table=table), [(variable_id, ids[key]) for key in keys])
+
+    def _variable_id(self, path, variable):
+        """Cached variable.id, inserting variable if needed"""
+        key = (path, variable)
+        if key not in self._variable_ids:
+            self.insert_variable(path, variable)
+            self.cursor.execute("""
+                SELECT variable.id FROM variable
+                  JOIN file ON variable.file_id = file.id
+                 WHERE file.name = :path AND variable.name = :variable
+            """, dict(path=path, variable=variable))
+            self._variable_ids[key], = self.cursor.fetchone()
+        return self._variable_ids[key]
+
+    @staticmethod
+    def _chunks(items, size):
+        for i in range(0, len(items), size):
+            yield items[i:i + size]
 
     def insert_time(self, path, variable, time, i):
         time = str(time)
@@ -0,0 +1,194 @@
+"""
+Parallel ingest of NetCDF meta-data
+
+Meta-data is extracted with netCDF4 in a pool of worker
+processes and written to the database by a single writer
+in batches, one commit per batch
+"""
+import time
+import multiprocessing
+import concurrent.futures
+from dataclasses import dataclass, field
+from typing import List
+import netCDF4
+import numpy as np
+
+
+__all__ = [
+    "FileRecord",
+    "VariableRecord",
+    "extract",
+    "ingest"
+]
+
+
+@dataclass
+class VariableRecord:
+    """Rows needed to describe a variable"""
+    name: str
+    time_axis: int = None
+    pressure_axis: int = None
+    times: list = field(default_factory=list)
+    pressures: list = field(default_factory=list)
+
+
+@dataclass
+class FileRecord:
+    """Result of extracting meta-data from a single file
+
+    :param error: exception raised while reading file, if any
+    :param seconds: time taken to extract meta-data
+    """
+    path: str
+    reference_time: str = None
+    variables: List[VariableRecord] = field(default_factory=list)
+    error: Exception = None
+    seconds: float = 0.
+
+
+def extract(path):
+    """Read meta-data equivalent to Database.insert_netcdf
+
+    Only netCDF4 is used, iris is too slow to use on large archives
+
+    :returns: :class:`FileRecord`, exceptions are stored rather than
+              raised so that one bad file does not stop an ingest
+    """
+    start = time.perf_counter()
+    try:
+        record = _extract(path)
+    except Exception as error:
+        record = FileRecord(path, error=error)
+    record.seconds = time.perf_counter() - start
+    return record
+
+
+def _extract(path):
+    with netCDF4.Dataset(path) as dataset:
+        try:
+            obj = dataset.variables["forecast_reference_time"]
+            reference_time = str(netCDF4.num2date(obj[:], units=obj.units))
+        except KeyError:
+            reference_time = None
+        record = FileRecord(path, reference_time=reference_time)
+
+        # Variables iris treats as coordinates, bounds or grid mappings
+        auxiliary = set(dataset.dimensions)
+        for var in dataset.variables.values():
+            for attr in ["coordinates", "bounds", "grid_mapping"]:
+                auxiliary |= set(getattr(var, attr, "").split())
+
+        for name, var in dataset.variables.items():
+            if name in auxiliary:
+                continue
+            variable = VariableRecord(name)
+            coords = list(var.dimensions) + getattr(
+                var, "coordinates", "").split()
+            for coord in coords:
+                if coord not in dataset.variables:
+                    continue
+                obj = dataset.variables[coord]
+                if _is_coord(obj, "time"):
+                    variable.time_axis = _axis(var, obj)
+                    variable.times = _times(obj)
+                elif _is_coord(obj, "pressure"):
+                    variable.pressure_axis = _axis(var, obj)
+                    variable.pressures = [
+                        float(p) for p in np.ravel(obj[:])]
+            record.variables.append(variable)
+    return record
+
+
+def _is_coord(obj, name):
+    """Match name against var_name, standard_name or long_name"""
+    return name in [obj.name,
+                    getattr(obj, "standard_name", None),
+                    getattr(obj, "long_name", None)]
+
+
+def _axis(var, obj):
+    if len(obj.dimensions) == 0:
+        return None
+    return var.dimensions.index(obj.dimensions[0])
+
+
+def _times(obj):
+    values = netCDF4.num2date(np.ravel(obj[:]),
+                              units=obj.units,
+                              calendar=getattr(obj, "calendar", "standard"))
+    return [str(value) for value in values]
+
+
+def ingest(database, paths, jobs=1, batch_size=50, on_error=None):
+    """Extract meta-data in parallel and insert with a single writer
+
+    :param database: :class:`forest.db.Database`
+    :param paths: NetCDF files to ingest
+    :param jobs: number of worker processes
+    :param batch_size: number of files written per commit
+    :param on_error: optional callback ``f(record)`` for files that
+                     could not be read or written
+    :returns: list of :class:`FileRecord` in completion order
+    """
+    records = []
+    batch = []
+    for record in _extract_all(paths, jobs):
+        records.append(record)
+        if record.error is None:
+            batch.append(record)
+            if len(batch) >= batch_size:
+                _write(database, batch, on_error)
+                batch = []
+        else:
+            _report(record, on_error)
+    _write(database, batch, on_error)
+    return records
+
+
+def _write(database, batch, on_error):
+    """Insert a batch in one transaction
+
+    If any insert fails the batch is rolled back and written again
+    one file per transaction so that only the bad file is skipped
+    """
+    try:
+        for record in batch:
+            database.insert_record(record)
+        database.connection.commit()
+    except Exception:
+        database.rollback()
+        for record in batch:
+            try:
+                database.insert_record(record)
+                database.connection.commit()
+            except Exception as error:
+                database.rollback()
+                record.error = error
+                _report(record, on_error)
+                continue
+            print("inserted: '{}' in {:.3f}s".format(
+                record.path, record.seconds))
+        return
+    for record in batch:
+        print("inserted: '{}' in {:.3f}s".format(
+            record.path, record.seconds))
+
+
+def _report(record, on_error):
+    print("skip file: '{}' {}".format(record.path, record.error))
+    if on_error is not None:
+        on_error(record)
+
+
+def _extract_all(paths, jobs):
+    if jobs is None or jobs <= 1:
+        for path in paths:
+            yield extract(path)
+        return
+    # Spawn avoids forking a process that may hold locks in other threads
+    context = multiprocessing.get_context("spawn")
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs,
+                                                mp_context=context) as pool:
+        futures = [pool.submit(extract, path) for path in paths]
+        for future in concurrent.futures.as_completed(futures):
+            yield future.result()
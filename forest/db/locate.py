@@ -3,7 +3,7 @@ from functools import lru_cache
 import numpy as np
 from .connection import Connection
 from forest.exceptions import SearchFail
-from forest import mark
+from forest import mark, disk
 
 
 __all__ = [
@@ -44,34 +44,46 @@ class Locator(Connection):
             elif (ta is None) and (pa is not None):
                 if pressure is None:
                     raise SearchFail("Need pressure to search pressure axis")
-                pressures = self.coordinate(file_name, variable, "pressure")
-                i = np.where(np.abs(pressures - pressure) < tolerance)[0][0]
+                pressures = self.search(file_name, variable, "pressure")
+                i = pressures.within(pressure, tolerance)[0]
                 return path, (i,)
             elif (ta is not None) and (pa is None):
-                times = self.coordinate(file_name, variable, "time")
-                i = np.where(times == valid_time64)[0][0]
+                times = self.search(file_name, variable, "time")
+                i = times.equal(valid_time64)[0]
                 return path, (i,)
             elif (ta is not None) and (pa is not None):
                 if pressure is None:
                     raise SearchFail("Need pressure to search pressure axis")
-                times = self.coordinate(file_name, variable, "time")
-                pressures = self.coordinate(file_name, variable, "pressure")
+                times = self.search(file_name, variable, "time")
+                pressures = self.search(file_name, variable, "pressure")
                 if (ta == 0) and (pa == 0):
-                    pts = np.where(
-                        (times == valid_time64) &
-                        (np.abs(pressures - pressure) < tolerance))
-                    i = pts[0][0]
+                    pts = np.intersect1d(
+                        times.equal(valid_time64),
+                        pressures.within(pressure, tolerance),
+                        assume_unique=True)
+                    i = pts[0]
                     return path, (i,)
                 else:
-                    ti = np.where(times == valid_time64)[0][0]
-                    pi = np.where(np.abs(pressures - pressure) < tolerance)[0][0]
+                    ti = times.equal(valid_time64)[0]
+                    pi = pressures.within(pressure, tolerance)[0]
                     return path, (ti, pi)
         raise SearchFail("Could not locate: {}".format(pattern))
 
     @mark.sql_sanitize_time("initial_time", "valid_time")
     @lru_cache()
     def file_names(self, pattern, variable, initial_time, valid_time):
-        self.cursor.execute("""
+        self.cursor.execute(self.file_names_query(), dict(
+            pattern=pattern,
+            variable=variable,
+            initial_time=initial_time,
+            valid_time=valid_time,
+        ))
+        return [file_name for file_name, in self.cursor.fetchall()]
+
+    @staticmethod
+    def file_names_query():
+        """File names SQL query syntax"""
+        return """
             SELECT DISTINCT(f.name)
               FROM file AS f
               JOIN variable AS v
@@ -84,13 +96,7 @@ class Locator(Connection):
                AND f.reference = :initial_time
                AND v.name = :variable
                AND t.value = :valid_time
-        """, dict(
-            pattern=pattern,
-            variable=variable,
-            initial_time=initial_time,
-            valid_time=valid_time,
-        ))
-        return [file_name for file_name, in self.cursor.fetchall()]
+        """
 
     @lru_cache()
     def coordinate(self, file_name, variable, coord):
@@ -142,6 +148,12 @@ class Locator(Connection):
             array[i] = v
         return array
 
+    @lru_cache()
+    def search(self, file_name, variable, coord):
+        """Memoised :class:`forest.disk.CoordinateIndex` of a coordinate"""
+        values = self.coordinate(file_name, variable, coord)
+        return disk.CoordinateIndex(values)
+
     @lru_cache()
     def axes(self, file_name, variable):
         """Time/pressure axis information
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 import argparse
 from . import database as db
+from . import ingest
 
 
 def parse_args(argv=None, parser=None):
@@ -13,6 +14,9 @@ def add_arguments(parser):
     parser.add_argument(
         "--database", required=True,
         help="database file to write/extend")
+    parser.add_argument(
+        "--jobs", "-j", type=int, metavar="N",
+        help="extract meta-data using N processes without iris")
     parser.add_argument(
         "paths", nargs="+", metavar="FILE",
         help="unified model netcdf files")
@@ -22,8 +26,11 @@ def main(argv=None, args=None):
     if args is None:
         args = parse_args(argv=argv)
     with db.Database.connect(args.database) as database:
-        for path in args.paths:
-            database.insert_netcdf(path)
+        if args.jobs is None:
+            for path in args.paths:
+                database.insert_netcdf(path)
+        else:
+            ingest.ingest(database, args.paths, jobs=args.jobs)
 
 
 if __name__ == '__main__':
@@ -1,5 +1,5 @@
 """Dimension information relating to datasets"""
-import copy
+from forest.redux import set_in
 
 
 SET_VARIABLES = "DIMENSION_SET_VARIABLES"
@@ -13,12 +13,8 @@ def set_variables(label, values):
 
 def reducer(state, action):
     """Encode dimension information into state"""
-    state = copy.deepcopy(state)
     kind = action["kind"]
     if kind == SET_VARIABLES:
-        node = state
-        for key in ("dimension", action["payload"]["label"]):
-            node[key] = node.get(key, {})
-            node = node[key]
-        node["variables"] = action["payload"]["values"]
+        keys = ("dimension", action["payload"]["label"], "variables")
+        state = set_in(state, keys, action["payload"]["values"])
     return state
@@ -1,7 +1,18 @@
 """Helpers to locate data on disk"""
+import os
+import json
+import sqlite3
+import threading
 import netCDF4
 import datetime as dt
 import numpy as np
+from dataclasses import dataclass, field
+from forest.util import to_datetime as _to_datetime
+
+
+# netCDF-C and HDF5 are not thread-safe, every file access made by
+# threads that share a process must hold this lock
+NETCDF_LOCK = threading.RLock()
 
 
 class AxisNotFound(Exception):
@@ -56,6 +67,73 @@ def pressure_mask(pressures, pressure, rtol=0.01):
     return (np.abs(pressures - pressure) / np.abs(pressure)) < rtol
 
 
+class CoordinateIndex:
+    """Search a 1D coordinate repeatedly without building masks
+
+    Exact matches are found with a hash map from value to positions,
+    tolerance matches with a binary search of a sorted copy. Both
+    return positions in file order, so the first position agrees
+    with ``np.where(mask)[0][0]``
+
+    .. code-block:: python
+
+        index = CoordinateIndex(times)
+        index.equal(np.datetime64("2019-01-01 12:00", "s"))[0]
+
+    :param values: 1D array of coordinate values in file order
+    """
+    def __init__(self, values):
+        self.values = np.ravel(values)
+        self._order = np.argsort(self.values, kind="stable")
+        self._sorted = self.values[self._order]
+        self._positions = None
+
+    def equal(self, value):
+        """Positions of values equal to value
+
+        :returns: sorted integer array, empty if not found
+        """
+        if self._positions is None:
+            positions = {}
+            for i, v in enumerate(self.values):
+                positions.setdefault(v, []).append(i)
+            self._positions = {
+                v: np.array(i, dtype=int) for v, i in positions.items()}
+        return self._positions.get(value, _EMPTY)
+
+    def within(self, value, tolerance):
+        """Positions of values where ``|values - value| < tolerance``
+
+        :returns: sorted integer array, empty if not found
+        """
+        i = np.searchsorted(self._sorted, value - tolerance, side="right")
+        j = np.searchsorted(self._sorted, value + tolerance, side="left")
+        if i >= j:
+            return _EMPTY
+        return np.sort(self._order[i:j])
+
+    def nearest(self, value):
+        """Position of value closest to value, first if tied"""
+        i = np.searchsorted(self._sorted, value)
+        candidates = [k for k in (i - 1, i) if 0 <= k < len(self._sorted)]
+        k = min(candidates, key=lambda k: (abs(self._sorted[k] - value),
+                                           self._order[k]))
+        return int(self._order[k])
+
+
+_EMPTY = np.array([], dtype=int)
+
+
+def coord_positions(name, index, value, rtol=0.01):
+    """Positions matching a time or pressure, equivalent to coord_mask
+
+    :param index: :class:`CoordinateIndex` of coordinate values
+    """
+    if name == "time":
+        return index.equal(np.datetime64(value, "s"))
+    return index.within(value, rtol * abs(value))
+
+
 def pressure_axis(path, variable):
     return _axis("pressure", path, variable)
 
@@ -75,7 +153,7 @@ def _axis(name, path, variable):
 
 
 def load_dim_coords(path, variable):
-    with netCDF4.Dataset(path) as dataset:
+    with NETCDF_LOCK, netCDF4.Dataset(path) as dataset:
         var = dataset.variables[variable]
         dims = var.dimensions
         coords = getattr(var, "coordinates", "")
@@ -102,3 +180,258 @@ def axis(name, dims, coords):
     for c in coords.split():
         if c.startswith(name):
             return 0
+
+
+def read_point(var, j, i):
+    """Equivalent to var[..., j, i] read in chunk-aligned slabs
+
+    Each slab touches whole chunks of the leading axis, so
+    chunks are decoded once even if they do not all fit in
+    the HDF5 chunk cache
+    """
+    chunking = var.chunking()
+    if (len(var.shape) < 3) or (chunking == "contiguous"):
+        return var[..., j, i]
+    length, step = var.shape[0], chunking[0]
+    if step >= length:
+        return var[..., j, i]
+    return np.ma.concatenate([var[k:k + step, ..., j, i]
+                              for k in range(0, length, step)])
+
+
+def decode_times(var):
+    """Convert NetCDF time variable to datetime64[s] array"""
+    values = netCDF4.num2date(
+        np.ravel(var[:]),
+        units=var.units,
+        calendar=getattr(var, "calendar", "standard"),
+        only_use_cftime_datetimes=False)
+    try:
+        return np.array(values, dtype="datetime64[s]")
+    except (TypeError, ValueError):
+        # Non-standard calendars decode to cftime objects
+        return np.array([_to_datetime(value) for value in values],
+                        dtype="datetime64[s]")
+
+
+@dataclass
+class VariableMeta:
+    """Dimension and coordinate information related to a variable
+
+    :param dimensions: names of dimensions
+    :param coordinates: value of coordinates attribute
+    :param coords: dict of 1D arrays, e.g. "time" and "pressure" values
+    :param name: standard_name, long_name or variable name, as iris would
+                 name the cube
+    :param is_data: False for coordinate, bounds and grid mapping variables
+    """
+    dimensions: tuple = ()
+    coordinates: str = ""
+    coords: dict = field(default_factory=dict)
+    name: str = ""
+    is_data: bool = True
+    _search: dict = field(default_factory=dict, init=False, repr=False,
+                          compare=False)
+
+    def search(self, coord):
+        """Memoised :class:`CoordinateIndex` of a coordinate"""
+        if coord not in self._search:
+            self._search[coord] = CoordinateIndex(self.coords[coord])
+        return self._search[coord]
+
+
+@dataclass
+class FileMeta:
+    """Meta-data needed to search a file without opening it
+
+    :param reference_time: forecast_reference_time or None
+    :param variables: dict of :class:`VariableMeta` by variable name
+    """
+    # Increment when information stored in JSON changes
+    version = 2
+
+    reference_time: dt.datetime = None
+    variables: dict = field(default_factory=dict)
+
+    @classmethod
+    def from_netcdf(cls, path):
+        """Read coordinate meta-data from NetCDF file"""
+        with NETCDF_LOCK, netCDF4.Dataset(path) as dataset:
+            try:
+                obj = dataset.variables["forecast_reference_time"]
+                reference_time = decode_times(obj)[0].astype(dt.datetime)
+            except (KeyError, IndexError, AttributeError, ValueError):
+                reference_time = None
+            # Variables that describe other variables
+            auxiliary = set(dataset.dimensions)
+            for var in dataset.variables.values():
+                for attr in ["coordinates", "bounds", "grid_mapping"]:
+                    auxiliary |= set(getattr(var, attr, "").split())
+
+            variables = {}
+            for name, var in dataset.variables.items():
+                dims = var.dimensions
+                coords = getattr(var, "coordinates", "")
+                try:
+                    values = cls._coords(dataset, dims, coords)
+                except (KeyError, ValueError, AttributeError):
+                    # Malformed coordinate only affects this variable
+                    values = {}
+                long_name = (getattr(var, "standard_name", None) or
+                             getattr(var, "long_name", None) or
+                             name)
+                variables[name] = VariableMeta(dims, coords, values,
+                                               name=long_name,
+                                               is_data=name not in auxiliary)
+        return cls(reference_time, variables)
+
+    @staticmethod
+    def _coords(dataset, dims, coords):
+        values = {}
+        for coord in ("time", "pressure"):
+            name = coord_var(coord, dims, coords)
+            if name not in dataset.variables:
+                continue
+            obj = dataset.variables[name]
+            if coord == "time":
+                values[coord] = decode_times(obj)
+            else:
+                values[coord] = np.ravel(obj[:]).astype("d")
+        return values
+
+    def to_json(self):
+        if self.reference_time is None:
+            reference_time = None
+        else:
+            reference_time = self.reference_time.isoformat()
+        variables = {}
+        for name, meta in self.variables.items():
+            coords = {}
+            for coord, values in meta.coords.items():
+                if coord == "time":
+                    coords[coord] = [str(v) for v in values]
+                else:
+                    coords[coord] = values.tolist()
+            variables[name] = {
+                "dimensions": list(meta.dimensions),
+                "coordinates": meta.coordinates,
+                "coords": coords,
+                "name": meta.name,
+                "is_data": meta.is_data}
+        return json.dumps({
+            "version": self.version,
+            "reference_time": reference_time,
+            "variables": variables})
+
+    @classmethod
+    def from_json(cls, text):
+        """Parse JSON written by :meth:`to_json`
+
+        :raises ValueError: if text was written by an older version
+        """
+        data = json.loads(text)
+        version = data.get("version")
+        if version != cls.version:
+            raise ValueError("unsupported FileMeta version: {}".format(
+                version))
+        reference_time = data["reference_time"]
+        if reference_time is not None:
+            reference_time = dt.datetime.fromisoformat(reference_time)
+        variables = {}
+        for name, meta in data["variables"].items():
+            coords = {}
+            for coord, values in meta["coords"].items():
+                if coord == "time":
+                    coords[coord] = np.array(values, dtype="datetime64[s]")
+                else:
+                    coords[coord] = np.array(values, dtype="d")
+            variables[name] = VariableMeta(tuple(meta["dimensions"]),
+                                           meta["coordinates"],
+                                           coords,
+                                           name=meta["name"],
+                                           is_data=meta["is_data"])
+        return cls(reference_time, variables)
+
+
+class FileIndex:
+    """Persistent index of NetCDF coordinate meta-data
+
+    Each file is read once and its :class:`FileMeta` stored against
+    path, modification time and size. Entries are held in memory after
+    first access, so repeated searches only need a call to ``os.stat``.
+    A file that has changed on disk is re-read the next time it is
+    accessed. Files are read without holding the index lock, so a slow
+    read does not block searches of other files
+
+    .. code-block:: python
+
+        index = FileIndex("index.db")
+        index[path].variables["air_temperature"].coords["time"]
+
+    :param path: sqlite3 file to persist index or ':memory:'
+    """
+    def __init__(self, path=":memory:"):
+        self.path = path
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.cursor = self.connection.cursor()
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS file_index (
+                      id INTEGER PRIMARY KEY,
+                    path TEXT NOT NULL,
+                   mtime INTEGER,
+                    size INTEGER,
+                    meta TEXT,
+                         UNIQUE(path))
+        """)
+        self.connection.commit()
+        self._entries = {}
+        self._lock = threading.RLock()
+
+    def __getitem__(self, path):
+        stat = os.stat(path)
+        key = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            entry_key, meta = self._entries.get(path, (None, None))
+        if entry_key != key:
+            meta = self._load(path, stat)
+            with self._lock:
+                self._entries[path] = (key, meta)
+        return meta
+
+    def __contains__(self, path):
+        return path in self._entries
+
+    def load(self, path):
+        """Find meta-data on disk, re-reading NetCDF file if stale"""
+        return self._load(path, os.stat(path))
+
+    def _load(self, path, stat):
+        with self._lock:
+            self.cursor.execute("""
+                SELECT meta FROM file_index
+                 WHERE path = :path AND mtime = :mtime AND size = :size
+            """, dict(path=path, mtime=stat.st_mtime_ns, size=stat.st_size))
+            row = self.cursor.fetchone()
+        if row is not None:
+            try:
+                return FileMeta.from_json(row[0])
+            except ValueError:
+                pass  # Stored by older version, read file again
+        meta = FileMeta.from_netcdf(path)
+        with self._lock:
+            self.cursor.execute("""
+                INSERT OR REPLACE INTO file_index (path, mtime, size, meta)
+                VALUES (:path, :mtime, :size, :meta)
+            """, dict(path=path,
+                      mtime=stat.st_mtime_ns,
+                      size=stat.st_size,
+                      meta=meta.to_json()))
+            self.connection.commit()
+        return meta
+
+    def invalidate(self, path):
+        """Forget in-memory entry, forcing a check on next access"""
+        self._entries.pop(path, None)
+
+    def close(self):
+        self.connection.close()
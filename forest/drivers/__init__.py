@@ -1,18 +1,22 @@
+import threading
 from importlib import import_module
 from forest.exceptions import DriverNotFound
 from functools import wraps
 
 
 _CACHE = {}
+_LOCK = threading.RLock()
 
 
 def _cache(f):
-    # Ensure per-server dataset instances
+    # Ensure per-server dataset instances, sessions may be created
+    # from several threads
     def wrapped(driver_name, settings=None):
         uid = _uid(driver_name, settings)
-        if uid not in _CACHE:
-            _CACHE[uid] = f(driver_name, settings)
-        return _CACHE[uid]
+        with _LOCK:
+            if uid not in _CACHE:
+                _CACHE[uid] = f(driver_name, settings)
+            return _CACHE[uid]
     return wrapped
 
 
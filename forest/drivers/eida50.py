@@ -11,6 +11,7 @@ from forest.exceptions import FileNotFound, IndexNotFound
 from forest.old_state import old_state, unique
 import forest.util
 import forest.map_view
+import forest.pyramid
 from forest import (
         geo,
         locate)
@@ -27,20 +28,43 @@ def _natargmax(arr):
 
 
 class Dataset:
-    def __init__(self, pattern=None, database_path=None, **kwargs):
+    def __init__(self, pattern=None, database_path=None, pyramid_path=None,
+                 **kwargs):
         self.pattern = pattern
         if database_path is None:
             database_path = ":memory:"
         self.database = Database(database_path)
         self.locator = Locator(self.pattern, self.database)
+        if pyramid_path is None:
+            self.pyramid = None
+        else:
+            self.pyramid = forest.pyramid.Pyramid(pyramid_path)
+
+    @property
+    def use_viewport(self):
+        """Images depend on visible extent of the map"""
+        return self.pyramid is not None
 
     def navigator(self):
         return Navigator(self.locator, self.database)
 
     def map_view(self, color_mapper):
-        loader = Loader(self.locator)
+        loader = Loader(self.locator, pyramid=self.pyramid)
         return forest.map_view.map_view(loader, color_mapper, use_hover_tool=False)
 
+    def build_pyramids(self):
+        """Write image pyramids for time steps not already built"""
+        if self.pyramid is None:
+            return
+        for path in self.locator.glob():
+            times = self.locator.load_time_axis(path)
+            for itime in range(len(times)):
+                key = (path, "data", (itime,))
+                if key in self.pyramid:
+                    continue
+                data = Loader.read_image(path, itime)
+                self.pyramid.build(*key, data)
+
 
 class Database:
     """Meta-data store for EIDA50 dataset"""
@@ -244,8 +268,14 @@ class Locator:
 
 
 class Loader:
-    def __init__(self, locator):
+    """EIDA50 image loader
+
+    :param pyramid: optional :class:`forest.pyramid.Pyramid` to serve
+                    pre-computed images from
+    """
+    def __init__(self, locator, pyramid=None):
         self.locator = locator
+        self.pyramid = pyramid
         self.empty_image = {
             "x": [],
             "y": [],
@@ -260,6 +290,10 @@ class Loader:
                 self.cache["longitude"] = nc["longitude"].values
                 self.cache["latitude"] = nc["latitude"].values
 
+    @property
+    def use_viewport(self):
+        return self.pyramid is not None
+
     @property
     def longitudes(self):
         return self.cache["longitude"]
@@ -273,16 +307,30 @@ class Loader:
             data = self.empty_image
         else:
             try:
-                data = self._image(forest.util.to_datetime(state.valid_time))
+                data = self._image(forest.util.to_datetime(state.valid_time),
+                                   viewport=getattr(state, "viewport", None))
             except (FileNotFound, IndexNotFound):
                 data = self.empty_image
         return data
 
-    def _image(self, valid_time):
+    def _image(self, valid_time, viewport=None):
         paths = self.locator.glob()
         path, itime = self.locator.find(paths, valid_time)
+        if self.pyramid is not None:
+            data = self.pyramid.image(path, "data", (itime,), viewport)
+            if data is not None:
+                return data
         return self.load_image(path, itime)
 
+    @staticmethod
+    def read_image(path, itime):
+        """Full resolution image suitable for pyramid building"""
+        with xarray.open_dataset(path, engine=ENGINE) as nc:
+            lons = nc["longitude"].values
+            lats = nc["latitude"].values
+            values = nc["data"][itime].values
+        return geo.stretch_image(lons, lats, values)
+
     def load_image(self, path, itime):
         lons = self.longitudes
         lats = self.latitudes
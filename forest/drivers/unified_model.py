@@ -1,5 +1,4 @@
 import xarray
-from functools import lru_cache
 import os
 import glob
 import re
@@ -8,10 +7,17 @@ import datetime as dt
 import numpy as np
 import netCDF4
 import sqlite3
+from typing import NamedTuple
 import forest.db
 import forest.db.health
+import forest.db.ingest
+import forest.cache
+import forest.state
 import forest.util
 import forest.map_view
+import forest.pyramid
+import forest.point_store
+import forest.watch
 import forest._profile
 from forest.bases import Reusable
 from forest import (
@@ -33,17 +39,33 @@ class NotFound(Exception):
 
 
 class Sync:
-    """Process to synchronize SQL database"""
-    def __init__(self, database_path, pattern, directory):
+    """Process to synchronize SQL database
+
+    :param jobs: number of processes used to extract meta-data, if
+                 given files are read with netCDF4 rather than iris
+    """
+    def __init__(self, database_path, pattern, directory, jobs=None):
         self.database_path = database_path
         self.pattern = pattern
         self.directory = directory
+        self.jobs = jobs
+
+    def __call__(self, paths=None):
+        """Add files missing from database
 
-    def __call__(self):
+        :param paths: optional list of new files reported by a
+                      :class:`forest.watch.Watcher`, if not given the
+                      directory is searched
+        """
         print(f"sync: {self.database_path} {self.pattern} {self.directory}")
 
         # Find S3 objects
-        paths = glob.glob(self.full_path(self.pattern))
+        if paths is None:
+            paths = glob.glob(self.full_path(self.pattern))
+        else:
+            paths = fnmatch.filter(paths, self.full_path(self.pattern))
+            if len(paths) == 0:
+                return
         s3_names = [os.path.basename(path) for path in paths]
 
         # Find names in database
@@ -62,18 +84,36 @@ class Sync:
             print("connecting to: {}".format(self.database_path))
             with forest.db.Database.connect(self.database_path) as database:
                 health_db = forest.db.health.HealthDB(database.connection)
-                for path in extra_paths:
-                    print("inserting: '{}'".format(path))
-                    try:
-                        database.insert_netcdf(path)
-                    except OSError as e:
+                if self.jobs is None:
+                    self.insert(database, health_db, extra_paths)
+                else:
+                    def on_error(record):
                         # S3 Glacier objects inaccessible via goofys
-                        health_db.insert_error(path, e, dt.datetime.now())
-                        print(e)
-                        print(f"skip file: {path}")
-                        continue
+                        health_db.insert_error(record.path, record.error,
+                                               dt.datetime.now())
+                    forest.db.ingest.ingest(database, extra_paths,
+                                            jobs=self.jobs,
+                                            on_error=on_error)
             print("finished")
 
+    @staticmethod
+    def insert(database, health_db, paths):
+        """Insert files one at a time using iris"""
+        for path in paths:
+            print("inserting: '{}'".format(path))
+            try:
+                database.insert_netcdf(path)
+            except OSError as e:
+                # S3 Glacier objects inaccessible via goofys
+                health_db.insert_error(path, e, dt.datetime.now())
+                print(e)
+                print(f"skip file: {path}")
+                continue
+
+    def directories(self):
+        """Directories to watch for new files"""
+        return forest.watch.directories(self.pattern, self.directory)
+
     def full_path(self, name):
         """Prepend directory if available"""
         if self.directory is None:
@@ -89,30 +129,87 @@ class Dataset:
                  locator="file_system",
                  directory=None,
                  database_path=None,
+                 index_path=None,
+                 read_mode="full",
+                 pyramid_path=None,
+                 point_store_path=None,
+                 sync_jobs=None,
                  **kwargs):
         self.label = label
         self.pattern = pattern
+        self.read_mode = read_mode
+        if pyramid_path is None:
+            self.pyramid = None
+        else:
+            self.pyramid = forest.pyramid.Pyramid(pyramid_path)
+        if point_store_path is None:
+            self.point_store = None
+        else:
+            self.point_store = forest.point_store.PointStore(point_store_path)
         self.use_database = locator == "database"
         if self.use_database:
             self.sync = Sync(database_path,
                              pattern,
-                             directory)
+                             directory,
+                             jobs=sync_jobs)
             self.database = db.get_database(database_path)
             self.locator = db.Locator(self.database.connection,
                                       directory=directory)
         else:
-            self.locator = Locator.pattern(self.pattern)
+            if index_path is None:
+                index_path = ":memory:"
+            self.locator = Locator.pattern(self.pattern,
+                                           index=disk.FileIndex(index_path))
 
     def navigator(self):
         if self.use_database:
             return self.database
         else:
-            return Navigator(self.pattern)
+            return Navigator(self.pattern, index=self.locator.index)
+
+    @property
+    def use_viewport(self):
+        """Images depend on visible extent of the map"""
+        return (self.read_mode == "window") or (self.pyramid is not None)
 
     def map_view(self, color_mapper=None):
-        loader = Loader(self.label, self.pattern, self.locator)
+        loader = Loader(self.label, self.pattern, self.locator,
+                        read_mode=self.read_mode,
+                        pyramid=self.pyramid)
         return forest.map_view.map_view(loader, color_mapper)
 
+    def paths(self):
+        """Files of the dataset currently on disk
+
+        Database locators do not hold a list of files, so the
+        pattern is searched in either case
+        """
+        if self.use_database:
+            pattern = self.sync.full_path(self.pattern)
+        else:
+            pattern = self.pattern
+        return sorted(glob.glob(os.path.expanduser(pattern)))
+
+    def build_pyramids(self):
+        """Write image pyramids for fields not already built"""
+        if self.pyramid is None:
+            return
+        for path in self.paths():
+            for variable, pts in image_fields(path):
+                if (path, variable, pts) in self.pyramid:
+                    continue
+                data = Loader.load_image(path, variable, pts, coarsify=False)
+                self.pyramid.build(path, variable, pts, data)
+
+    def build_point_stores(self):
+        """Rechunk files for point queries if not already stored"""
+        if self.point_store is None:
+            return
+        for path in self.paths():
+            if path in self.point_store:
+                continue
+            self.point_store.build(path)
+
     def profile_view(self, figure):
         loader = Loader(self.label, self.pattern, self.locator)
         return ProfileView(figure, loader)
@@ -195,55 +292,135 @@ class SeriesView(Reusable):
 
 
 class Navigator:
-    def __init__(self, pattern):
+    """Menu choices for a collection of files
+
+    Meta-data is read with netCDF4 once per file and kept in a
+    :class:`forest.disk.FileIndex`, shared with the :class:`Locator`
+    of a dataset so that every session reuses it
+
+    :param pattern: glob pattern of NetCDF files
+    :param index: optional :class:`forest.disk.FileIndex` to share or persist
+    """
+    def __init__(self, pattern, index=None):
+        if index is None:
+            index = disk.FileIndex()
         self.pattern = pattern
-        self._locators = {
-            "initial": read_initial_time,
-            "valid": read_valid_times,
-            "pressure": PressuresLocator(),
-        }
+        self.index = index
 
     def variables(self, pattern):
-        cubes = iris.load(pattern)
-        return [cube.name() for cube in cubes]
+        names = set()
+        for _, meta in self._metas(pattern):
+            names |= set(var.name for var in meta.variables.values()
+                         if var.is_data)
+        return sorted(names)
 
     def initial_times(self, pattern, variable):
-        locator = self._locators["initial"]
-        return list(sorted(set(locator(path)
-                               for path in glob.glob(pattern))))
+        times = set(meta.reference_time for _, meta in self._metas(pattern))
+        return sorted(times - {None})
 
     def valid_times(self, pattern, variable, initial_time):
-        return self._dimension("valid", pattern, variable, initial_time)
+        return self._dimension("time", pattern, variable, initial_time)
 
     def pressures(self, pattern, variable, initial_time):
         return self._dimension("pressure", pattern, variable, initial_time)
 
-    def _dimension(self, keyword, pattern, variable, initial_time):
+    def _dimension(self, coord, pattern, variable, initial_time):
         arrays = []
-        locator = self._locators[keyword]
-        for path in glob.glob(self.pattern):
-            arrays.append(locator(path, variable))
+        for _, meta in self._metas(self.pattern):
+            for name, var in meta.variables.items():
+                if variable not in (name, var.name):
+                    continue
+                if coord in var.coords:
+                    arrays.append(var.coords[coord])
         if len(arrays) == 0:
             return []
         return np.unique(np.concatenate(arrays))
 
+    def _metas(self, pattern):
+        for path in sorted(glob.glob(os.path.expanduser(pattern))):
+            try:
+                yield path, self.index[path]
+            except (OSError, RuntimeError) as error:
+                # netCDF4 raises OSError for unreadable or vanished files
+                print("skip file: '{}' {}".format(path, error))
+
+
+class Window(NamedTuple):
+    """Geographic extent and pixel resolution of a windowed read
+
+    Longitudes are not wrapped, a view across the dateline has a
+    range such as (170, 190) and a view of more than the whole
+    globe has a range wider than 360 degrees
+    """
+    lon_range: tuple
+    lat_range: tuple
+    width: int = None
+    height: int = None
+
+    @classmethod
+    def from_viewport(cls, viewport):
+        """Map WebMercator viewport to longitude/latitude window
+
+        :returns: Window or None if viewport not yet known
+        """
+        if viewport is None:
+            return
+        if isinstance(viewport, dict):
+            viewport = forest.state.Viewport(**viewport)
+        if (viewport.x_range is None) or (viewport.y_range is None):
+            return
+        # Web Mercator x is proportional to longitude, cartopy would wrap
+        lons = np.degrees(np.asarray(viewport.x_range, dtype="d") /
+                          geo.EARTH_RADIUS)
+        _, lats = geo.plate_carree([0, 0], viewport.y_range)
+        return cls((float(min(lons)), float(max(lons))),
+                   (float(lats[0]), float(lats[1])),
+                   viewport.width,
+                   viewport.height)
+
 
 class Loader:
-    """Unified model formatted loader"""
-    def __init__(self, name, pattern, locator):
+    """Unified model formatted loader
+
+    Images are stored in a byte-limited :class:`forest.cache.ImageCache`
+    shared by every Loader in the process
+
+    :param cache: optional cache, defaults to ``forest.cache.image_cache``
+    :param read_mode: either 'full' or 'window' to read only the visible
+                      region at a resolution suited to the figure
+    :param pyramid: optional :class:`forest.pyramid.Pyramid` to serve
+                    pre-computed images from
+    """
+    def __init__(self, name, pattern, locator, cache=None, read_mode="full",
+                 pyramid=None):
+        if cache is None:
+            cache = forest.cache.image_cache
         self.name = name
         self.pattern = pattern
         self.locator = locator
+        self.cache = cache
+        self.read_mode = read_mode
+        self.pyramid = pyramid
+
+    @property
+    def use_viewport(self):
+        return (self.read_mode == "window") or (self.pyramid is not None)
 
     def image(self, state):
         if not self.valid(state):
             return gridded_forecast.empty_image()
+        if self.read_mode == "window":
+            window = Window.from_viewport(state.viewport)
+        else:
+            window = None
         data = self._input_output(
             self.pattern,
             state.variable,
             state.initial_time,
             state.valid_time,
-            state.pressure)
+            state.pressure,
+            window=window,
+            viewport=state.viewport)
         data.update(gridded_forecast.coordinates(state.valid_time,
                                                  state.initial_time,
                                                  state.pressures,
@@ -293,9 +470,8 @@ class Loader:
             "y": y,
         }
 
-    @lru_cache(maxsize=100)
     def _input_output(self, pattern, variable, initial_time, valid_time,
-                      pressure):
+                      pressure, window=None, viewport=None):
         """I/O needed to load an image and its metadata"""
         try:
             path, pts = self.locator.locate(
@@ -307,7 +483,28 @@ class Loader:
         except SearchFail:
             return gridded_forecast.empty_image()
 
-        data = self.load_image(path, variable, pts)
+        if self.pyramid is not None:
+            data = self.pyramid.image(path, variable, pts, viewport)
+        else:
+            data = None
+        if data is not None:
+            data["name"] = [self.name]
+            return data
+
+        # File status in key so rewritten files are not served from cache
+        try:
+            stat = os.stat(path)
+            version = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            version = None
+        key = (path, version, variable, pts, window)
+        data = self.cache.get_or_load(
+            key,
+            lambda: self.load_image(path, variable, pts, window=window),
+            path=path)
+
+        # Copy to keep cached entry free of layer-specific data
+        data = dict(data)
         data["name"] = [self.name]
         return data
 
@@ -333,27 +530,44 @@ class Loader:
         return any(np.abs(pressures - pressure) < tolerance)
 
     @classmethod
-    def load_image(cls, path, variable, pts):
-        """Load bokeh image glyph data from file using slices"""
+    def load_image(cls, path, variable, pts, window=None, coarsify=True):
+        """Load bokeh image glyph data from file using slices
+
+        :param window: optional :class:`Window` to restrict read to
+                       visible region, 2D lon/lat grids are read in full
+        :param coarsify: reduce resolution of large grids
+        """
+        if window is not None:
+            try:
+                result = cls._load_window(path, variable, pts, window)
+            except KeyError:
+                result = None
+            if result is not None:
+                lons, lats, values, units = result
+                if values.size == 0:
+                    return gridded_forecast.empty_image()
+                values, units = cls._convert_units(variable, values, units)
+
+                # Stretch near the Greenwich meridian then shift back,
+                # since x is proportional to longitude
+                shift = float(np.mean(lons))
+                data = geo.stretch_image(lons - shift, lats, values)
+                data["x"] = [data["x"][0] +
+                             np.radians(shift) * geo.EARTH_RADIUS]
+                data["units"] = [units]
+                return data
+
         try:
             lons, lats, values, units = cls._load_xarray(path, variable, pts)
         except:
             lons, lats, values, units = cls._load_cube(path, variable, pts)
 
         # Units
-        if variable in ["precipitation_flux", "stratiform_rainfall_rate"]:
-            if units == "mm h-1":
-                values = values
-            else:
-                values = forest.util.convert_units(values, units, "kg m-2 hour-1")
-                units = "kg m-2 hour-1"
-        elif units == "K":
-            values = forest.util.convert_units(values, "K", "Celsius")
-            units = "C"
+        values, units = cls._convert_units(variable, values, units)
 
         # Coarsify images
         threshold = 200 * 200  # Chosen since TMA WRF is 199 x 199
-        if values.size > threshold:
+        if coarsify and (values.size > threshold):
             fraction = 0.25
         else:
             fraction = 1.
@@ -371,6 +585,75 @@ class Loader:
         data["units"] = [units]
         return data
 
+    @staticmethod
+    def _convert_units(variable, values, units):
+        if variable in ["precipitation_flux", "stratiform_rainfall_rate"]:
+            if units == "mm h-1":
+                values = values
+            else:
+                values = forest.util.convert_units(values, units, "kg m-2 hour-1")
+                units = "kg m-2 hour-1"
+        elif units == "K":
+            values = forest.util.convert_units(values, "K", "Celsius")
+            units = "C"
+        return values, units
+
+    @staticmethod
+    def _load_window(path, variable, pts, window):
+        """Read region of 1D lon/lat grid visible inside window
+
+        Rows and columns are decimated so that roughly one grid
+        point is read per screen pixel
+
+        :returns: (lons, lats, values, units) or None if grid not 1D
+        """
+        with xarray.open_dataset(path, engine="h5netcdf") as nc:
+            data_array = nc[variable][pts]
+            lon_coord = data_array.longitude
+            lat_coord = data_array.latitude
+            if (lon_coord.ndim != 1) or (lat_coord.ndim != 1):
+                return
+            x_dim, = lon_coord.dims
+            y_dim, = lat_coord.dims
+            lons = geo.to_180(np.asarray(lon_coord, dtype="d"))
+            lats = np.asarray(lat_coord, dtype="d")
+
+            x_runs = _window_runs(lons, window.lon_range, period=360.)
+            y_runs = _window_runs(lats, window.lat_range)
+            x_step = _window_step(x_runs, window.width)
+            y_step = _window_step(y_runs, window.height)
+            x_index = np.concatenate(
+                [np.arange(start, stop, x_step) for start, stop in x_runs] +
+                [np.array([], dtype=int)])
+            y_index = np.concatenate(
+                [np.arange(start, stop, y_step) for start, stop in y_runs] +
+                [np.array([], dtype=int)])
+            if (len(x_index) == 0) or (len(y_index) == 0):
+                empty = np.ma.masked_array(np.zeros((0, 0)))
+                return lons[:0], lats[:0], empty, ""
+
+            # Contiguous strided reads, at most two per axis
+            blocks = []
+            for y_start, y_stop in y_runs:
+                row = []
+                for x_start, x_stop in x_runs:
+                    block = data_array.isel({
+                        y_dim: slice(y_start, y_stop, y_step),
+                        x_dim: slice(x_start, x_stop, x_step)})
+                    row.append(block.transpose(y_dim, x_dim).values)
+                blocks.append(row)
+            values = np.ma.masked_invalid(np.block(blocks))
+            units = getattr(data_array, 'units', '')
+
+        # Unwrap longitudes around centre of window and sort
+        center = np.mean(window.lon_range)
+        lons = center + (lons[x_index] - center + 180.) % 360. - 180.
+        order = np.argsort(lons, kind="stable")
+        return (lons[order],
+                lats[y_index],
+                values[:, order],
+                units)
+
     @staticmethod
     def _load_xarray(path, variable, pts):
         with xarray.open_dataset(path, engine="h5netcdf") as nc:
@@ -396,9 +679,72 @@ class Loader:
         return lons, lats, values, str(units)  # Needed for tutorial data
 
 
+def image_fields(path):
+    """Variables and leading indices of every 2D field in a file
+
+    :returns: generator of (variable, pts) pairs
+    """
+    with netCDF4.Dataset(path) as dataset:
+        items = []
+        for name, var in dataset.variables.items():
+            if var.ndim < 2:
+                continue
+            coords = list(var.dimensions) + getattr(
+                var, "coordinates", "").split()
+            if ("longitude" not in coords) or ("latitude" not in coords):
+                continue
+            items.append((name, var.shape[:-2]))
+    for name, shape in items:
+        for pts in np.ndindex(*shape):
+            yield name, pts
+
+
+def _window_runs(values, extent, period=None):
+    """Contiguous (start, stop) index ranges of values inside extent
+
+    A one point border is included so that the visible region
+    is fully covered
+
+    :param period: treat values as cyclic, e.g. 360 for longitudes,
+                   so that (170, 190) selects 170 to 180 and -180 to -170
+    """
+    lower, upper = min(extent), max(extent)
+    if period is None:
+        mask = (values >= lower) & (values <= upper)
+    elif (upper - lower) >= period:
+        mask = np.ones(len(values), dtype=bool)
+    else:
+        mask = ((values - lower) % period) <= (upper - lower)
+    edges = np.diff(np.concatenate([[0], mask.astype("i1"), [0]]))
+    starts = np.flatnonzero(edges == 1)
+    stops = np.flatnonzero(edges == -1)
+    return [(max(start - 1, 0), min(stop + 1, len(values)))
+            for start, stop in zip(starts, stops)]
+
+
+def _window_step(runs, pixels):
+    """Decimation needed to read approximately one point per pixel"""
+    if not pixels:
+        return 1
+    points = sum(stop - start for start, stop in runs)
+    return max(1, points // int(pixels))
+
+
 class Locator(object):
-    def __init__(self, paths):
+    """Search files for the path and index of a field
+
+    Coordinate meta-data is read once per file and held in a
+    :class:`forest.disk.FileIndex`, so that :meth:`locate` is
+    an in-memory search
+
+    :param paths: list of NetCDF files
+    :param index: optional :class:`forest.disk.FileIndex` to share or persist
+    """
+    def __init__(self, paths, index=None):
+        if index is None:
+            index = disk.FileIndex()
         self.paths = paths
+        self.index = index
         self.spare = []
         self.catalogue = {}
         for path in paths:
@@ -413,8 +759,8 @@ class Locator(object):
                 self.catalogue[key].append(path)
 
     @classmethod
-    def pattern(cls, text):
-        return cls(sorted(glob.glob(os.path.expanduser(text))))
+    def pattern(cls, text, index=None):
+        return cls(sorted(glob.glob(os.path.expanduser(text))), index=index)
 
     def locate(
             self,
@@ -427,48 +773,45 @@ class Locator(object):
         paths = self.find_paths(initial_time) + self.spare
         paths = fnmatch.filter(paths, pattern)
         for path in paths:
-            with netCDF4.Dataset(path) as dataset:
-                if variable not in dataset.variables:
-                    continue
+            try:
+                meta = self.index[path].variables[variable]
+            except KeyError:
+                continue
 
-                var = dataset.variables[variable]
-                dims = var.dimensions
-                coords = getattr(var, "coordinates", "")
-
-                masks = {}
-                for coord, value in [
-                        ("time", valid_time),
-                        ("pressure", pressure)]:
-                    if not disk.has_coord(coord, dims, coords):
-                        continue
-                    if value is None:
-                        # Coordinate present but value not specified
-                        raise SearchFail("Please specify: '{}'".format(coord))
-                        continue
-                    axis = disk.axis(coord, dims, coords)
-                    coord_var = disk.coord_var(coord, dims, coords)
-                    if coord == "time":
-                        obj = dataset.variables[coord_var]
-                        values = netCDF4.num2date(obj[:], units=obj.units)
-                    else:
-                        values = dataset.variables[coord_var][:]
-                    mask = disk.coord_mask(coord, values, value)
-                    if axis not in masks:
-                        masks[axis] = mask
-                    else:
-                        masks[axis] = masks[axis] & mask
+            dims = meta.dimensions
+            coords = meta.coordinates
+
+            positions = {}
+            for coord, value in [
+                    ("time", valid_time),
+                    ("pressure", pressure)]:
+                if not disk.has_coord(coord, dims, coords):
+                    continue
+                if value is None:
+                    # Coordinate present but value not specified
+                    raise SearchFail("Please specify: '{}'".format(coord))
+                if coord not in meta.coords:
+                    # Coordinate variable missing from file
+                    positions = None
+                    break
+                axis = disk.axis(coord, dims, coords)
+                found = disk.coord_positions(coord, meta.search(coord), value)
+                if axis in positions:
+                    # Coordinates sharing an axis, e.g. dim0 format
+                    found = np.intersect1d(positions[axis], found,
+                                           assume_unique=True)
+                positions[axis] = found
 
             # Determine if search was successful
-            found = all(mask.any() for mask in masks.values())
+            if positions is None:
+                continue
+            found = all(len(p) > 0 for p in positions.values())
             if not found:
                 continue
 
             # Generate multi-dimensional slice from search result
-            slices = []
-            for i in range(max(masks.keys()) + 1):
-                pts = np.where(masks[i])[0][0]
-                slices.append(pts)
-            pts = tuple(slices)
+            rank = max(positions.keys(), default=-1) + 1
+            pts = tuple(int(positions[i][0]) for i in range(rank))
             return path, pts
 
         # Search failure message
@@ -489,7 +832,7 @@ class Locator(object):
     def initial_time(self, path):
         for strategy in [
                 self.initial_time_regex,
-                self.initial_time_netcdf4]:
+                self.initial_time_index]:
             result = strategy(path)
             if result is None:
                 continue
@@ -502,14 +845,8 @@ class Locator(object):
         if groups:
             return dt.datetime.strptime(groups[0], "%Y%m%dT%H%MZ")
 
-    def initial_time_netcdf4(self, path):
-        with netCDF4.Dataset(path) as dataset:
-            try:
-                var = dataset.variables["forecast_reference_time"]
-                result = netCDF4.num2date(var[:], units=var.units)
-            except KeyError:
-                result = None
-        return result
+    def initial_time_index(self, path):
+        return self.index[path].reference_time
 
 
 def read_initial_time(path):
@@ -1,7 +1,41 @@
+"""
+Encoding
+--------
+
+Helpers to serialise data sent to the browser.
+
+Images are the largest payload of a typical update. Bokeh sends
+numpy arrays as binary buffers, so the size of a frame is set
+by the dtype of each image. :func:`encode_image` converts bokeh
+image glyph data to one of the following transports
+
+======== ==========================================================
+float64  Images as loaded, 8 bytes per pixel, the default
+float32  4 bytes per pixel, missing data sent as NaN
+uint16   2 bytes per pixel, ``value = pixel * scale + offset``
+uint8    1 byte per pixel, ``value = pixel * scale + offset``
+======== ==========================================================
+
+Smaller transports are opt-in, see
+:attr:`forest.config.Config.image_transport`. Quantised transports
+reserve the largest integer, see
+:func:`sentinel`, for missing data and add ``scale`` and ``offset``
+columns so that values can be decoded in the browser
+
+.. autofunction:: encode_image
+
+.. autofunction:: decode_image
+
+.. autofunction:: sentinel
+
+"""
 import json
 import numpy as np
 
 
+TRANSPORTS = ("float64", "float32", "uint16", "uint8")
+
+
 class NumpyEncoder(json.JSONEncoder):
     def default(self, obj):
         if isinstance(obj, np.floating):
@@ -10,3 +44,80 @@ class NumpyEncoder(json.JSONEncoder):
             return int(obj)
         else:
             return super().default(obj)
+
+
+def is_quantised(transport):
+    """Transport needs scale and offset to decode"""
+    return transport in ("uint16", "uint8")
+
+
+def sentinel(transport):
+    """Integer used to send missing data in a quantised transport"""
+    return int(np.iinfo(np.dtype(transport)).max)
+
+
+def encode_image(data, transport="float64"):
+    """Copy of bokeh image glyph data suitable for a transport
+
+    Original arrays are not modified since loaders may cache them
+
+    :param data: dict with an ``"image"`` column of 2D arrays or
+                 masked arrays
+    :param transport: one of ``"float64"``, ``"float32"``,
+                      ``"uint16"`` or ``"uint8"``
+    :returns: dict, quantised transports add ``"scale"`` and
+              ``"offset"`` columns
+    """
+    if transport not in TRANSPORTS:
+        raise ValueError("unknown transport: '{}'".format(transport))
+    if (transport == "float64") or ("image" not in data):
+        return data
+    images, scales, offsets = [], [], []
+    for image in data["image"]:
+        values = np.ma.filled(
+            np.ma.masked_invalid(image).astype("f4"), np.nan)
+        if not is_quantised(transport):
+            images.append(values)
+            continue
+        image, scale, offset = _quantise(values, transport)
+        images.append(image)
+        scales.append(scale)
+        offsets.append(offset)
+    result = dict(data)
+    result["image"] = images
+    if is_quantised(transport):
+        result["scale"] = scales
+        result["offset"] = offsets
+    return result
+
+
+def _quantise(values, transport):
+    missing = sentinel(transport)
+    finite = np.isfinite(values)
+    if finite.any():
+        low = float(values[finite].min())
+        high = float(values[finite].max())
+    else:
+        low, high = 0., 0.
+    if high > low:
+        scale = (high - low) / (missing - 1)
+    else:
+        scale = 1.
+    image = np.full(values.shape, missing, dtype=transport)
+    image[finite] = np.round((values[finite] - low) / scale)
+    return image, scale, low
+
+
+def decode_image(data, index=0):
+    """Values of an image in bokeh glyph data sent by :func:`encode_image`
+
+    :returns: masked array of floats, missing data is masked
+    """
+    image = data["image"][index]
+    if ("scale" in data) and np.issubdtype(np.asarray(image).dtype,
+                                           np.integer):
+        image = np.asarray(image)
+        missing = image == np.iinfo(image.dtype).max
+        values = image * data["scale"][index] + data["offset"][index]
+        return np.ma.masked_array(values, mask=missing)
+    return np.ma.masked_invalid(image)
@@ -2,12 +2,19 @@
 from collections import defaultdict
 from functools import partial
 import forest.state
+import forest.redux
+import forest.db.control
 from forest.reusable_pool import ReusablePool
 from forest.scaling_group import ScalingGroup
 
 
 class Gallery:
     """View orchestration layer"""
+    # State read by render_id of views, map views read navigation
+    # state through forest.old_state
+    keys = (("layers", "position", "colorbar") +
+            forest.db.control.State._fields)
+
     def __init__(self, scaling_groups):
         self.scaling_groups = scaling_groups
 
@@ -40,7 +47,8 @@ class Gallery:
         return cls(groups)
 
     def connect(self, store):
-        store.add_subscriber(self.render)
+        # Skip actions that leave these branches unchanged
+        store.subscribe(forest.redux.select_keys(*self.keys), self.render)
 
     def render(self, state):
         if isinstance(state, dict):
@@ -10,6 +10,14 @@ Module to handle projection and sampling iof points for imaging.
 
 .. autofunction:: plate_carree
 
+.. autofunction:: web_mercator_axes
+
+.. autoclass:: Regridder
+    :members:
+
+.. autoclass:: CurvilinearRegridder
+    :members:
+
 """
 try:
     import cartopy
@@ -17,10 +25,14 @@ except ImportError:
     # ReadTheDocs unable to pip install cartopy
     pass
 
+import hashlib
+import functools
+import threading
+from collections import OrderedDict
 import numpy as np
 
-import scipy.interpolate
-import scipy.ndimage
+import scipy.sparse
+import scipy.spatial
 
 try:
     import datashader
@@ -28,9 +40,42 @@ try:
 except ModuleNotFoundError:
     datashader = None
 
+
+class _LRUCache:
+    """Thread-safe dict holding the most recently used items"""
+    def __init__(self, size):
+        self.size = size
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._items:
+                return
+            self._items.move_to_end(key)
+            return self._items[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            while len(self._items) > self.size:
+                self._items.popitem(last=False)
+
+
+def _digest(*arrays):
+    """Key that identifies the values, dtype and shape of arrays"""
+    digest = hashlib.sha1()
+    for array in arrays:
+        array = np.ascontiguousarray(array)
+        digest.update(str((array.dtype.str, array.shape)).encode("utf-8"))
+        digest.update(array.data)
+    return digest.digest()
+
+
 def stretch_image(lons, lats, values,
                   plot_height=None,
-                  plot_width=None):
+                  plot_width=None,
+                  method="nearest"):
     """
     Do the mapping from image data to the format required by bokeh
     for plotting.
@@ -39,25 +84,32 @@ def stretch_image(lons, lats, values,
     :param lats: Numpy array with longitude values for the image data.
     :param values: Numpy array of image data, with dimensions matching the
                    size of latitude and longitude arrays.
+    :param method: "nearest" or "bilinear" sampling of 2D lons/lats,
+                   see :class:`CurvilinearRegridder`
     :return: A dictionary that can be used with the bokeh image glyph.
     """
     if (lons.ndim == 1):
-        gx, _ = web_mercator(
-            lons,
-            np.zeros(len(lons), dtype="d"))
-        _, gy = web_mercator(
-            np.zeros(len(lats), dtype="d"),
-            lats)
+        gx, gy = web_mercator_axes(lons, lats)
     elif (lons.ndim == 2) and (lats.ndim == 2):
-        gx, gy = web_mercator(lons, lats)
-        gx = gx.reshape(lons.shape)
+        gx, gy = web_mercator_axes(lons, lats)
         gx = np.ma.masked_invalid(gx)
-        gy = gy.reshape(lats.shape)
         gy = np.ma.masked_invalid(gy)
     else:
         raise Exception("Either 1D or 2D lons/lats")
 
-    if datashader:
+    if gx.ndim == 2:
+        # Curvilinear grids reuse a precomputed inverse map
+        x_range = (gx.min(), gx.max())
+        y_range = (gy.min(), gy.max())
+        if plot_height is None:
+            plot_height = values.shape[0]
+        if plot_width is None:
+            plot_width = values.shape[1]
+        regridder = CurvilinearRegridder.cached(
+            gx, gy, x_range, y_range, plot_height, plot_width,
+            method=method)
+        image = regridder(values)
+    elif datashader:
         x_range = (gx.min(), gx.max())
         y_range = (gy.min(), gy.max())
         image = datashader_stretch(values, gx, gy, x_range, y_range,
@@ -99,45 +151,449 @@ def datashader_stretch(values, gx, gy, x_range, y_range,
     :param gy: The array of coordinates in projection space.
     :param x_range: The range of the mesh in projection space.
     :param y_range: The range of the mesh in projection space.
-    :return: An xarray of image data representing pixels.
+    :return: A masked array of image data representing pixels.
     """
     if plot_height is None:
         plot_height = values.shape[0]
     if plot_width is None:
         plot_width = values.shape[1]
-    canvas = datashader.Canvas(plot_height=plot_height,
-                               plot_width=plot_width,
-                               x_range=x_range,
-                               y_range=y_range)
     if gx.ndim == 1:
-        # 1D Quadmesh
-        xarr = xarray.DataArray(values, coords=[('y', gy), ('x', gx)], name='Z')
-        image = canvas.quadmesh(xarr)
-    else:
-        # 2D Quadmesh
-        xarr = xarray.DataArray(values,
-                                dims=['Y', 'X'],
-                                coords={
-                                    'Qx': (['Y', 'X'], gx),
-                                    'Qy': (['Y', 'X'], gy)
-                                },
-                                name='Z')
-        image = canvas.quadmesh(xarr, x='Qx', y='Qy')
+        # 1D grids reuse a precomputed mapping from cells to pixels
+        regridder = Regridder.cached(gx, gy, x_range, y_range,
+                                     plot_height, plot_width)
+        return regridder(values)
+    canvas = _canvas(plot_height, plot_width,
+                     tuple(float(x) for x in x_range),
+                     tuple(float(y) for y in y_range))
+    # 2D Quadmesh
+    xarr = xarray.DataArray(values,
+                            dims=['Y', 'X'],
+                            coords={
+                                'Qx': (['Y', 'X'], gx),
+                                'Qy': (['Y', 'X'], gy)
+                            },
+                            name='Z')
+    image = canvas.quadmesh(xarr, x='Qx', y='Qy')
     return np.ma.masked_array(image.values,
                           mask=np.isnan(
                               image.values))
 
-def custom_stretch(values, gx, gy):
-    if np.ma.is_masked(values):
-        mask = values.mask
+@functools.lru_cache(maxsize=16)
+def _canvas(plot_height, plot_width, x_range, y_range):
+    return datashader.Canvas(plot_height=plot_height,
+                             plot_width=plot_width,
+                             x_range=x_range,
+                             y_range=y_range)
+
+
+class Regridder:
+    """Resample fields on a fixed rectilinear grid to a raster
+
+    The mapping from grid cells to pixels is computed once per
+    axis. Each pixel is the mean of the valid cells that cover it,
+    chosen as a datashader quadmesh aggregation would choose them.
+    Stepping through fields on the same grid then costs a gather,
+    where each pixel is covered by at most one cell, or a sparse
+    matrix product rather than a full aggregation
+
+    .. code-block:: python
+
+        regridder = Regridder.cached(gx, gy, x_range, y_range,
+                                     plot_height, plot_width)
+        image = regridder(values)
+
+    :param gx: 1D array of cell centres along x
+    :param gy: 1D array of cell centres along y
+    :param x_range: (start, end) of raster along x
+    :param y_range: (start, end) of raster along y
+    :param plot_height: number of pixels along y
+    :param plot_width: number of pixels along x
+    """
+    _cache = _LRUCache(32)
+
+    def __init__(self, gx, gy, x_range, y_range, plot_height, plot_width):
+        self.shape = (plot_height, plot_width)
+        method = self._method(gx, gy, x_range, y_range,
+                              plot_height, plot_width)
+        self.rows = _axis_weights(gy, y_range, plot_height, method)
+        self.columns = _axis_weights(gx, x_range, plot_width, method)
+        self._row_runs = _runs(self.rows)
+        self._column_runs = _runs(self.columns)
+        self._count = np.outer(self.rows.sum(axis=1),
+                               self.columns.sum(axis=1))
+
+    @staticmethod
+    def _method(gx, gy, x_range, y_range, plot_height, plot_width):
+        """Choose aggregation the same way as datashader.Canvas.quadmesh"""
+        def even(centres):
+            return (len(centres) > 1) and np.allclose(
+                centres, np.linspace(centres[0], centres[-1], len(centres)))
+
+        def upsample(centres, limits, n):
+            m = len(centres)
+            span = abs(centres[-1] - centres[0]) * m / (m - 1)
+            return (span / m) >= abs((limits[1] - limits[0]) / n)
+
+        if not (even(gx) and even(gy)):
+            return "rectilinear"
+        flags = {upsample(gx, x_range, plot_width),
+                 upsample(gy, y_range, plot_height)}
+        if flags == {True}:
+            return "upsample"
+        elif flags == {False}:
+            return "downsample"
+        return "rectilinear"
+
+    @classmethod
+    def cached(cls, gx, gy, x_range, y_range, plot_height, plot_width):
+        """Regridder memoised by grid, raster range and shape"""
+        x_range = tuple(float(x) for x in x_range)
+        y_range = tuple(float(y) for y in y_range)
+        key = (_digest(gx, gy), x_range, y_range, plot_height, plot_width)
+        regridder = cls._cache.get(key)
+        if regridder is None:
+            regridder = cls(gx, gy, x_range, y_range,
+                            plot_height, plot_width)
+            cls._cache.put(key, regridder)
+        return regridder
+
+    def __call__(self, values):
+        """Resample values
+
+        :param values: array or masked array of shape (len(gy), len(gx))
+        :returns: masked array of shape (plot_height, plot_width)
+        """
+        invalid = np.ma.getmaskarray(values) | ~np.isfinite(values)
+        values = np.ma.getdata(values).astype("d", copy=False)
+        if _is_gather(self._row_runs) and _is_gather(self._column_runs):
+            return self._gather(np.where(invalid, np.nan, values))
+        if invalid.any():
+            values = np.where(invalid, 0., values)
+            count = self._apply((~invalid).astype("d"))
+        else:
+            count = self._count
+        total = self._apply(values)
+        image = np.full(self.shape, np.nan)
+        np.divide(total, count, out=image, where=count > 0)
+        return np.ma.masked_array(image, mask=np.isnan(image))
+
+    def _gather(self, values):
+        """Each pixel is a copy of at most one cell"""
+        (i0, i1), (j0, j1) = self._row_runs, self._column_runs
+        image = np.take(values, i0, axis=0)[:, j0]
+        image[i0 == i1, :] = np.nan
+        image[:, j0 == j1] = np.nan
+        return np.ma.masked_array(image, mask=np.isnan(image))
+
+    def _apply(self, array):
+        array = _resample(array, self.rows, self._row_runs, axis=0)
+        return _resample(array, self.columns, self._column_runs, axis=1)
+
+
+def _runs(matrix):
+    """First and last + 1 cell covering each pixel
+
+    :returns: (start, stop) or None if cells are not contiguous
+    """
+    matrix = matrix.tocsr()
+    matrix.sort_indices()
+    counts = np.diff(matrix.indptr)
+    start = np.zeros(matrix.shape[0], dtype=int)
+    stop = np.zeros(matrix.shape[0], dtype=int)
+    covered = counts > 0
+    start[covered] = matrix.indices[matrix.indptr[:-1][covered]]
+    stop[covered] = matrix.indices[matrix.indptr[1:][covered] - 1] + 1
+    if np.any((stop - start) != counts):
+        return
+    return start, stop
+
+
+def _is_gather(runs):
+    return (runs is not None) and np.all((runs[1] - runs[0]) <= 1)
+
+
+def _resample(array, matrix, runs, axis):
+    """Sum cells covering each pixel along an axis of array"""
+    if runs is None:
+        if axis == 0:
+            return matrix @ array
+        return (matrix @ array.T).T
+    start, stop = runs
+    if _is_gather(runs):
+        result = np.take(array, start, axis=axis)
+        empty = (start == stop)
+        if axis == 0:
+            result[empty, :] = 0.
+        else:
+            result[:, empty] = 0.
+        return result
+
+    # Sum of a run is a difference of cumulative sums
+    shape = list(array.shape)
+    shape[axis] += 1
+    totals = np.zeros(shape)
+    np.cumsum(array, axis=axis,
+              out=totals[1:] if axis == 0 else totals[:, 1:])
+    return (np.take(totals, stop, axis=axis) -
+            np.take(totals, start, axis=axis))
+
+
+class CurvilinearRegridder:
+    """Resample fields on a fixed 2D grid to a raster
+
+    Rotated pole and satellite swath grids are described by 2D
+    arrays of projected coordinates. Each pixel centre is matched to
+    its nearest grid point with a KD-tree, held once per grid. The
+    inverse map from pixels to grid indices and weights is computed
+    once per (grid, range, shape), after which resampling is a gather
+    of values. Pixels further from their nearest point than any of
+    that point's neighbours are outside the grid and masked
+
+    Building and applying the map only use ``scipy.spatial.cKDTree``
+    queries and numpy indexing, which release the GIL, so separate
+    layers can be resampled in parallel threads
+
+    .. code-block:: python
+
+        regridder = CurvilinearRegridder.cached(
+            gx, gy, x_range, y_range, plot_height, plot_width,
+            method="bilinear")
+        image = regridder(values)
+
+    :param gx: 2D array of projected x coordinates
+    :param gy: 2D array of projected y coordinates
+    :param x_range: (start, end) of raster along x
+    :param y_range: (start, end) of raster along y
+    :param plot_height: number of pixels along y
+    :param plot_width: number of pixels along x
+    :param method: "nearest" grid point or "bilinear" interpolation
+                   between the four surrounding grid points
+    """
+    _cache = _LRUCache(32)
+    _trees = _LRUCache(8)
+
+    def __init__(self, gx, gy, x_range, y_range, plot_height, plot_width,
+                 method="nearest"):
+        if method not in ("nearest", "bilinear"):
+            raise ValueError("unknown method: '{}'".format(method))
+        gx = np.ma.filled(np.ma.masked_invalid(gx).astype("d"), np.nan)
+        gy = np.ma.filled(np.ma.masked_invalid(gy).astype("d"), np.nan)
+        self.shape = (plot_height, plot_width)
+        self.method = method
+
+        # Pixel centres
+        dx = (x_range[1] - x_range[0]) / plot_width
+        dy = (y_range[1] - y_range[0]) / plot_height
+        px, py = np.meshgrid(x_range[0] + (np.arange(plot_width) + 0.5) * dx,
+                             y_range[0] + (np.arange(plot_height) + 0.5) * dy)
+        px, py = px.ravel(), py.ravel()
+
+        # Nearest grid point to each pixel
+        tree, points, radius = self._tree(gx, gy)
+        if len(points) == 0:
+            self.index = np.full(px.shape, -1)
+            self.weights = None
+            return
+        distance, nearest = tree.query(np.column_stack([px, py]),
+                                       workers=-1)
+        index = points[nearest]
+        inside = distance <= radius[nearest]
+        if method == "nearest":
+            self.index = np.where(inside, index, -1)
+            self.weights = None
+        else:
+            self.index, self.weights = self._bilinear(gx, gy, px, py, index)
+            self.index[:, ~inside] = -1
+
+    @classmethod
+    def cached(cls, gx, gy, x_range, y_range, plot_height, plot_width,
+               method="nearest"):
+        """Regridder memoised by grid, raster range, shape and method"""
+        x_range = tuple(float(x) for x in x_range)
+        y_range = tuple(float(y) for y in y_range)
+        key = (_digest(np.ma.filled(gx, np.nan), np.ma.filled(gy, np.nan)),
+               x_range, y_range, plot_height, plot_width, method)
+        regridder = cls._cache.get(key)
+        if regridder is None:
+            regridder = cls(gx, gy, x_range, y_range,
+                            plot_height, plot_width, method=method)
+            cls._cache.put(key, regridder)
+        return regridder
+
+    @classmethod
+    def _tree(cls, gx, gy):
+        """KD-tree of valid grid points and the extent of each point"""
+        key = _digest(gx, gy)
+        result = cls._trees.get(key)
+        if result is not None:
+            return result
+        valid = np.isfinite(gx) & np.isfinite(gy)
+        points = np.flatnonzero(valid)
+        tree = scipy.spatial.cKDTree(
+            np.column_stack([gx.ravel()[points], gy.ravel()[points]]))
+
+        # Furthest neighbouring grid point along either axis
+        radius = np.zeros(gx.shape)
+        for axis in (0, 1):
+            length = np.hypot(np.diff(gx, axis=axis), np.diff(gy, axis=axis))
+            length = np.where(np.isfinite(length), length, 0.)
+            lower = [slice(None)] * 2
+            upper = [slice(None)] * 2
+            lower[axis] = slice(None, -1)
+            upper[axis] = slice(1, None)
+            radius[tuple(lower)] = np.maximum(radius[tuple(lower)], length)
+            radius[tuple(upper)] = np.maximum(radius[tuple(upper)], length)
+        result = (tree, points, radius.ravel()[points])
+        cls._trees.put(key, result)
+        return result
+
+    @staticmethod
+    def _bilinear(gx, gy, px, py, index):
+        """Corner indices and weights of the cell around each pixel
+
+        Fractional grid indices are found by inverting a linear
+        approximation of the grid about the nearest point
+        """
+        ny, nx = gx.shape
+        j, i = np.divmod(index, nx)
+        dxdj, dxdi = _gradient(gx)
+        dydj, dydi = _gradient(gy)
+        a, b = dxdj.ravel()[index], dxdi.ravel()[index]
+        c, d = dydj.ravel()[index], dydi.ravel()[index]
+        ex = px - gx.ravel()[index]
+        ey = py - gy.ravel()[index]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            det = a * d - b * c
+            dj = (d * ex - b * ey) / det
+            di = (a * ey - c * ex) / det
+        ok = np.isfinite(dj) & np.isfinite(di)
+        fj = np.clip(np.where(ok, j + np.clip(dj, -1, 1), j), 0, ny - 1)
+        fi = np.clip(np.where(ok, i + np.clip(di, -1, 1), i), 0, nx - 1)
+        j0 = np.minimum(np.floor(fj).astype(int), max(ny - 2, 0))
+        i0 = np.minimum(np.floor(fi).astype(int), max(nx - 2, 0))
+        j1 = np.minimum(j0 + 1, ny - 1)
+        i1 = np.minimum(i0 + 1, nx - 1)
+        tj, ti = fj - j0, fi - i0
+        corners = np.array([j0 * nx + i0, j0 * nx + i1,
+                            j1 * nx + i0, j1 * nx + i1])
+        weights = np.array([(1 - tj) * (1 - ti), (1 - tj) * ti,
+                            tj * (1 - ti), tj * ti])
+        return corners, weights
+
+    def __call__(self, values):
+        """Resample values
+
+        :param values: array or masked array shaped like gx
+        :returns: masked array of shape (plot_height, plot_width)
+        """
+        values = np.ma.filled(np.ma.masked_invalid(values).astype("d"),
+                              np.nan).ravel()
+        if len(values) == 0:
+            samples = np.full(self.index.shape, np.nan)
+        else:
+            samples = np.take(values, self.index)
+            samples[self.index < 0] = np.nan
+        if self.weights is None:
+            image = samples
+        else:
+            # Average valid corners, skipping missing data
+            valid = np.isfinite(samples)
+            weights = np.where(valid, self.weights, 0.)
+            total = np.where(valid, samples * self.weights, 0.).sum(axis=0)
+            count = weights.sum(axis=0)
+            image = np.full(count.shape, np.nan)
+            np.divide(total, count, out=image, where=count > 0)
+        image = image.reshape(self.shape)
+        return np.ma.masked_array(image, mask=np.isnan(image))
+
+
+def _gradient(array):
+    """Derivatives along both axes of a grid with at least 2 points"""
+    result = []
+    for axis in (0, 1):
+        if array.shape[axis] > 1:
+            result.append(np.gradient(array, axis=axis))
+        else:
+            result.append(np.full(array.shape, np.nan))
+    return result
+
+
+def _axis_weights(centres, limits, n, method="rectilinear"):
+    """Sparse (n, len(centres)) matrix of cells that cover each pixel
+
+    Methods follow datashader's quadmesh aggregations. "rectilinear"
+    places cell edges midway between centres and assigns each cell
+    the pixels between its scaled edges, a cell narrower than a pixel
+    covers one pixel. "upsample" and "downsample" treat evenly spaced
+    centres as a raster, sampling the cell under each pixel centre or
+    the cells between each pair of pixel edges respectively
+    """
+    centres = np.asarray(centres, dtype="d")
+    m = len(centres)
+    if method == "rectilinear":
+        cells, pixels = _rectilinear_runs(centres, limits, n)
+    else:
+        pixels, cells = _raster_runs(centres, limits, n,
+                                     upsample=(method == "upsample"))
+    return scipy.sparse.csr_matrix(
+        (np.ones(len(pixels)), (pixels, cells)),
+        shape=(n, m))
+
+
+def _rectilinear_runs(centres, limits, n):
+    m = len(centres)
+    if m > 1:
+        deltas = np.diff(centres) / 2
+        edges = np.concatenate([[centres[0] - deltas[0]],
+                                centres[:-1] + deltas,
+                                [centres[-1] + deltas[-1]]])
     else:
-        mask = None
-    image = stretch_y(gy)(values)
-    if mask is not None:
-        image_mask = stretch_y(gy)(mask)
-        image = np.ma.masked_invalid(
-            np.ma.masked_array(image, mask=image_mask))
-    return image
+        edges = np.repeat(centres, 2)
+    scaled = (edges - limits[0]) / (limits[1] - limits[0])
+    cells = np.arange(m)
+    if scaled[0] > scaled[-1]:
+        scaled = scaled[::-1]
+        cells = cells[::-1]
+
+    # Cells that overlap the raster
+    k0 = max(np.searchsorted(scaled, 0., side="right") - 1, 0)
+    k1 = min(np.searchsorted(scaled, 1., side="left"), m)
+    pixels = np.clip((scaled[k0:k1 + 1] * n).astype(int), 0, n)
+    start = np.minimum(pixels[:-1], pixels[1:])
+    stop = np.maximum(pixels[:-1], pixels[1:])
+    stop = np.where((start == stop) & (stop != n), stop + 1, stop)
+    return _expand(cells[k0:k1], start, stop)
+
+
+def _raster_runs(centres, limits, n, upsample):
+    m = len(centres)
+    src0 = centres[0] - 0.5 * (centres[1] - centres[0])
+    src1 = centres[-1] + 0.5 * (centres[-1] - centres[-2])
+    scale = m * (limits[1] - limits[0]) / (n * (src1 - src0))
+    translate = m * (limits[0] - src0) / (src1 - src0)
+    pixels = np.arange(n)
+    if upsample:
+        cells = np.floor(scale * (pixels + 0.5) + translate).astype(int)
+        valid = (cells >= 0) & (cells < m)
+        return pixels[valid], cells[valid]
+    start = np.floor(scale * pixels + translate).astype(int)
+    stop = np.floor(scale * (pixels + 1) + translate).astype(int)
+    start, stop = np.minimum(start, stop), np.maximum(start, stop)
+    start = np.maximum(start, 0)
+    stop = np.minimum(stop, m)
+    return _expand(pixels, start, np.maximum(start, stop))
+
+
+def _expand(owners, start, stop):
+    """Pair each owner with every index in range(start, stop)"""
+    counts = stop - start
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts,
+                                                  counts)
+    return np.repeat(owners, counts), np.repeat(start, counts) + offsets
+
+
+def custom_stretch(values, gx, gy):
+    return stretch_y(gy)(values)
 
 
 def stretch_y(uneven_y):
@@ -146,59 +602,155 @@ def stretch_y(uneven_y):
     To remedy this effect an even-spaced resampling is performed
     in the projected space to make the pixels and grid line up
 
+    Rows are linearly interpolated using index fractions cached per
+    axis. Masked arrays are resampled in the same pass as their mask,
+    a pixel is masked only if every row contributing to it is masked
+
     .. note:: This approach assumes the grid is evenly spaced
               in longitude/latitude space prior to projection
     """
     if isinstance(uneven_y, list):
-        uneven_y = np.asarray(uneven_y, dtype=np.float)
-    even_y = np.linspace(
-        uneven_y.min(), uneven_y.max(), len(uneven_y),
-        dtype=np.float)
-    index = np.arange(len(uneven_y), dtype=np.float)
-    index_function = scipy.interpolate.interp1d(uneven_y, index)
-    index_fractions = index_function(even_y)
+        uneven_y = np.asarray(uneven_y, dtype="d")
+    rows = _stretch_rows(np.asarray(uneven_y))
 
     def wrapped(values, axis=0):
         if isinstance(values, list):
-            values = np.asarray(values, dtype=np.float)
+            values = np.asarray(values, dtype="d")
         assert values.ndim == 2, "Can only stretch 2D arrays"
         msg = "{} != {} do not match".format(values.shape[axis], len(uneven_y))
         assert values.shape[axis] == len(uneven_y), msg
-        if axis == 0:
-            i = index_fractions
-            j = np.arange(values.shape[1], dtype=np.float)
-        elif axis == 1:
-            i = np.arange(values.shape[0], dtype=np.float)
-            j = index_fractions
-        else:
+        if axis not in (0, 1):
             raise Exception("Can only handle axis 0 or 1")
-        return scipy.ndimage.map_coordinates(
-            values,
-            np.meshgrid(i, j, indexing="ij"),
-            order=1)
+        return _interpolate_rows(values, rows, axis)
     return wrapped
 
 
+_rows_cache = _LRUCache(64)
+
+
+def _stretch_rows(uneven_y):
+    """Lower row, upper row and weight of upper row for even rows"""
+    key = _digest(uneven_y)
+    rows = _rows_cache.get(key)
+    if rows is not None:
+        return rows
+    n = len(uneven_y)
+    even_y = np.linspace(uneven_y.min(), uneven_y.max(), n)
+    order = np.argsort(uneven_y, kind="stable")
+    fractions = np.interp(even_y, uneven_y[order], order.astype("d"))
+    lower = np.clip(np.floor(fractions).astype(int), 0, max(n - 2, 0))
+    upper = np.minimum(lower + 1, n - 1)
+    weight = np.clip(fractions - lower, 0., 1.)
+    rows = (lower, upper, weight)
+    _rows_cache.put(key, rows)
+    return rows
+
+
+def _interpolate_rows(values, rows, axis):
+    lower, upper, weight = rows
+    if axis == 0:
+        weight = weight[:, None]
+    else:
+        weight = weight[None, :]
+    data = np.ma.getdata(values)
+    below = np.take(data, lower, axis=axis).astype("d", copy=False)
+    above = np.take(data, upper, axis=axis).astype("d", copy=False)
+    if not np.ma.is_masked(values):
+        # below + weight * (above - below) without extra temporaries
+        above -= below
+        above *= weight
+        above += below
+        return above
+
+    # Weight only rows that are not masked
+    mask = np.ma.getmaskarray(values)
+    w_above = np.where(np.take(mask, upper, axis=axis), 0., weight)
+    w_below = np.where(np.take(mask, lower, axis=axis), 0., 1. - weight)
+    below = np.where(w_below > 0, below, 0.) * w_below
+    above = np.where(w_above > 0, above, 0.) * w_above
+    total = w_below + w_above
+    image = np.zeros(total.shape)
+    np.divide(below + above, total, out=image, where=total > 0)
+    return np.ma.masked_invalid(np.ma.masked_array(image, mask=total == 0))
+
+
 def to_180(x):
     y = x.copy()
     y[y > 180.] -= 360.
     return y
 
 
+EARTH_RADIUS = 6378137.  # Spherical radius used by Web Mercator
+
+
 def web_mercator(lons, lats):
-    return transform(
-            lons,
-            lats,
-            cartopy.crs.PlateCarree(),
-            cartopy.crs.Mercator.GOOGLE)
+    """Spherical Mercator projection used by map tiles
+
+    Closed-form equivalent of transforming from
+    ``cartopy.crs.PlateCarree()`` to ``cartopy.crs.Mercator.GOOGLE``,
+    longitudes outside [-180, 180] are wrapped
+
+    :returns: flattened x, y arrays in metres
+    """
+    lons = _wrap(np.ravel(np.asarray(lons, dtype="d")))
+    lats = np.ravel(np.asarray(lats, dtype="d"))
+    x = EARTH_RADIUS * np.radians(lons)
+    with np.errstate(invalid="ignore"):
+        y = EARTH_RADIUS * np.arcsinh(np.tan(np.radians(lats)))
+    return x, y
 
 
 def plate_carree(x, y):
-    return transform(
-            x,
-            y,
-            cartopy.crs.Mercator.GOOGLE,
-            cartopy.crs.PlateCarree())
+    """Inverse of :func:`web_mercator`
+
+    :returns: flattened longitude, latitude arrays in degrees
+    """
+    x = np.ravel(np.asarray(x, dtype="d"))
+    y = np.ravel(np.asarray(y, dtype="d"))
+    lons = _wrap(np.degrees(x / EARTH_RADIUS))
+    lats = np.degrees(np.arctan(np.sinh(y / EARTH_RADIUS)))
+    return lons, lats
+
+
+def _wrap(lons):
+    """Wrap longitudes outside [-180, 180] as PROJ does"""
+    outside = np.abs(lons) > 180.
+    if outside.any():
+        lons = np.where(outside, (lons + 180.) % 360. - 180., lons)
+    return lons
+
+
+_axes_cache = _LRUCache(64)
+
+
+def web_mercator_axes(lons, lats):
+    """Project model grid axes, memoised by grid
+
+    Model grids rarely change between files, so reprojecting a
+    grid that has been seen before is a dictionary lookup. 1D
+    axes are projected independently, 2D grids point by point
+
+    :param lons: 1D or 2D array of longitudes
+    :param lats: 1D or 2D array of latitudes
+    :returns: read-only x, y arrays shaped like lons, lats
+    """
+    lons = np.asarray(lons)
+    lats = np.asarray(lats)
+    key = _digest(lons, lats)
+    axes = _axes_cache.get(key)
+    if axes is not None:
+        return axes
+    if lons.ndim == 1:
+        gx = EARTH_RADIUS * np.radians(_wrap(np.asarray(lons, dtype="d")))
+        gy = web_mercator(np.zeros(len(lats), dtype="d"), lats)[1]
+    else:
+        gx, gy = web_mercator(lons, lats)
+        gx = gx.reshape(lons.shape)
+        gy = gy.reshape(lats.shape)
+    gx.flags.writeable = False
+    gy.flags.writeable = False
+    _axes_cache.put(key, (gx, gy))
+    return gx, gy
 
 
 def transform(x, y, src_crs, dst_crs):
@@ -18,7 +18,7 @@ import forest.mark
 import forest.state
 import forest.actions
 from forest import rx
-from forest.redux import Action, State, Store
+from forest.redux import Action, State, Store, set_in
 from forest.observe import Observable
 from forest import colors
 from forest.bases import Reusable
@@ -120,56 +120,62 @@ def next_index(state):
 
 
 def reducer(state: State, action: Action) -> State:
-    """Combine state and action to produce new state"""
-    state = copy.deepcopy(state)
-    if isinstance(state, dict):
-        state = forest.state.State.from_dict(state)
+    """Combine state and action to produce new state
+
+    Only the layers branch of state is copied
+    """
+    if isinstance(state, forest.state.State):
+        state = state.to_dict()
     if isinstance(action, dict):
         try:
             action = forest.actions.Action.from_dict(action)
         except TypeError:
-            return state.to_dict()
+            return state
+    if action.kind not in [SET_FIGURES, ON_ADD, ON_CLOSE, ON_EDIT,
+                           SAVE_LAYER, SET_ACTIVE]:
+        return state
 
+    layers = forest.state.Layers(**copy.deepcopy(state.get("layers", {})))
     if action.kind == SET_FIGURES:
-        state.layers.figures = action.payload
+        layers.figures = action.payload
 
     elif action.kind == ON_ADD:
-        state.layers.mode.state = "add"
+        layers.mode.state = "add"
 
     elif action.kind == ON_CLOSE:
         row_index = action.payload
         try:
-            layer_index = sorted(state.layers.index.keys())[row_index]
-            del state.layers.index[layer_index]
+            layer_index = sorted(layers.index.keys())[row_index]
+            del layers.index[layer_index]
         except IndexError:
             pass
 
     elif action.kind == ON_EDIT:
         row_index = action.payload
-        layer_index = sorted(state.layers.index.keys())[row_index]
-        state.layers.mode.state = "edit"
-        state.layers.mode.index = layer_index
+        layer_index = sorted(layers.index.keys())[row_index]
+        layers.mode.state = "edit"
+        layers.mode.index = layer_index
 
     elif action.kind == SAVE_LAYER:
         # NOTE: Layer index is stored in payload
         layer_index = action.payload["index"]
         settings = action.payload["settings"]
-        if layer_index in state.layers.index:
-            state.layers.index[layer_index].update(settings)
+        if layer_index in layers.index:
+            layers.index[layer_index].update(settings)
         else:
-            state.layers.index[layer_index] = settings
+            layers.index[layer_index] = settings
 
     elif action.kind == SET_ACTIVE:
         active = action.payload["active"]
         row_index = action.payload["row_index"]
-        row_to_layer = sorted(state.layers.index.keys())
+        row_to_layer = sorted(layers.index.keys())
         try:
             layer_index = row_to_layer[row_index]
-            state.layers.index[layer_index]["active"] = active
+            layers.index[layer_index]["active"] = active
         except IndexError:
             pass
 
-    return state.to_dict()
+    return set_in(state, ("layers",), layers.to_dict())
 
 
 def _connect(view, store):
@@ -509,6 +515,9 @@ class Layer(Reusable):
             # Layer-specific state
             layer_state = {}
             layer_state.update(state.to_dict())
+            if not getattr(self.map_view, "use_viewport", False):
+                # Avoid re-rendering on every pan/zoom
+                del layer_state["viewport"]
             if spec.variable != "":
                 layer_state.update(variable=spec.variable,
                                    colorbar=spec.colorbar)
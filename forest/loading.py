@@ -0,0 +1,185 @@
+"""
+Background loading
+------------------
+
+Reading a large field from disk can take seconds. Loaders called
+inside a store notification would block the Tornado IOLoop shared by
+every session served by a worker. Instead, loads run in a thread
+pool shared by all sessions, results are handed back to each Bokeh
+document with ``add_next_tick_callback`` so that models are only
+modified while the document lock is held.
+
+Threads are used rather than processes so that loaders and their
+caches are shared without pickling. netCDF-C and HDF5 are not
+thread-safe, so file reads are serialised by
+:data:`forest.disk.NETCDF_LOCK`. Threads still keep the IOLoop free
+while a file is read and let cache hits and encoding run meanwhile.
+
+A :class:`Latest` request keeps only the most recent load of a view,
+stale loads that have not started are cancelled and results of
+stale loads that have already started are discarded.
+
+.. code-block:: python
+
+    latest = Latest()
+    latest(lambda: loader.image(state), view.set_data)
+
+Outside a Bokeh server session, e.g. in tests or notebooks, loads
+run synchronously.
+
+.. autoclass:: Executor
+    :members:
+
+.. autoclass:: Latest
+    :members:
+
+.. autodata:: executor
+
+"""
+import threading
+import weakref
+import concurrent.futures
+from functools import partial
+import bokeh.io
+
+
+DEFAULT_WORKERS = 4
+
+
+class Executor:
+    """Thread pool shared by sessions
+
+    Keeps count of loads in progress per document so that a
+    loading state can be shown, see :meth:`add_listener`
+
+    :param max_workers: number of threads, 0 to load synchronously
+    """
+    def __init__(self, max_workers=DEFAULT_WORKERS):
+        self.max_workers = max_workers
+        self._pool = None
+        self._lock = threading.Lock()
+        self._pending = weakref.WeakKeyDictionary()
+        self._listeners = weakref.WeakKeyDictionary()
+
+    def resize(self, max_workers):
+        """Change number of threads used by future loads"""
+        if max_workers == self.max_workers:
+            return
+        with self._lock:
+            pool, self._pool = self._pool, None
+            self.max_workers = max_workers
+        if pool is not None:
+            pool.shutdown(wait=False)
+
+    @property
+    def pool(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="forest-loader")
+            return self._pool
+
+    def is_async(self, document):
+        """Loads are only moved off the event loop inside a session"""
+        return ((self.max_workers > 0) and
+                (getattr(document, "session_context", None) is not None))
+
+    def submit(self, document, load, done):
+        """Call load() in a thread and done(future) on the next tick
+
+        :returns: :class:`concurrent.futures.Future`
+        """
+        future = self.pool.submit(load)
+        self._change(document, +1)
+
+        def callback(future):
+            if future.cancelled():
+                return  # Counted by cancel()
+            try:
+                document.add_next_tick_callback(partial(self._done,
+                                                        document,
+                                                        done,
+                                                        future))
+            except RuntimeError:
+                # Document destroyed, session closed, nobody to notify
+                self._change(document, -1, notify=False)
+        future.add_done_callback(callback)
+        return future
+
+    def _done(self, document, done, future):
+        self._change(document, -1)
+        done(future)
+
+    def cancel(self, document, future):
+        """Cancel a load that has not started"""
+        if future.cancel():
+            self._change(document, -1)
+
+    def add_listener(self, document, listener):
+        """Call listener(pending) when number of loads changes"""
+        self._listeners.setdefault(document, []).append(listener)
+
+    def _change(self, document, step, notify=True):
+        with self._lock:
+            pending = self._pending.get(document, 0) + step
+            self._pending[document] = pending
+            listeners = list(self._listeners.get(document, []))
+        if (not notify) or (len(listeners) == 0):
+            return
+        if step > 0:
+            # May be called from any thread, listeners touch models
+            for listener in listeners:
+                document.add_next_tick_callback(partial(listener, pending))
+        else:
+            for listener in listeners:
+                listener(pending)
+
+
+executor = Executor()  #: Process-wide executor, resized by main
+
+
+class Latest:
+    """Load the most recent request only
+
+    :param executor: optional :class:`Executor`, defaults to
+                     process-wide executor
+    """
+    def __init__(self, executor=None):
+        self.executor = executor
+        self.generation = 0
+        self._future = None
+        self._document = None
+
+    @property
+    def loading(self):
+        """True until the result of the latest load is handed over"""
+        return self._future is not None
+
+    def __call__(self, load, done, document=None):
+        """Call done(load()) without blocking the event loop"""
+        pool = self.executor if self.executor is not None else executor
+        if document is None:
+            document = bokeh.io.curdoc()
+        self.generation += 1
+        if self._future is not None:
+            pool.cancel(self._document, self._future)
+            self._future = None
+        if not pool.is_async(document):
+            done(load())
+            return
+        generation = self.generation
+
+        def finish(future):
+            if generation != self.generation:
+                return  # User has moved on
+            self._future = None
+            try:
+                result = future.result()
+            except Exception as error:
+                print("load failed: {}".format(error))
+                return
+            done(result)
+
+        self._document = document
+        self._future = pool.submit(document, load, finish)
@@ -23,6 +23,11 @@ from forest import (
         navigate,
         parse_args)
 import forest.app
+import forest.cache
+import forest.map_view
+import forest.loading
+import forest.prefetch
+import forest.services
 import forest.actions
 import forest.components
 import forest.components.borders
@@ -52,6 +57,9 @@ def map_figure(x_range, y_range):
 def configure(argv=None):
     args = parse_args.parse_args(argv)
     data.AUTO_SHUTDOWN = args.auto_shutdown
+    # Images shared by worker processes on this host
+    if args.shared_memory and (forest.cache.image_cache.shared is None):
+        forest.cache.image_cache.shared = forest.cache.SharedStore()
     if len(args.files) > 0:
         if args.config_file is not None:
             raise Exception('--config-file and [FILE [FILE ...]] not compatible')
@@ -75,6 +83,21 @@ def main(argv=None):
         features = config.features
     data.FEATURE_FLAGS = features
 
+    # Memory budget shared by image loaders
+    if config.image_cache_max_bytes is not None:
+        forest.cache.image_cache.resize(config.image_cache_max_bytes)
+
+    # Threads shared by sessions to load images
+    if config.loader_workers is not None:
+        forest.loading.executor.resize(config.loader_workers)
+
+    # Speculative loads of neighbouring valid times and pressures
+    forest.prefetch.prefetcher.configure(**config.prefetch)
+
+    # Image format sent to browser
+    if config.image_transport is not None:
+        forest.map_view.IMAGE_TRANSPORT = config.image_transport
+
     # Full screen map
     viewport = config.default_viewport
     x_range, y_range = geo.web_mercator(
@@ -106,7 +129,7 @@ def main(argv=None):
 
     # Add optional sub-navigators
     sub_navigators = {
-        key: dataset.navigator()
+        key: forest.services.data.navigator(dataset, dataset.navigator())
         for key, dataset in datasets_by_pattern.items()
         if hasattr(dataset, "navigator")
     }
@@ -262,7 +285,8 @@ def main(argv=None):
 
     # Organise controls/settings
     layouts = {}
-    layouts["controls"] = []
+    layouts["controls"] = [
+        forest.components.Loading().connect().layout]
     if config.defaults.figures.ui:
         layouts["controls"] += [
                 bokeh.models.Div(text="Layout:"),
@@ -338,6 +362,15 @@ def main(argv=None):
         f.on_event(bokeh.events.Tap, tap_listener.update_xy)
         marker = screen.MarkDraw(f).connect(store)
 
+    # Connect viewport listener (figures share ranges) only if needed,
+    # since every pan/zoom then passes through the store
+    if any(getattr(dataset, "use_viewport", False)
+           for dataset in datasets.values()):
+        viewport_listener = screen.ViewportListener(figures[0])
+        viewport_listener.connect(store)
+        figures[0].on_event(bokeh.events.RangesUpdate,
+                            viewport_listener.update_ranges)
+
     control_root = bokeh.layouts.column(
             tabs,
             name="controls")
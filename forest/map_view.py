@@ -1,13 +1,20 @@
 from abc import ABC, abstractmethod
 import datetime as dt
+from functools import partial
 import numpy as np
+import bokeh.io
 import bokeh.models
 import forest.data
-from forest import geo, colors
+import forest.cache
+import forest.disk
+from forest import geo, colors, encode, loading, prefetch
 from forest.old_state import old_state, unique
 from forest.exceptions import FileNotFound, IndexNotFound
 
 
+IMAGE_TRANSPORT = "float64"  # See forest.encode, set by Config.image_transport
+
+
 def map_view(loader, color_mapper, use_hover_tool=True, tooltips=None):
     """Convenient method to simplify MapView construction"""
     if forest.data.FEATURE_FLAGS["multiple_colorbars"]:
@@ -49,6 +56,10 @@ class MapView(AbstractMapView):
     def image_sources(self):
         return self.um_view.image_sources
 
+    @property
+    def use_viewport(self):
+        return getattr(self.um_view, "use_viewport", False)
+
     def add_figure(self, figure):
         return self.um_view.add_figure(figure)
 
@@ -69,7 +80,22 @@ class ColorView:
 
 
 class ImageView(AbstractMapView):
-    def __init__(self, loader, color_mapper, use_hover_tool=True):
+    """Image glyph driven by a loader
+
+    Images are sent to the browser using a transport from
+    :mod:`forest.encode`, quantised images are decoded in the
+    browser by a transform on the image field
+
+    :param transport: optional transport, defaults to IMAGE_TRANSPORT
+    """
+    def __init__(self, loader, color_mapper, use_hover_tool=True,
+                 transport=None):
+        if transport is None:
+            transport = IMAGE_TRANSPORT
+        if transport not in encode.TRANSPORTS:
+            raise ValueError("unknown transport: '{}'".format(transport))
+        self.transport = transport
+        self.latest = loading.Latest()
         self.loader = loader
         self.color_mapper = color_mapper
         self.color_mapper.nan_color = bokeh.colors.RGB(0, 0, 0, a=0)
@@ -95,28 +121,109 @@ class ImageView(AbstractMapView):
             '@initial': 'datetime'
         }
 
+    @property
+    def use_viewport(self):
+        """Loader reads visible region only"""
+        return getattr(self.loader, "use_viewport", False)
+
     @old_state
     @unique
     def render(self, state):
-        self.source.data = self.loader.image(state)
+        """Load image in background, see :mod:`forest.loading`"""
+        document = bokeh.io.curdoc()
+        self.latest(partial(self.load, state), self.set_data,
+                    document=document)
+        if self.use_prefetch and loading.executor.is_async(document):
+            prefetch.prefetcher.prefetch(self, self.image, state)
+
+    @property
+    def use_prefetch(self):
+        """Loader keeps images in a cache that prefetch can fill"""
+        return isinstance(getattr(self.loader, "cache", None),
+                          forest.cache.ImageCache)
+
+    def image(self, state):
+        """Read glyph data, safe to call from any thread
+
+        Loaders are not thread-safe, reads are serialised by
+        :data:`forest.disk.NETCDF_LOCK`
+        """
+        with forest.disk.NETCDF_LOCK:
+            return self.loader.image(state)
+
+    def load(self, state):
+        """Read and encode glyph data, safe to call from any thread"""
+        return encode.encode_image(self.image(state), self.transport)
+
+    def set_data(self, data):
+        self.source.data = data
 
     def set_hover_properties(self, tooltips, formatters):
         self.tooltips = tooltips
         self.formatters = formatters
 
     def add_figure(self, figure):
+        formatters = dict(self.formatters)
+        if encode.is_quantised(self.transport):
+            image = bokeh.core.properties.field(
+                "image", transform=self.decode_transform())
+            formatters["@image"] = self.decode_formatter()
+        else:
+            image = "image"
         renderer = figure.image(
                 x="x",
                 y="y",
                 dw="dw",
                 dh="dh",
-                image="image",
+                image=image,
                 source=self.source,
                 color_mapper=self.color_mapper)
         if self.use_hover_tool:
             tool = bokeh.models.HoverTool(
                     renderers=[renderer],
                     tooltips=self.tooltips,
-                    formatters=self.formatters)
+                    formatters=formatters)
             figure.add_tools(tool)
         return renderer
+
+    def decode_transform(self):
+        """Browser-side conversion of quantised images to floats"""
+        return bokeh.models.CustomJSTransform(
+            args=dict(source=self.source),
+            v_func="""
+            const sentinel = %d
+            const images = new Array(xs.length)
+            for (let i = 0; i < xs.length; i++) {
+                const pixels = xs[i]
+                const [height, width] = pixels.shape
+                const scale = source.data["scale"][i]
+                const offset = source.data["offset"][i]
+                const values = new Float32Array(pixels.length)
+                for (let k = 0; k < pixels.length; k++) {
+                    values[k] = (pixels[k] == sentinel) ?
+                        NaN : pixels[k] * scale + offset
+                }
+                // Rows of a 2D image
+                const rows = new Array(height)
+                for (let j = 0; j < height; j++) {
+                    rows[j] = values.subarray(j * width, (j + 1) * width)
+                }
+                images[i] = rows
+            }
+            return images
+        """ % encode.sentinel(self.transport))
+
+    def decode_formatter(self):
+        """Hover tool formatter that shows decoded values"""
+        return bokeh.models.CustomJSHover(
+            args=dict(source=self.source),
+            code="""
+            const sentinel = %d
+            if (value == sentinel) {
+                return "NaN"
+            }
+            const i = special_vars.index
+            const number = value * source.data["scale"][i] +
+                source.data["offset"][i]
+            return number.toFixed(3)
+        """ % encode.sentinel(self.transport))
@@ -1,5 +1,9 @@
 
 
+from forest.redux import batch
+
+
+@batch
 class Navigator:
     """High-level Navigator
 
@@ -31,4 +31,8 @@ def add_arguments(parser):
     parser.add_argument(
         "--auto-shutdown", action="store_true", default=False,
         help="server shutdown on tab close - for desktop versions.")    
+    parser.add_argument(
+        "--shared-memory", action="store_true", default=False,
+        help=("share decoded images between worker processes, "
+              "see FOREST_SHARED_MEMORY_MB"))
     
\ No newline at end of file
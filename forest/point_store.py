@@ -0,0 +1,182 @@
+"""
+Point-friendly stores
+---------------------
+
+Model output is written one field at a time, so a time series or
+vertical profile at a single grid point needs a strided read that
+touches every chunk of a file. A point store holds a copy of each
+field rechunked into small horizontal tiles that span the full
+length of the other axes. A series or profile at any point is then
+a single chunk read.
+
+Stores are written by the ``forest-rechunk`` command, or in a
+background process started by :mod:`forest.app_hooks` for every
+dataset with a ``point_store_path`` in its configuration.
+:class:`forest.series.SeriesLoader` and
+:class:`forest._profile.ProfileLoader` read from a store when it is
+present and up to date, otherwise they read the NetCDF file.
+
+Stores use `Zarr <https://zarr.readthedocs.io>`_, which is optional.
+Without it stores are never written and loaders read NetCDF files.
+
+.. autoclass:: PointStore
+    :members:
+
+.. autofunction:: from_group
+
+"""
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+import numpy as np
+import netCDF4
+try:
+    import zarr
+except ImportError:
+    zarr = None
+
+
+class PointStore:
+    """Store of NetCDF variables chunked for point queries
+
+    Each file is kept in its own directory with one Zarr array per
+    variable and a ``meta.json`` recording the status of the source
+    file. Stores are built in a temporary directory and moved into
+    place, so readers never observe a partial store
+
+    .. code-block:: python
+
+        store = PointStore("/scratch/points")
+        store.build(path)
+        store.read(path, "air_temperature", j, i)
+
+    :param directory: location to write stores
+    :param chunks: horizontal tile size (ny, nx) of each chunk
+    :param max_bytes: memory used to copy each block of a variable
+    """
+    def __init__(self, directory, chunks=(16, 16),
+                 max_bytes=256 * 1024 ** 2):
+        self.directory = os.path.expanduser(directory)
+        self.chunks = tuple(chunks)
+        self.max_bytes = max_bytes
+
+    def __contains__(self, path):
+        return self.meta(path) is not None
+
+    def location(self, path):
+        """Directory used to store a particular file"""
+        text = os.path.abspath(path)
+        digest = hashlib.sha1(text.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, digest[:2], digest)
+
+    def meta(self, path):
+        """Stored variables or None if not built or stale"""
+        meta_path = os.path.join(self.location(path), "meta.json")
+        try:
+            with open(meta_path) as stream:
+                meta = json.load(stream)
+        except (OSError, ValueError):
+            return
+        if meta["version"] != _version(path):
+            return
+        return meta
+
+    def read(self, path, variable, j, i):
+        """Equivalent of ``var[..., j, i]`` from the store
+
+        :returns: masked array or None if variable is not stored
+        """
+        if zarr is None:
+            return
+        meta = self.meta(path)
+        if (meta is None) or (variable not in meta["variables"]):
+            return
+        try:
+            array = zarr.open_array(
+                os.path.join(self.location(path), meta["variables"][variable]),
+                mode="r")
+            values = array[..., int(j), int(i)]
+        except Exception as error:
+            print("point store: {}: {}".format(path, error))
+            return
+        return np.ma.masked_invalid(values)
+
+    def build(self, path):
+        """Rechunk every field of a NetCDF file"""
+        if zarr is None:
+            print("point store: zarr not installed, skipping {}".format(path))
+            return
+        version = _version(path)
+        location = self.location(path)
+        os.makedirs(os.path.dirname(location), exist_ok=True)
+        tmp_location = tempfile.mkdtemp(dir=os.path.dirname(location),
+                                        suffix=".tmp")
+        try:
+            variables = {}
+            with netCDF4.Dataset(path) as dataset:
+                for name, var in dataset.variables.items():
+                    if not self.is_field(var):
+                        continue
+                    key = "v{}".format(len(variables))  # Safe directory name
+                    self._copy(var, os.path.join(tmp_location, key))
+                    variables[name] = key
+            meta = {
+                "path": os.path.abspath(path),
+                "version": version,
+                "chunks": list(self.chunks),
+                "variables": variables
+            }
+            with open(os.path.join(tmp_location, "meta.json"), "w") as stream:
+                json.dump(meta, stream)
+            if os.path.exists(location):
+                shutil.rmtree(location)
+            os.rename(tmp_location, location)
+        except BaseException:
+            shutil.rmtree(tmp_location, ignore_errors=True)
+            raise
+
+    @staticmethod
+    def is_field(var):
+        """Numeric variables with axes other than the horizontal grid"""
+        return (len(var.dimensions) >= 3) and (var.dtype.kind in "fiu")
+
+    def _copy(self, var, location):
+        shape = var.shape
+        ny, nx = shape[-2:]
+        chunks = shape[:-2] + (min(self.chunks[0], ny),
+                               min(self.chunks[1], nx))
+        dtype = var.dtype if var.dtype.kind == "f" else np.dtype("f8")
+        array = zarr.open_array(location, mode="w", shape=shape,
+                                chunks=chunks, dtype=dtype,
+                                fill_value=np.nan)
+
+        # Copy whole rows of tiles, as many as fit in memory
+        row_bytes = int(np.prod(shape[:-2])) * nx * dtype.itemsize
+        rows = max(1, self.max_bytes // (max(row_bytes, 1) * chunks[-2]))
+        rows *= chunks[-2]
+        for start in range(0, ny, rows):
+            block = np.ma.asarray(var[..., start:start + rows, :])
+            array[..., start:start + rows, :] = np.ma.filled(
+                block.astype(dtype), np.nan)
+
+
+def from_group(group):
+    """Store described by a :class:`forest.config.FileGroup`
+
+    :returns: :class:`PointStore` or None if group has no
+              ``point_store_path``
+    """
+    path = getattr(group, "point_store_path", None)
+    if path is None:
+        return None
+    return PointStore(path)
+
+
+def _version(path):
+    try:
+        stat = os.stat(path)
+        return [stat.st_mtime_ns, stat.st_size]
+    except OSError:
+        return None
@@ -0,0 +1,223 @@
+"""
+Speculative prefetch
+--------------------
+
+Users mostly step through valid times with the keyboard or the
+play button of :class:`forest.components.TimeUI`. While the current
+image is on screen, a :class:`Prefetcher` loads the next and previous
+valid times and neighbouring pressure levels in a low priority thread
+pool. Loaders store the results in their caches, e.g.
+:data:`forest.cache.image_cache`, so that the next step is served
+from memory rather than disk.
+
+Prefetching is a trade of memory for latency. It stops when the
+image cache is close to its budget or the machine is low on memory,
+so that prefetched images never evict images that are being viewed.
+A message is printed when prefetching stops and when it resumes.
+
+Prefetches read files in background threads, so loads are passed in
+through :meth:`forest.map_view.ImageView.image`, which holds
+:data:`forest.disk.NETCDF_LOCK`.
+
+The budget can be set in the configuration file, see
+:attr:`forest.config.Config.prefetch`.
+
+.. code-block:: yaml
+
+    prefetch:
+      valid_times: 2   # Steps either side of current valid time
+      pressures: 1     # Levels either side of current pressure
+      workers: 1       # Threads, 0 disables prefetch
+
+.. autoclass:: Prefetcher
+    :members:
+
+.. autofunction:: neighbours
+
+.. autodata:: prefetcher
+
+"""
+import os
+import weakref
+import threading
+import concurrent.futures
+import numpy as np
+import forest.cache
+from forest.util import to_datetime as _to_datetime
+
+
+def neighbours(items, item, steps, key=None):
+    """Nearest items either side of item, closest first
+
+    Items after item are visited before items before it, since
+    users usually step forwards
+
+    .. code-block:: python
+
+        neighbours([1, 2, 3, 4, 5], 3, 2)  # [4, 2, 5, 1]
+
+    :param key: optional function to order and compare items
+    :returns: list of items, empty if item is not found
+    """
+    if (steps <= 0) or (items is None) or (item is None):
+        return []
+    if key is None:
+        key = _identity
+    try:
+        ordered = sorted(items, key=key)
+        keys = [key(x) for x in ordered]
+        target = key(item)
+    except Exception:
+        return []
+    index = _find(keys, target)
+    if index is None:
+        return []
+    result = []
+    for step in range(1, steps + 1):
+        for i in (index + step, index - step):
+            if 0 <= i < len(ordered):
+                result.append(ordered[i])
+    return result
+
+
+def _identity(x):
+    return x
+
+
+def _find(keys, target):
+    for i, value in enumerate(keys):
+        if isinstance(value, float):
+            if np.isclose(value, target):
+                return i
+        elif value == target:
+            return i
+
+
+def available_memory():
+    """Bytes of physical memory available or None if unknown"""
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+class Prefetcher:
+    """Warm loader caches around the state being viewed
+
+    :param valid_times: number of valid times either side to load
+    :param pressures: number of pressure levels either side to load
+    :param max_workers: threads used to prefetch, 0 to disable
+    :param cache: :class:`forest.cache.ImageCache` to watch for
+                  memory pressure, defaults to process-wide cache
+    :param max_fraction: fraction of cache budget above which
+                         prefetching stops
+    :param min_available: bytes of free memory below which
+                          prefetching stops
+    """
+    def __init__(self, valid_times=2, pressures=1, max_workers=1,
+                 cache=None, max_fraction=0.75,
+                 min_available=512 * 1024 ** 2):
+        if cache is None:
+            cache = forest.cache.image_cache
+        self.valid_times = valid_times
+        self.pressures = pressures
+        self.max_workers = max_workers
+        self.cache = cache
+        self.max_fraction = max_fraction
+        self.min_available = min_available
+        self._pool = None
+        self._lock = threading.Lock()
+        self._futures = weakref.WeakKeyDictionary()
+        self._skipping = False
+
+    def configure(self, valid_times=None, pressures=None, max_workers=None):
+        """Change budget, None leaves a setting unchanged"""
+        if valid_times is not None:
+            self.valid_times = valid_times
+        if pressures is not None:
+            self.pressures = pressures
+        if (max_workers is not None) and (max_workers != self.max_workers):
+            with self._lock:
+                pool, self._pool = self._pool, None
+                self.max_workers = max_workers
+            if pool is not None:
+                pool.shutdown(wait=False)
+
+    @property
+    def pool(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="forest-prefetch")
+            return self._pool
+
+    def states(self, state):
+        """States likely to be viewed next, most likely first
+
+        :param state: :class:`forest.db.control.State` namedtuple
+        """
+        result = []
+        for valid_time in neighbours(state.valid_times, state.valid_time,
+                                     self.valid_times, key=_to_datetime):
+            result.append(state._replace(valid_time=valid_time))
+        for pressure in neighbours(state.pressures, state.pressure,
+                                   self.pressures, key=float):
+            result.append(state._replace(pressure=pressure))
+        return result
+
+    def under_pressure(self):
+        """True if prefetching could evict images in use"""
+        stats = self.cache.stats
+        if stats.nbytes > self.max_fraction * self.cache.max_bytes:
+            return True
+        available = available_memory()
+        return (available is not None) and (available < self.min_available)
+
+    def prefetch(self, key, load, state):
+        """Call load(neighbour) for states around state in background
+
+        Prefetches previously queued for key that have not
+        started are cancelled
+
+        :param key: object identifying the caller, e.g. a view
+        :param load: thread-safe function f(state) that fills a cache
+        :returns: list of futures
+        """
+        self.cancel(key)
+        if self.max_workers <= 0:
+            return []
+        futures = []
+        for neighbour in self.states(state):
+            futures.append(self.pool.submit(self._load, load, neighbour))
+        with self._lock:
+            self._futures[key] = futures
+        return futures
+
+    def cancel(self, key):
+        """Cancel prefetches that have not started"""
+        with self._lock:
+            futures = self._futures.pop(key, [])
+        for future in futures:
+            future.cancel()
+
+    def _load(self, load, state):
+        skipping = self.under_pressure()
+        with self._lock:
+            changed, self._skipping = (skipping != self._skipping), skipping
+        if changed:
+            if skipping:
+                print("prefetch: skip, low on memory")
+            else:
+                print("prefetch: resume")
+        if skipping:
+            return False
+        try:
+            load(state)
+        except Exception as error:
+            print("prefetch: {}".format(error))
+            return False
+        return True
+
+
+prefetcher = Prefetcher()  #: Process-wide prefetcher, configured by main
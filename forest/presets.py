@@ -241,8 +241,14 @@ def reducer(state, action):
 
     :returns: next state
     """
-    state = copy.deepcopy(state)
     kind = action["kind"]
+    if kind not in [PRESET_SAVE, PRESET_LOAD, PRESET_REMOVE,
+                    PRESET_SET_META, PRESET_SET_LABELS]:
+        return state
+
+    # Copy-on-write, only presets are modified
+    state = dict(state)
+    state["presets"] = copy.deepcopy(state.get("presets", {}))
     if kind == PRESET_SAVE:
         label = action["payload"]
         _insert(state, label)
@@ -0,0 +1,200 @@
+"""
+Multi-resolution image pyramids
+-------------------------------
+
+Reprojecting a full resolution field onto a Web Mercator grid
+is the most expensive step in rendering an image. A pyramid
+stores the reprojected image once, together with successively
+halved overview levels, as memory-mapped ``.npy`` files on
+local disk. Loaders then serve the level nearest to the
+resolution of the figure, cropped to the visible region.
+
+Pyramids are written by the ``forest-pyramid`` command or in a
+background process started by :mod:`forest.app_hooks` for every
+dataset with a ``pyramid_path`` in its configuration.
+
+.. autoclass:: Pyramid
+    :members:
+
+.. autofunction:: downsample
+
+"""
+import os
+import json
+import hashlib
+import numpy as np
+
+
+DEFAULT_WIDTH = 1024  # Pixels assumed when viewport is unknown
+
+
+def downsample(values, factor=2):
+    """Average blocks of ``factor`` x ``factor`` pixels ignoring NaN
+
+    Arrays that do not divide evenly are padded with NaN
+
+    :returns: array of shape ``ceil(shape / factor)``
+    """
+    values = np.asarray(values, dtype="f4")
+    ny, nx = values.shape
+    my, mx = -(-ny // factor), -(-nx // factor)
+    padded = np.full((my * factor, mx * factor), np.nan, dtype="f4")
+    padded[:ny, :nx] = values
+    blocks = padded.reshape(my, factor, mx, factor)
+    valid = ~np.isnan(blocks)
+    total = np.where(valid, blocks, 0).sum(axis=(1, 3))
+    count = valid.sum(axis=(1, 3))
+    result = np.full((my, mx), np.nan, dtype="f4")
+    np.divide(total, count, out=result, where=count > 0)
+    return result
+
+
+class Pyramid:
+    """Store of Web Mercator image overviews on disk
+
+    Each (file, variable, index) is kept in its own directory
+    with one ``level_<n>.npy`` per resolution and a ``meta.json``
+    describing the extent of each level. The meta-data file is
+    written last so that readers never observe a partial pyramid
+
+    .. code-block:: python
+
+        pyramid = Pyramid("/scratch/pyramids")
+        pyramid.build(path, variable, pts, data)
+        pyramid.image(path, variable, pts, viewport)
+
+    :param directory: location to write pyramids
+    :param min_size: smallest overview in pixels along either axis
+    """
+    def __init__(self, directory, min_size=256):
+        self.directory = os.path.expanduser(directory)
+        self.min_size = min_size
+
+    def __contains__(self, key):
+        return self.meta(*key) is not None
+
+    def location(self, path, variable, pts):
+        """Directory used to store a particular field"""
+        text = json.dumps([os.path.abspath(path),
+                           variable,
+                           [int(i) for i in pts]])
+        digest = hashlib.sha1(text.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, digest[:2], digest)
+
+    def meta(self, path, variable, pts):
+        """Extent and level meta-data or None if not built or stale"""
+        meta_path = os.path.join(self.location(path, variable, pts),
+                                 "meta.json")
+        try:
+            with open(meta_path) as stream:
+                meta = json.load(stream)
+        except (OSError, ValueError):
+            return
+        try:
+            if meta["mtime"] != os.stat(path).st_mtime_ns:
+                return
+        except OSError:
+            pass
+        return meta
+
+    def build(self, path, variable, pts, data):
+        """Write overview levels of bokeh image glyph data
+
+        :param data: dict returned by :func:`forest.geo.stretch_image`
+        """
+        directory = self.location(path, variable, pts)
+        os.makedirs(directory, exist_ok=True)
+        image = np.ma.filled(
+            np.ma.masked_invalid(data["image"][0]).astype("f4"), np.nan)
+        shapes = []
+        level = 0
+        while True:
+            np.save(os.path.join(directory, "level_{}.npy".format(level)),
+                    image)
+            shapes.append(list(image.shape))
+            if min(image.shape) // 2 < self.min_size:
+                break
+            image = downsample(image)
+            level += 1
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            mtime = None
+        meta = {
+            "x": float(data["x"][0]),
+            "y": float(data["y"][0]),
+            "dw": float(data["dw"][0]),
+            "dh": float(data["dh"][0]),
+            "units": str(data.get("units", [""])[0]),
+            "shapes": shapes,
+            "mtime": mtime
+        }
+        tmp_path = os.path.join(directory, "meta.json.tmp")
+        with open(tmp_path, "w") as stream:
+            json.dump(meta, stream)
+        os.replace(tmp_path, os.path.join(directory, "meta.json"))
+
+    def image(self, path, variable, pts, viewport=None):
+        """Bokeh image glyph data from nearest level
+
+        :param viewport: optional :class:`forest.state.Viewport`, if
+                         given the image is cropped to the visible region
+        :returns: dict or None if pyramid has not been built
+        """
+        meta = self.meta(path, variable, pts)
+        if meta is None:
+            return
+        x, y = meta["x"], meta["y"]
+        full_ny, full_nx = meta["shapes"][0]
+        full_dx = meta["dw"] / full_nx
+        full_dy = meta["dh"] / full_ny
+        x_range, y_range, width = self._extent(viewport)
+        if x_range is None:
+            x_range = (x, x + meta["dw"])
+            y_range = (y, y + meta["dh"])
+
+        # Coarsest level that still resolves one pixel on screen
+        span = abs(x_range[1] - x_range[0])
+        level = 0
+        for i, (ny, nx) in enumerate(meta["shapes"]):
+            dx = full_dx * (2 ** i)
+            if (span / dx) >= (width or DEFAULT_WIDTH):
+                level = i
+        ny, nx = meta["shapes"][level]
+        dx = full_dx * (2 ** level)
+        dy = full_dy * (2 ** level)
+
+        # Crop to visible region
+        i0 = int(np.clip(np.floor((min(x_range) - x) / dx), 0, nx))
+        i1 = int(np.clip(np.ceil((max(x_range) - x) / dx), 0, nx))
+        j0 = int(np.clip(np.floor((min(y_range) - y) / dy), 0, ny))
+        j1 = int(np.clip(np.ceil((max(y_range) - y) / dy), 0, ny))
+        if (i1 <= i0) or (j1 <= j0):
+            return {"x": [], "y": [], "dw": [], "dh": [], "image": [],
+                    "units": []}
+        level_path = os.path.join(self.location(path, variable, pts),
+                                  "level_{}.npy".format(level))
+        values = np.load(level_path, mmap_mode="r")
+        return {
+            "x": [x + i0 * dx],
+            "y": [y + j0 * dy],
+            "dw": [(i1 - i0) * dx],
+            "dh": [(j1 - j0) * dy],
+            "image": [np.array(values[j0:j1, i0:i1])],
+            "units": [meta["units"]]
+        }
+
+    @staticmethod
+    def _extent(viewport):
+        if viewport is None:
+            return None, None, None
+        if isinstance(viewport, dict):
+            viewport = (viewport.get("x_range"),
+                        viewport.get("y_range"),
+                        viewport.get("width"))
+        else:
+            viewport = (viewport.x_range, viewport.y_range, viewport.width)
+        x_range, y_range, width = viewport
+        if (x_range is None) or (y_range is None):
+            return None, None, width
+        return x_range, y_range, width
@@ -1,6 +1,5 @@
 """Reducer"""
 import copy
-import forest.state
 from forest import (
     actions,
     redux,
@@ -25,11 +24,10 @@ def state_reducer(state, action):
             # TODO: Support Action throughout codebase
             return state
     # Reduce state
-    state = copy.deepcopy(state)
     if action.kind == actions.SET_STATE:
         state = copy.deepcopy(action.payload)
     elif action.kind == actions.UPDATE_STATE:
-        state.update(action.payload)
+        state = {**state, **action.payload}
     return state
 
 
@@ -42,13 +40,12 @@ def borders_reducer(state, action):
             # TODO: Support Action throughout codebase
             return state
     # Reduce state.borders
-    if isinstance(state, dict):
-        state = forest.state.State.from_dict(state)
     if action.kind == actions.SET_BORDERS_VISIBLE:
-        state.borders.visible = action.payload
+        state = redux.set_in(state, ("borders", "visible"), action.payload)
     elif action.kind == actions.SET_BORDERS_LINE_COLOR:
-        state.borders.line_color = action.payload
-    return state.to_dict()
+        state = redux.set_in(state, ("borders", "line_color"),
+                             action.payload)
+    return state
 
 
 reducer = redux.combine_reducers(
@@ -25,8 +25,44 @@ existing behaviour.
 
 .. autofunction:: combine_reducers
 
+.. autofunction:: batch
+
+Reducers must not modify the state they are given. Instead only
+the branch that changes is copied, every other branch is shared
+between the old and new state. This keeps dispatch cheap even
+when state holds long lists, e.g. valid times. Helpers to update
+nested state in this way are provided.
+
+.. autofunction:: set_in
+
+.. autofunction:: merge_in
+
+Selectors
+~~~~~~~~~
+
+Since unchanged branches are shared, a subscriber can detect
+that the part of state it depends on is unchanged by reference
+equality alone. A selector maps state to the props needed by a
+view, :func:`create_selector` memoises selectors so that equal
+inputs return the identical result.
+:meth:`Store.subscribe` only calls a view when its selected
+props change.
+
+.. code-block:: python
+
+    subscription = store.subscribe(select_keys("borders"), view.render)
+    subscription.skipped  # Number of renders avoided
+
+.. autofunction:: select
+
+.. autofunction:: create_selector
+
+.. autofunction:: select_keys
+
+.. autoclass:: Subscription
+   :members:
+
 """
-import copy
 import queue
 from functools import wraps
 from forest.observe import Observable
@@ -51,13 +87,198 @@ def combine_reducers(*reducers):
     :returns: reducer function
     """
     def wrapped(state, action):
-        state = copy.deepcopy(state)
         for reducer in reducers:
             state = reducer(state, action)
         return state
     return wrapped
 
 
+@export
+def set_in(state, keys, value):
+    """Copy-on-write assignment to nested dicts
+
+    Dicts along the path given by keys are copied, missing dicts
+    are created, all other branches are shared with state
+
+    .. code-block:: python
+
+        state = set_in(state, ("colorbar", "name"), "Viridis")
+
+    :returns: new state, original state is unchanged
+    """
+    key, *rest = keys
+    if len(rest) > 0:
+        value = set_in(state.get(key, {}), rest, value)
+    if (key in state) and (state[key] is value):
+        return state  # Nothing changed, keep reference
+    state = dict(state)
+    state[key] = value
+    return state
+
+
+@export
+def merge_in(state, keys, values):
+    """Copy-on-write update of a nested dict with new values
+
+    .. code-block:: python
+
+        state = merge_in(state, ("colorbar",), {"name": "Viridis"})
+
+    :returns: new state, original state is unchanged
+    """
+    node = state
+    for key in keys:
+        node = node.get(key, {})
+    return set_in(state, keys, {**node, **values})
+
+
+@export
+def select(*keys, default=None):
+    """Selector that returns a nested value of state
+
+    .. code-block:: python
+
+        select("colorbar", "limits")(state)
+
+    :param default: value returned if any key is missing
+    :returns: function f(state)
+    """
+    def selector(state):
+        node = state
+        for key in keys:
+            if not isinstance(node, dict) or (key not in node):
+                return default
+            node = node[key]
+        return node
+    return selector
+
+
+@export
+def create_selector(*selectors, combiner=None):
+    """Memoise a combination of selectors
+
+    The combiner is only called if one of the selected values
+    is not identical to its previous value, otherwise the
+    previous result is returned
+
+    :param selectors: functions f(state) that select parts of state
+    :param combiner: function of selected values, defaults to tuple
+                     of values or single value
+    :returns: function f(state)
+    """
+    if combiner is None:
+        if len(selectors) == 1:
+            combiner = _identity
+        else:
+            combiner = _pack
+    previous = None
+    result = None
+
+    def selector(state):
+        nonlocal previous, result
+        values = tuple(f(state) for f in selectors)
+        if (previous is None) or _references_changed(values, previous):
+            previous = values
+            result = combiner(*values)
+        return result
+    return selector
+
+
+@export
+def select_keys(*keys):
+    """Memoised selector of top-level branches of state
+
+    Views that render a whole state dict can be given a smaller
+    dict containing only the branches they need, missing keys are
+    left out so that defaults apply
+
+    .. code-block:: python
+
+        select_keys("borders")(state)  # {"borders": {...}}
+
+    :returns: function f(state) that returns a dict
+    """
+    def combiner(*values):
+        return {key: value for key, value in zip(keys, values)
+                if value is not _MISSING}
+    selectors = [select(key, default=_MISSING) for key in keys]
+    return create_selector(*selectors, combiner=combiner)
+
+
+_MISSING = object()
+
+
+def _identity(x):
+    return x
+
+
+def _pack(*values):
+    return values
+
+
+def _references_changed(values, previous):
+    return any(x is not y for x, y in zip(values, previous))
+
+
+def _changed(value, previous):
+    """Reference equality first, fall back to == if possible"""
+    if value is previous:
+        return False
+    try:
+        return bool(value != previous)
+    except (ValueError, TypeError):
+        # Ambiguous comparison, e.g. numpy arrays
+        return True
+
+
+@export
+class Subscription:
+    """Call a listener when selected props change
+
+    :param selector: function f(state) that returns props
+    :param listener: function called with props
+    """
+    def __init__(self, selector, listener):
+        self.selector = selector
+        self.listener = listener
+        self.renders = 0
+        self.skipped = 0
+        self._called = False
+        self._props = None
+
+    def __call__(self, state):
+        props = self.selector(state)
+        if self._called and not _changed(props, self._props):
+            self.skipped += 1
+            return
+        self._called = True
+        self._props = props  # Important: must be before listener
+        self.renders += 1
+        self.listener(props)
+
+
+@export
+def batch(middleware):
+    """Mark middleware whose actions should be reduced together
+
+    A middleware that translates one action into several, e.g.
+    setting a variable also sets valid times and pressures, would
+    otherwise trigger a render for each action. Works with functions
+    and middleware classes
+
+    .. code-block:: python
+
+        @batch
+        def middleware(store, action):
+            yield action
+            yield set_value("valid_times", valid_times)
+
+    :returns: middleware with ``batch`` attribute set to True
+    """
+    middleware.batch = True
+    return middleware
+
+
 @export
 class Store(Observable):
     """Observable state container
@@ -86,9 +307,19 @@ class Store(Observable):
         self.state = initial_state if initial_state is not None else {}
         self.middlewares = middlewares
         self.in_progress = False
+        self.batch_depth = 0
         self.queue = queue.Queue()
         super().__init__()
 
+    def subscribe(self, selector, listener):
+        """Notify listener only when selected props change
+
+        :returns: :class:`Subscription`
+        """
+        subscription = Subscription(selector, listener)
+        self.add_subscriber(subscription)
+        return subscription
+
     def dispatch(self, action):
         """Apply reducer and notify listeners of new state
 
@@ -109,15 +340,30 @@ class Store(Observable):
             self.queue.task_done()
 
     def sync_process(self, action):
-        """Pass action through middleware/reducer pipeline"""
+        """Pass action through middleware/reducer pipeline
+
+        Actions emitted by a :func:`batch` middleware in response
+        to a single action are reduced together, subscribers are
+        notified once with the final state
+        """
         actions = self.pure(action)
         for middleware in self.middlewares:
             actions = self.bind(middleware, self, actions)
+        pending = False
         for _action in actions:
             self.state = self.reducer(self.state, _action)
-            self.in_progress = True
-            self.notify(self.state)
-            self.in_progress = False
+            if self.batch_depth > 0:
+                pending = True  # Notify after last action in batch
+                continue
+            pending = False
+            self._notify_state()
+        if pending:
+            self._notify_state()
+
+    def _notify_state(self):
+        self.in_progress = True
+        self.notify(self.state)
+        self.in_progress = False
 
     @staticmethod
     def pure(action):
@@ -127,5 +373,13 @@ class Store(Observable):
     @staticmethod
     def bind(middleware, store, actions):
         """Flat map action generators from middleware into action generator"""
+        is_batch = getattr(middleware, "batch", False)
         for action in actions:
-            yield from middleware(store, action)
+            if not is_batch:
+                yield from middleware(store, action)
+                continue
+            store.batch_depth += 1
+            try:
+                yield from middleware(store, action)
+            finally:
+                store.batch_depth -= 1
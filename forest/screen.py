@@ -20,29 +20,30 @@ responsible only for a limited set of actions
 
 """
 
-import copy
 import bokeh.events
 import bokeh.models
 from forest import rx
-from forest.redux import Action
+from forest.redux import Action, set_in
 from forest.observe import Observable
 
 SET_POSITION = "SET_POSITION"
+SET_VIEWPORT = "SET_VIEWPORT"
 
 def reducer(state, action):
     """Screen specific reducer
 
     Given :func:`screen.set_position` action adds "position" data
-    to state
+    to state, similarly :func:`screen.set_viewport` adds "viewport"
 
     :param state: data structure representing current state
     :type state: dict
     :param action: data structure representing action
     :type action: dict
     """
-    state = copy.deepcopy(state)
     if action["kind"] == SET_POSITION:
-        state["position"] = action["payload"]
+        state = set_in(state, ("position",), action["payload"])
+    elif action["kind"] == SET_VIEWPORT:
+        state = set_in(state, ("viewport",), action["payload"])
     return state
 
 def set_position(x, y) -> Action:
@@ -64,6 +65,31 @@ def set_position(x, y) -> Action:
     return {"kind": SET_POSITION, "payload": {"x": x, "y": y}}
 
 
+def set_viewport(x_range, y_range, width=None, height=None) -> Action:
+    """Action that stores the visible map extent
+
+    .. code-block:: python
+
+        {
+            "kind": "SET_VIEWPORT",
+            "payload": {
+                "x_range": (x0, x1),
+                "y_range": (y0, y1),
+                "width": width,
+                "height": height
+            }
+        }
+
+    :returns: data representing action
+    :rtype: dict
+    """
+    return {"kind": SET_VIEWPORT, "payload": {
+        "x_range": tuple(x_range),
+        "y_range": tuple(y_range),
+        "width": width,
+        "height": height}}
+
+
 class TapListener(Observable):
     """ Listen for bokeh.events.Tap and update the store. Wired up in main.py"""
 
@@ -77,6 +103,25 @@ class TapListener(Observable):
         self.notify(set_position(event.x, event.y))
 
 
+class ViewportListener(Observable):
+    """Listen for bokeh.events.RangesUpdate and update the store"""
+
+    def __init__(self, figure):
+        self.figure = figure
+        super().__init__()
+
+    def connect(self, store):
+        self.add_subscriber(store.dispatch)
+
+    def update_ranges(self, event):
+        width = self.figure.inner_width or self.figure.plot_width
+        height = self.figure.inner_height or self.figure.plot_height
+        self.notify(set_viewport((event.x0, event.x1),
+                                 (event.y0, event.y1),
+                                 width,
+                                 height))
+
+
 class MarkDraw:
     """
     Subscribe to forest state, update marker position when position state
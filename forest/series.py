@@ -15,6 +15,21 @@ changes.
 .. autoclass:: SeriesLocator
     :members:
 
+Point extraction
+~~~~~~~~~~~~~~~~
+
+Tapping the map asks for the same few points again and again.
+Coordinates of each file and the values at each grid point are held
+in a byte-limited :data:`point_cache`, keyed by file status so that
+rewritten files are read again. Files are read one at a time while
+holding :data:`forest.disk.NETCDF_LOCK`, since netCDF-C is not
+thread-safe. Values are read in slabs aligned to the chunks of the
+leading axis so that each compressed chunk is decoded once. Files
+rechunked into a :class:`forest.point_store.PointStore` are read
+from the store instead.
+
+.. autodata:: point_cache
+
 Selector
 ~~~~~~~~
 
@@ -35,6 +50,9 @@ import bokeh.palettes
 import bokeh.models
 import numpy as np
 import netCDF4
+import forest.cache
+import forest.disk
+import forest.point_store
 from forest import geo
 from forest.observe import Observable
 from forest.redux import Action
@@ -145,7 +163,9 @@ class SeriesView(Observable):
         for group in groups:
             if group.file_type == "unified_model":
                 pattern = group.full_pattern
-                loaders[group.label] = SeriesLoader.from_pattern(pattern)
+                loaders[group.label] = SeriesLoader.from_pattern(
+                    pattern,
+                    point_store=forest.point_store.from_group(group))
         return cls(figure, loaders)
 
     def render(self, initial_time, variable, x, y, visible, pressure=None):
@@ -165,14 +185,27 @@ class SeriesView(Observable):
                         pressure)
 
 
+point_cache = forest.cache.ImageCache(max_bytes=64 * 1024 ** 2)  #: Process-wide
+
+
 class SeriesLoader(object):
-    """Time series loader"""
-    def __init__(self, paths):
+    """Time series loader
+
+    :param paths: NetCDF files
+    :param cache: optional :class:`forest.cache.ImageCache`, defaults
+                  to :data:`point_cache`
+    :param point_store: optional :class:`forest.point_store.PointStore`
+    """
+    def __init__(self, paths, cache=None, point_store=None):
+        if cache is None:
+            cache = point_cache
         self.locator = SeriesLocator(paths)
+        self.cache = cache
+        self.point_store = point_store
 
     @classmethod
-    def from_pattern(cls, pattern):
-        return cls(sorted(glob.glob(os.path.expanduser(pattern))))
+    def from_pattern(cls, pattern, **kwargs):
+        return cls(sorted(glob.glob(os.path.expanduser(pattern))), **kwargs)
 
     def series(self,
             initial_time,
@@ -198,7 +231,8 @@ class SeriesLoader(object):
             return self._load_netcdf4(*args, **kwargs)
         except Exception as ex:
             print("WARNING: exception in loading revert to iris.load_cube ", type(ex).__name__)
-            return self._load_cube(*args, **kwargs)
+            with forest.disk.NETCDF_LOCK:
+                return self._load_cube(*args, **kwargs)
 
     def _load_cube(self, path, variable, lon0, lat0, pressure=None):
         """ Constrain data loading to points required """
@@ -230,34 +264,73 @@ class SeriesLoader(object):
             "y": values}
 
     def _load_netcdf4(self, path, variable, lon0, lat0, pressure=None):
-        with netCDF4.Dataset(path) as dataset:
+        version = self._version(path)
+        axes = self.cache.get_or_load(
+            (path, version, variable, "axes"),
+            lambda: self._load_axes(path, variable),
+            path=path)
+        if len(axes) == 0:
+            return {"x": [], "y": []}  # Variable not in file
+        i = np.argmin(np.abs(axes["lons"] - lon0))
+        j = np.argmin(np.abs(axes["lats"] - lat0))
+        # Key shared with forest._profile.ProfileLoader
+        values = self.cache.get_or_load(
+            (path, version, variable, int(i), int(j)),
+            lambda: self._load_point(path, variable, j, i),
+            path=path)["values"]
+        times = axes["times"]
+        if axes["pressures"] is not None:
+            pressures = axes["pressures"]
+            if axes["ndim"] == 3:
+                pts = self.search(pressures, pressure)
+                values = values[pts]
+                try:
+                    times = times[pts]
+                except TypeError:
+                    times = [times]
+            else:
+                mask = self.search(pressures, pressure)
+                values = values[:, mask][:, 0]
+        return {
+            "x": times,
+            "y": values}
+
+    @staticmethod
+    def _version(path):
+        try:
+            stat = os.stat(path)
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+
+    def _load_axes(self, path, variable):
+        """Coordinates needed to search a variable, empty if missing"""
+        with forest.disk.NETCDF_LOCK, netCDF4.Dataset(path) as dataset:
             try:
                 var = dataset.variables[variable]
             except KeyError:
-                return {"x": [], "y": []}
-            lons = geo.to_180(self._longitudes(dataset, var))
-            lats = self._latitudes(dataset, var)
-            i = np.argmin(np.abs(lons - lon0))
-            j = np.argmin(np.abs(lats - lat0))
-            times = self._times(dataset, var)
-            values = var[..., j, i]
+                return {}
             if (
                     ("pressure" in var.coordinates) or
                     ("pressure" in var.dimensions)):
                 pressures = self._pressures(dataset, var)
-                if len(var.dimensions) == 3:
-                    pts = self.search(pressures, pressure)
-                    values = values[pts]
-                    try:
-                        times = times[pts]
-                    except TypeError:
-                        times = [times]
-                else:
-                    mask = self.search(pressures, pressure)
-                    values = values[:, mask][:, 0]
-        return {
-            "x": times,
-            "y": values}
+            else:
+                pressures = None
+            return {
+                "lons": geo.to_180(self._longitudes(dataset, var)),
+                "lats": self._latitudes(dataset, var),
+                "times": self._times(dataset, var),
+                "pressures": pressures,
+                "ndim": len(var.dimensions)}
+
+    def _load_point(self, path, variable, j, i):
+        if self.point_store is not None:
+            values = self.point_store.read(path, variable, j, i)
+            if values is not None:
+                return {"values": values}
+        with forest.disk.NETCDF_LOCK, netCDF4.Dataset(path) as dataset:
+            var = dataset.variables[variable]
+            return {"values": forest.disk.read_point(var, j, i)}
 
     @staticmethod
     def _times(dataset, variable):
@@ -315,7 +388,7 @@ class SeriesLocator(object):
             time = _initial_time(path)
             if time is None:
                 try:
-                    with netCDF4.Dataset(path) as dataset:
+                    with forest.disk.NETCDF_LOCK, netCDF4.Dataset(path) as dataset:
                         var = dataset.variables["forecast_reference_time"]
                         time = netCDF4.num2date(var[:], units=var.units)
                 except KeyError:
@@ -20,7 +20,35 @@ state to allow reproduction at a later date.
 .. autoclass:: NullNavigator
    :members:
 
+
+Shared data
+-----------
+
+Every browser session runs :func:`forest.main.main` and builds its own
+navigators. Sessions served by the same process can instead share
+answers to navigation queries through ``forest.services.data``, a
+thread-safe :class:`DataService`. Concurrent identical queries are
+de-duplicated, so twenty sessions opened at once read each file once.
+Decoded images are shared in the same way by
+:meth:`forest.cache.ImageCache.get_or_load`.
+
+.. code-block:: python
+
+    navigator = forest.services.data.navigator(dataset, dataset.navigator())
+
+.. autoclass:: DataService
+   :members:
+
+.. autoclass:: SharedNavigator
+   :members:
+
 """
+import time
+import threading
+from collections import OrderedDict
+from functools import partial
+from forest.cache import SingleFlight
+from forest.disk import NETCDF_LOCK
 
 
 class NullNavigator:
@@ -92,3 +120,111 @@ class NavigatorServiceLocator:
 
 
 navigation = NavigatorServiceLocator()  # TODO: Find a better place to configure this
+
+
+class DataService:
+    """Process-wide store of navigation meta-data
+
+    Answers are kept for a short time, new files are picked up when
+    entries expire or when :meth:`invalidate` is called by the file
+    watcher
+
+    :param ttl: seconds an answer is shared before it is re-computed
+    :param max_entries: upper limit on number of answers held
+    """
+    def __init__(self, ttl=10., max_entries=4096):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+
+    def call(self, key, compute):
+        """Shared value of compute() or compute once if expired
+
+        :param key: hashable description of the query
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if (entry is not None) and ((now - entry[0]) < self.ttl):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        def load():
+            value = compute()
+            with self._lock:
+                self._entries[key] = (time.monotonic(), value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            return value
+        return self._flight.do(key, load)
+
+    def invalidate(self):
+        """Discard all answers, e.g. when new files arrive"""
+        with self._lock:
+            self._entries.clear()
+
+    def navigator(self, name, navigator):
+        """Wrap a session navigator to share its answers
+
+        :param name: hashable shared by equivalent navigators, e.g.
+                     the process-wide dataset
+        :returns: :class:`SharedNavigator`
+        """
+        return SharedNavigator(self, name, navigator)
+
+
+class SharedNavigator:
+    """Navigator whose answers are shared between sessions
+
+    Answers are shared, callers must not modify returned values.
+    Other attributes, including middleware ``__call__``, are passed
+    through to the wrapped navigator
+    """
+    def __init__(self, service, name, navigator):
+        self.service = service
+        self.name = name
+        self.navigator = navigator
+
+    def __call__(self, store, action):
+        return self.navigator(store, action)
+
+    def __getattr__(self, attr):
+        return getattr(self.navigator, attr)
+
+    def variables(self, *args, **kwargs):
+        return self._call("variables", args, kwargs)
+
+    def initial_times(self, *args, **kwargs):
+        return self._call("initial_times", args, kwargs)
+
+    def valid_times(self, *args, **kwargs):
+        return self._call("valid_times", args, kwargs)
+
+    def pressures(self, *args, **kwargs):
+        return self._call("pressures", args, kwargs)
+
+    def _call(self, method, args, kwargs):
+        compute = partial(_locked, getattr(self.navigator, method),
+                          *args, **kwargs)
+        key = (self.name, method, args, tuple(sorted(kwargs.items())))
+        try:
+            hash(key)
+        except TypeError:
+            return compute()  # e.g. array arguments
+        return self.service.call(key, compute)
+
+
+def _locked(method, *args, **kwargs):
+    # Navigators read files that loader threads may also be reading
+    with NETCDF_LOCK:
+        return method(*args, **kwargs)
+
+
+data = DataService()
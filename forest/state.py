@@ -211,6 +211,21 @@ class Position:
     y: float = -1e9  # South pole
 
 
+@dataclass
+class Viewport:
+    """Visible region of the map figure
+
+    :param x_range: (start, end) in WebMercator coordinates
+    :param y_range: (start, end) in WebMercator coordinates
+    :param width: figure width in screen pixels
+    :param height: figure height in screen pixels
+    """
+    x_range: tuple = None
+    y_range: tuple = None
+    width: int = None
+    height: int = None
+
+
 @dataclass
 class Tools:
     """Flags to specify active tools
@@ -272,6 +287,8 @@ class State:
     :type tools: Tools
     :param position: Used by tools to determine geographic position
     :type position: Position
+    :param viewport: Visible map extent used by windowed loaders
+    :type viewport: Viewport
     :param presets: Save colorbar settings for later re-use
     :type presets: Presets
     :param borders: Cartopy coastline, lakes and border settings
@@ -296,6 +313,7 @@ class State:
     tile: Tile = field(default_factory=Tile)
     tools: Tools = field(default_factory=Tools)
     position: Position = field(default_factory=Position)
+    viewport: Viewport = field(default_factory=Viewport)
     presets: Presets = field(default_factory=Presets)
     borders: Borders = field(default_factory=Borders)
     bokeh: Bokeh = field(default_factory=Bokeh)
@@ -314,6 +332,8 @@ class State:
             self.tools = Tools(**self.tools)
         if isinstance(self.position, dict):
             self.position = Position(**self.position)
+        if isinstance(self.viewport, dict):
+            self.viewport = Viewport(**self.viewport)
         if isinstance(self.layers, dict):
             self.layers = Layers(**self.layers)
         if isinstance(self.presets, dict):
@@ -18,22 +18,20 @@ the components that depend on state changes
 
 """
 
-import copy
 import bokeh.layouts
 import bokeh.models
 from forest.observe import Observable
-from forest.redux import Action, State
+from forest.redux import Action, State, set_in, select_keys
 
 ON_TOGGLE_TOOL = "TOGGLE_TOOL_VISIBILITY"
 
 
 def reducer(state: State, action: Action):
     """ Reduce a change in state caused by the ToolsPanel"""
-    state = copy.deepcopy(state)
     if action["kind"] == ON_TOGGLE_TOOL:
         if state.get("tools") is None:
-            state["tools"] = {}
-        state["tools"][action["tool_name"]] = action["value"]
+            state = set_in(state, ("tools",), {})
+        state = set_in(state, ("tools", action["tool_name"]), action["value"])
     return state
 
 def on_toggle_tool(tool_name, value) -> Action:
@@ -71,7 +69,7 @@ class ToolLayout:
         self.profile_figure = profile_figure
 
     def connect(self, store):
-        store.add_subscriber(self.render)
+        store.subscribe(select_keys("tools"), self.render)
 
     def render(self, state):
         children = []
@@ -1,4 +1,5 @@
 import glob
+import fnmatch
 import os
 import re
 import datetime as dt
@@ -14,7 +15,15 @@ except ImportError:
     pass
 
 
+_timeout_caches = []
+
+
 def timeout_cache(interval):
+    """Cache results of a single argument function for an interval
+
+    Cached values can be discarded early with ``wrapped.invalidate(x)``
+    or by :func:`invalidate_caches` when a matching file appears
+    """
     def decorator(f):
         cache = {}
         call_time = {}
@@ -33,10 +42,26 @@ def timeout_cache(interval):
                     return cache[x]
                 else:
                     return cache[x]
+        def invalidate(x):
+            cache.pop(x, None)
+            call_time.pop(x, None)
+        wrapped.invalidate = invalidate
+        wrapped.keys = lambda: list(cache.keys())
+        _timeout_caches.append(wrapped)
         return wrapped
     return decorator
 
 
+def invalidate_caches(path):
+    """Discard timeout_cache entries whose glob pattern matches path"""
+    for wrapped in _timeout_caches:
+        for key in wrapped.keys():
+            if not isinstance(key, str):
+                continue
+            if fnmatch.fnmatch(path, os.path.expanduser(key)):
+                wrapped.invalidate(key)
+
+
 _timeout_globs = {}
 
 
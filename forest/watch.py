@@ -0,0 +1,206 @@
+"""
+File system watcher
+-------------------
+
+New model output should appear in menus as soon as it is written.
+A :class:`Watcher` reports files created or overwritten inside a set
+of directories using inotify if ``inotify_simple`` is installed.
+Otherwise, or on file systems that do not deliver inotify events such
+as S3 mounts, it polls, listing only directories whose modification
+time changed and checking known files for a new modification time or
+size.
+
+Directories can be given as a function, e.g. one that expands the
+glob patterns of every dataset, so that directories created after
+the server started, such as a new model run, are watched too.
+
+.. autoclass:: Watcher
+    :members:
+
+.. autofunction:: directories
+
+"""
+import os
+import glob
+import time
+from forest.observe import Observable
+try:
+    import inotify_simple
+except ImportError:
+    inotify_simple = None
+
+
+def directories(pattern, directory=None):
+    """Directories that may contain files matching a glob pattern
+
+    :param directory: optional leaf directory prepended to pattern
+    """
+    if directory is not None:
+        pattern = os.path.join(directory, os.path.basename(pattern))
+    pattern = os.path.dirname(os.path.expanduser(pattern)) or "."
+    return sorted(path for path in glob.glob(pattern)
+                  if os.path.isdir(path))
+
+
+class Watcher(Observable):
+    """Detect files added to or overwritten in directories
+
+    The first call to :meth:`poll` reports every file already present
+    so that subscribers can catch up, later calls report new and
+    changed files only
+
+    .. code-block:: python
+
+        watcher = Watcher(["/data/model"])
+        watcher.add_subscriber(print)
+        watcher.poll()  # Notifies subscribers with list of new paths
+
+    :param directories: list of directories to watch or function that
+                        returns one, called again every
+                        ``expand_interval`` seconds to find new
+                        directories
+    :param use_inotify: False to always poll, None to use inotify
+                        if available
+    :param expand_interval: seconds between calls to directories
+    """
+    def __init__(self, directories, use_inotify=None, expand_interval=60.):
+        super().__init__()
+        if callable(directories):
+            self._expand = directories
+            directories = directories()
+        else:
+            self._expand = None
+        self.directories = list(directories)
+        if use_inotify is None:
+            use_inotify = inotify_simple is not None
+        self.use_inotify = use_inotify
+        self.expand_interval = expand_interval
+        self._expanded = time.monotonic()
+        self._mtimes = {}
+        self._stats = {}
+        self._inotify = None
+        self._watches = {}
+        self._started = False
+
+    def poll(self):
+        """Find new files and notify subscribers
+
+        :returns: list of new paths
+        """
+        if not self._started:
+            paths = self._snapshot()
+            self._started = True
+        elif self._inotify is not None:
+            paths = self._read_events() + self._expand_directories()
+        else:
+            paths = self._scan() + self._expand_directories()
+        if len(paths) > 0:
+            self.notify(paths)
+        return paths
+
+    def close(self):
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+    def _snapshot(self):
+        if self.use_inotify:
+            self._inotify = inotify_simple.INotify(nonblocking=True)
+            for directory in self.directories:
+                self._add_watch(directory)
+        paths = []
+        for directory in self.directories:
+            paths += self._list(directory)
+        return paths
+
+    def _add_watch(self, directory):
+        flags = (inotify_simple.flags.CLOSE_WRITE |
+                 inotify_simple.flags.MOVED_TO)
+        try:
+            wd = self._inotify.add_watch(directory, flags)
+        except OSError:
+            return  # Removed since it was found
+        self._watches[wd] = directory
+
+    def _expand_directories(self):
+        """Start watching directories created since last expansion
+
+        :returns: paths of files inside new directories
+        """
+        if self._expand is None:
+            return []
+        now = time.monotonic()
+        if (now - self._expanded) < self.expand_interval:
+            return []
+        self._expanded = now
+        paths = []
+        for directory in sorted(set(self._expand()) - set(self.directories)):
+            self.directories.append(directory)
+            if self._inotify is not None:
+                self._add_watch(directory)
+            paths += self._list(directory)
+        return paths
+
+    def _read_events(self):
+        paths = []
+        for event in self._inotify.read(timeout=0):
+            directory = self._watches.get(event.wd)
+            if (directory is None) or (not event.name):
+                continue
+            paths.append(os.path.join(directory, event.name))
+        return sorted(set(paths))
+
+    def _scan(self):
+        """Only list directories whose mtime has changed
+
+        Files overwritten in place do not change the mtime of their
+        directory, so known files of other directories are checked
+        with ``os.stat``
+        """
+        paths = []
+        for directory in self.directories:
+            try:
+                mtime = os.stat(directory).st_mtime_ns
+            except OSError:
+                continue
+            if self._mtimes.get(directory) == mtime:
+                paths += self._changed(directory)
+            else:
+                paths += self._list(directory)
+        return paths
+
+    def _list(self, directory):
+        """New or changed entries of a directory since last listing"""
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+            names = os.listdir(directory)
+        except OSError:
+            return []
+        self._mtimes[directory] = mtime
+        old = self._stats.get(directory, {})
+        stats = {name: _stat(os.path.join(directory, name))
+                 for name in names}
+        self._stats[directory] = stats
+        return [os.path.join(directory, name) for name in sorted(stats)
+                if (name not in old) or (old[name] != stats[name])]
+
+    def _changed(self, directory):
+        """Known files of a directory whose mtime or size has changed"""
+        stats = self._stats.get(directory, {})
+        paths = []
+        for name in sorted(stats):
+            path = os.path.join(directory, name)
+            stat = _stat(path)
+            if stat != stats[name]:
+                stats[name] = stat
+                if stat is not None:  # Removed files are not reported
+                    paths.append(path)
+        return paths
+
+
+def _stat(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
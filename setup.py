@@ -104,6 +104,8 @@ setuptools.setup(
             'console_scripts': [
                 'forest=forest.cli.main:main',
                 'forestdb=forest.db.main:main',
+                'forest-pyramid=forest.cli.pyramid:main',
+                'forest-rechunk=forest.cli.rechunk:main',
                 'forest-tutorial=forest.tutorial.main:main'
             ]
         })
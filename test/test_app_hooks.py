@@ -1,7 +1,8 @@
 import pytest
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 import forest.parse_args
 import forest.app_hooks
+import forest.cli.rechunk
 
 
 @pytest.mark.parametrize("argv,expect", [
@@ -35,3 +36,92 @@ def test_forest_main_parse_args():
     args = forest.parse_args.parse_args(["forest",
                                          "--config-file", config_file])
     assert args.config_file == config_file
+
+
+def test_pyramid_build_callback_skips_while_running():
+    callback = forest.app_hooks.PyramidBuildCallback(["--config-file", "x"])
+    with patch("forest.app_hooks.multiprocessing") as multiprocessing:
+        process = multiprocessing.get_context.return_value.Process.return_value
+        process.is_alive.return_value = True
+        callback()
+        callback()
+    process.start.assert_called_once_with()
+
+
+def test_point_store_build_callback_runs_rechunk():
+    callback = forest.app_hooks.PointStoreBuildCallback(["--config-file", "x"])
+    with patch("forest.app_hooks.multiprocessing") as multiprocessing:
+        callback()
+    Process = multiprocessing.get_context.return_value.Process
+    _, kwargs = Process.call_args
+    assert kwargs["target"] is forest.cli.rechunk.main
+
+
+def test_acquire_host_lock_elects_one_process(tmpdir):
+    argv = ["--config-file", "x"]
+    first = forest.app_hooks.acquire_host_lock(argv, directory=str(tmpdir))
+    try:
+        assert first is not None
+        assert forest.app_hooks.acquire_host_lock(
+            argv, directory=str(tmpdir)) is None
+        other = forest.app_hooks.acquire_host_lock(
+            ["--config-file", "y"], directory=str(tmpdir))
+        assert other is not None
+        other.close()
+    finally:
+        first.close()
+    again = forest.app_hooks.acquire_host_lock(argv, directory=str(tmpdir))
+    assert again is not None
+    again.close()
+
+
+def test_watch_callback_given_sync_false_does_not_sync_datasets():
+    dataset = Mock()
+    callback = forest.app_hooks.WatchCallback(Mock(), [dataset], sync=False)
+    callback.on_new_files(["/data/file.nc"])
+    dataset.sync.assert_not_called()
+
+
+def test_on_server_loaded_skips_builds_in_other_workers():
+    config = Mock(datasets=[Mock(spec=["pyramid", "point_store"])])
+    server_context = Mock()
+    with patch("forest.app_hooks.parse_forest_args", return_value=[]), \
+            patch("forest.main.configure", return_value=config), \
+            patch("forest.app_hooks.acquire_host_lock", return_value=None), \
+            patch("forest.app_hooks._HOST_LOCK", None), \
+            patch("forest.app_hooks.data"), \
+            patch("forest.app_hooks.PyramidBuildCallback") as pyramid, \
+            patch("forest.app_hooks.PointStoreBuildCallback") as rechunk:
+        forest.app_hooks.on_server_loaded(server_context)
+    pyramid.assert_not_called()
+    rechunk.assert_not_called()
+    server_context.add_periodic_callback.assert_not_called()
+
+
+def test_on_server_loaded_watches_directories_created_later(tmpdir):
+    dataset = Mock(spec=["pattern"], pattern=str(tmpdir / "run_*" / "*.nc"))
+    config = Mock(datasets=[dataset], use_inotify=False)
+    server_context = Mock()
+    with patch("forest.app_hooks.parse_forest_args", return_value=[]), \
+            patch("forest.main.configure", return_value=config), \
+            patch("forest.app_hooks.acquire_host_lock", return_value=None), \
+            patch("forest.app_hooks._HOST_LOCK", None), \
+            patch("forest.app_hooks.data"):
+        forest.app_hooks.on_server_loaded(server_context)
+    callback, _ = server_context.add_periodic_callback.call_args[0]
+    callback.watcher.expand_interval = 0
+    callback()
+    (tmpdir / "run_1").mkdir()
+    callback()
+    assert callback.watcher.directories == [str(tmpdir / "run_1")]
+
+
+def test_watch_callback_invalidates_caches_of_changed_files():
+    dataset = Mock(spec=["locator"])
+    with patch("forest.cache.image_cache") as image_cache, \
+            patch("forest.series.point_cache") as point_cache:
+        callback = forest.app_hooks.WatchCallback(Mock(), [dataset])
+        callback.on_new_files(["/data/file.nc"])
+    image_cache.invalidate.assert_called_once_with("/data/file.nc")
+    point_cache.invalidate.assert_called_once_with("/data/file.nc")
+    dataset.locator.index.invalidate.assert_called_once_with("/data/file.nc")
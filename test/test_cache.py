@@ -0,0 +1,157 @@
+import time
+import threading
+import concurrent.futures
+import pytest
+import numpy as np
+from unittest.mock import sentinel
+from forest.cache import (
+    ImageCache, CacheStats, SingleFlight, SharedStore, nbytes)
+
+
+def image(n):
+    return {"x": [0], "image": [np.zeros((n, n), dtype="f4")]}
+
+
+def test_nbytes_given_masked_array():
+    values = np.ma.masked_array(np.zeros(10, dtype="f8"), mask=False)
+    assert nbytes({"image": [values]}) == 80 + 10
+
+
+def test_image_cache_get_given_missing_key():
+    cache = ImageCache()
+    assert cache.get(sentinel.key) is None
+    assert cache.stats == CacheStats(misses=1)
+
+
+def test_image_cache_put_get():
+    cache = ImageCache()
+    cache.put(sentinel.key, image(2))
+    assert cache.get(sentinel.key)["x"] == [0]
+    assert cache.stats == CacheStats(hits=1, nbytes=16, entries=1)
+
+
+def test_image_cache_evicts_least_recently_used():
+    cache = ImageCache(max_bytes=40)
+    cache.put("a", image(2))
+    cache.put("b", image(2))
+    cache.get("a")
+    cache.put("c", image(2))
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+    assert cache.stats.evictions == 1
+    assert cache.stats.nbytes == 32
+
+
+def test_image_cache_ignores_values_larger_than_budget():
+    cache = ImageCache(max_bytes=8)
+    cache.put("a", image(2))
+    assert len(cache) == 0
+
+
+def test_image_cache_invalidate_path():
+    cache = ImageCache()
+    cache.put("a", image(2), path="file.nc")
+    cache.put("b", image(2), path="file.nc")
+    cache.put("c", image(2), path="other.nc")
+    cache.invalidate("file.nc")
+    assert len(cache) == 1
+    assert cache.stats.nbytes == 16
+
+
+def test_image_cache_resize_evicts():
+    cache = ImageCache()
+    cache.put("a", image(2))
+    cache.put("b", image(2))
+    cache.resize(16)
+    assert list(cache._entries) == ["b"]
+    assert cache.stats.evictions == 1
+
+
+def test_single_flight_shares_concurrent_calls():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(timeout=5)
+        return sentinel.value
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=20) as pool:
+        first = pool.submit(flight.do, "key", compute)
+        started.wait(timeout=5)
+        others = [pool.submit(flight.do, "key", compute) for _ in range(19)]
+        while flight.shared < 19:
+            time.sleep(0.001)
+        release.set()
+        results = [f.result() for f in [first] + others]
+    assert results == 20 * [sentinel.value]
+    assert len(calls) == 1
+
+
+def test_single_flight_raises_error_to_caller():
+    flight = SingleFlight()
+
+    def compute():
+        raise ValueError("bad file")
+
+    with pytest.raises(ValueError):
+        flight.do("key", compute)
+    assert flight.do("key", lambda: sentinel.value) == sentinel.value
+
+
+def test_image_cache_get_or_load():
+    cache = ImageCache(max_bytes=10 ** 6)
+    calls = []
+
+    def load():
+        calls.append(1)
+        return image(2)
+
+    first = cache.get_or_load("key", load, path="file.nc")
+    second = cache.get_or_load("key", load, path="file.nc")
+    assert first is second
+    assert len(calls) == 1
+
+
+def test_shared_store_put_get(tmpdir):
+    store = SharedStore(str(tmpdir))
+    values = np.ma.masked_array(np.arange(6, dtype="f4").reshape(2, 3),
+                                mask=[[0, 1, 0], [0, 0, 1]])
+    data = {"x": [0.], "image": [values], "units": ["K"]}
+    store.put(("file.nc", 1, "air"), data)
+    result = SharedStore(str(tmpdir)).get(("file.nc", 1, "air"))
+    assert result["x"] == [0.]
+    assert result["units"] == ["K"]
+    np.testing.assert_array_equal(result["image"][0], values)
+    np.testing.assert_array_equal(result["image"][0].mask, values.mask)
+    assert not np.ma.getdata(result["image"][0]).flags.writeable
+
+
+def test_shared_store_get_given_missing_key(tmpdir):
+    store = SharedStore(str(tmpdir))
+    assert store.get("key") is None
+    assert store.misses == 1
+
+
+def test_shared_store_evicts_oldest(tmpdir):
+    store = SharedStore(str(tmpdir), max_bytes=1500)
+    data = {"image": [np.zeros(100, dtype="f8")]}
+    store.put("a", data)
+    time.sleep(0.01)
+    store.put("b", data)
+    assert store.get("a") is None
+    assert store.get("b") is not None
+
+
+def test_image_cache_get_or_load_uses_shared_store(tmpdir):
+    first = ImageCache(shared=SharedStore(str(tmpdir)))
+    second = ImageCache(shared=SharedStore(str(tmpdir)))
+    first.get_or_load("key", lambda: image(2))
+    load = []
+    result = second.get_or_load("key", lambda: load.append(1))
+    assert load == []
+    np.testing.assert_array_equal(result["image"][0], np.zeros((2, 2)))
@@ -27,3 +27,22 @@ import forest.cli.main
 def test_bokeh_command(argv, expect):
     result = forest.cli.main.bokeh_command("/app/path", argv)
     assert expect == result
+
+
+@pytest.mark.parametrize("argv,expect", [
+    (["--num-procs", "4", "file.nc"],
+     ["bokeh", "serve", "/app/path",
+                "--num-procs", "4",
+                "--args", "file.nc", "--shared-memory"]),
+    (["--num-procs", "1", "file.nc"],
+     ["bokeh", "serve", "/app/path",
+                "--num-procs", "1",
+                "--args", "file.nc"]),
+    (["--num-procs", "0", "--shared-memory", "file.nc"],
+     ["bokeh", "serve", "/app/path",
+                "--num-procs", "0",
+                "--args", "--shared-memory", "file.nc"]),
+    ])
+def test_bokeh_command_given_num_procs(argv, expect):
+    result = forest.cli.main.bokeh_command("/app/path", argv)
+    assert expect == result
@@ -273,7 +273,16 @@ def test_user_limits_render():
     ([
         bokeh.models.ColumnDataSource(
             {"image": [np.linspace(-1, 1, 4).reshape(2, 2)]}
-        )], -1, 1)
+        )], -1, 1),
+    ([
+        bokeh.models.ColumnDataSource(
+            {"image": [np.array([[np.nan, 2.], [3., 4.]], dtype="f4")]}
+        )], 2, 4),
+    ([
+        bokeh.models.ColumnDataSource(
+            {"image": [np.array([[0, 255]], dtype="u1")],
+             "scale": [0.5], "offset": [10.]}
+        )], 10, 10),
 ])
 def test_source_limits_on_change(listener, sources, low, high):
     source_limits = colors.SourceLimits()
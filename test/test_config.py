@@ -246,3 +246,37 @@ def test_config_default_state():
         "state": {}
     })
     assert config.state == forest.state.State.from_dict({})
+
+
+@pytest.mark.parametrize("data,expect", [
+    ({}, None),
+    ({"image_cache": {"max_mb": 2}}, 2 * 1024 ** 2),
+])
+def test_config_image_cache_max_bytes(data, expect):
+    assert forest.config.Config(data).image_cache_max_bytes == expect
+
+
+@pytest.mark.parametrize("data,expect", [
+    ({}, None),
+    ({"image_transport": "uint8"}, "uint8"),
+])
+def test_config_image_transport(data, expect):
+    assert forest.config.Config(data).image_transport == expect
+
+
+@pytest.mark.parametrize("data,expect", [
+    ({}, None),
+    ({"loader": {"workers": 0}}, 0),
+    ({"loader": {"workers": "8"}}, 8),
+])
+def test_config_loader_workers(data, expect):
+    assert forest.config.Config(data).loader_workers == expect
+
+
+@pytest.mark.parametrize("data,expect", [
+    ({}, {}),
+    ({"prefetch": {"valid_times": 3, "workers": 0}},
+     {"valid_times": 3, "max_workers": 0}),
+])
+def test_config_prefetch(data, expect):
+    assert forest.config.Config(data).prefetch == expect
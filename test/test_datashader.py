@@ -85,3 +85,75 @@ def test_datashader_image_nan():
 
     #Should be returning NumPy masked arrays
     assert numpy.ma.is_masked(result['image'][0])
+
+
+def _quadmesh(values, gx, gy, x_range, y_range, plot_height, plot_width):
+    canvas = datashader.Canvas(plot_height=plot_height,
+                               plot_width=plot_width,
+                               x_range=x_range,
+                               y_range=y_range)
+    xarr = xarray.DataArray(values, coords=[('y', gy), ('x', gx)], name='Z')
+    return canvas.quadmesh(xarr).values
+
+
+@pytest.mark.skipif(not libs_available,
+                    reason='datashader and xarray are optional')
+@pytest.mark.parametrize("even", [True, False])
+@pytest.mark.parametrize("shape", [(30, 40), (12, 16), (64, 100)])
+def test_regridder_matches_quadmesh(even, shape):
+    random = numpy.random.RandomState(0)
+    gx = numpy.linspace(0, 10, 40)
+    if even:
+        gy = numpy.linspace(5, 0, 30)
+    else:
+        gy = numpy.sort(random.uniform(0, 5, 30))
+    values = random.normal(size=(30, 40))
+    values[3, 4] = numpy.nan
+    x_range = (-0.1, 10.)
+    y_range = (0., 5.05)
+    result = geo.datashader_stretch(values, gx, gy, x_range, y_range, *shape)
+    expect = _quadmesh(values, gx, gy, x_range, y_range, *shape)
+    numpy.testing.assert_allclose(result.filled(numpy.nan), expect)
+    numpy.testing.assert_array_equal(result.mask, numpy.isnan(expect))
+
+
+def test_regridder_cached_given_same_grid():
+    gx = numpy.linspace(0, 10, 4)
+    gy = numpy.linspace(0, 5, 3)
+    first = geo.Regridder.cached(gx, gy, (0, 10), (0, 5), 6, 8)
+    second = geo.Regridder.cached(gx.copy(), gy.copy(), (0, 10), (0, 5), 6, 8)
+    third = geo.Regridder.cached(gx, gy, (0, 10), (0, 5), 3, 4)
+    assert first is second
+    assert first is not third
+
+
+def test_regridder_masks_masked_values():
+    gx = numpy.array([0., 1.])
+    gy = numpy.array([0., 1.])
+    values = numpy.ma.masked_array([[1., 2.], [3., 4.]],
+                                   mask=[[False, True], [False, False]])
+    regridder = geo.Regridder(gx, gy, (-0.5, 1.5), (-0.5, 1.5), 2, 2)
+    result = regridder(values)
+    numpy.testing.assert_array_equal(result.mask, values.mask)
+    numpy.testing.assert_array_equal(result.compressed(), [1., 3., 4.])
+
+
+def test_custom_stretch_given_uneven_rows():
+    y = numpy.array([0., 1., 3.])
+    z = numpy.array([[0., 10.], [2., 12.], [6., 16.]])
+    result = geo.custom_stretch(z, None, y)
+    numpy.testing.assert_allclose(result, [[0., 10.], [3., 13.], [6., 16.]])
+
+
+def test_custom_stretch_given_masked_row():
+    y = numpy.array([0., 1., 3.])
+    z = numpy.ma.masked_array([[0., 10.], [2., 12.], [6., 16.]],
+                              mask=[[False, False],
+                                    [True, False],
+                                    [False, True]])
+    result = geo.custom_stretch(z, None, y)
+    numpy.testing.assert_array_equal(result.mask, [[False, False],
+                                                   [False, False],
+                                                   [False, True]])
+    # Masked neighbours do not contribute to interpolated values
+    numpy.testing.assert_allclose(result[1], [6., 12.])
@@ -9,11 +9,12 @@ from forest import db, redux, rx
 
 
 def test_reducer_immutable_state():
-    """Ensure copy.deepcopy is used to create a new state"""
-    previous_state = {"key": ["value"]}
-    next_state = db.reducer(previous_state, {"kind": "ANY"})
-    previous_state["key"].append("extra")
-    assert next_state["key"] == ["value"]
+    """Ensure previous state is not modified and unchanged branches shared"""
+    previous_state = {"key": ["value"], "other": ["value"]}
+    next_state = db.reducer(previous_state, db.set_value("key", ["new"]))
+    assert previous_state == {"key": ["value"], "other": ["value"]}
+    assert next_state == {"key": ["new"], "other": ["value"]}
+    assert next_state["other"] is previous_state["other"]
 
 
 class TestDatabaseMiddleware(unittest.TestCase):
@@ -21,6 +21,14 @@ class TestDatabase(unittest.TestCase):
         db.Database(self.connection)
         db.Database(self.connection)
 
+    def test_database_adds_indexes(self):
+        self.cursor.execute("""
+            SELECT name FROM sqlite_master WHERE type = 'index'
+        """)
+        names = [name for name, in self.cursor.fetchall()]
+        self.assertIn("time_value", names)
+        self.assertIn("file_reference", names)
+
     def test_file_names_given_no_files_returns_empty_list(self):
         result = self.database.file_names()
         expect = []
@@ -113,6 +121,25 @@ class TestDatabase(unittest.TestCase):
         expect = ["2019-01-01 12:00:00", "2019-01-01 13:00:00"]
         self.assertEqual(expect, result)
 
+    def test_insert_times_matches_insert_time(self):
+        times = [dt.datetime(2019, 1, 1, 12), dt.datetime(2019, 1, 1, 13)]
+        self.database.insert_times("a.nc", self.variable, times)
+        for i, time in enumerate(times):
+            self.database.insert_time("b.nc", self.variable, time, i)
+        self.cursor.execute("SELECT COUNT(*) FROM time")
+        self.assertEqual(self.cursor.fetchone(), (2,))
+        self.cursor.execute("SELECT COUNT(*) FROM variable_to_time")
+        self.assertEqual(self.cursor.fetchone(), (4,))
+
+    def test_insert_pressures(self):
+        pressures = [1000., 850., 500.]
+        self.database.insert_pressures(self.path, self.variable, pressures)
+        self.database.insert_pressures(self.path, self.variable, pressures)
+        result = self.database.find_pressure(self.variable, 850.)
+        expect = [(self.path, 1)]
+        self.assertEqual(expect, result)
+        self.assertEqual(self.database.pressures(), [500., 850., 1000.])
+
     def test_valid_times_returns_all_valid_times(self):
         for (path, variable, time, i) in [
                 ("file_0.nc", "var_a", "2019-01-01 00:00:00", 0),
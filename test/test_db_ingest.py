@@ -0,0 +1,116 @@
+import datetime as dt
+import netCDF4
+import pytest
+import forest.db
+import forest.db.main
+from forest.db import ingest
+
+
+UNITS = "hours since 1970-01-01 00:00:00"
+
+
+def _write_file(path, reference_time=dt.datetime(2019, 1, 1)):
+    times = [dt.datetime(2019, 1, 1, 12), dt.datetime(2019, 1, 1, 13)]
+    pressures = [1000., 850.]
+    with netCDF4.Dataset(path, "w") as dataset:
+        dataset.createDimension("time", len(times))
+        dataset.createDimension("dim0", len(pressures))
+        obj = dataset.createVariable("time", "d", ("time",))
+        obj.units = UNITS
+        obj[:] = netCDF4.date2num(times, UNITS)
+        obj = dataset.createVariable("pressure", "d", ("dim0",))
+        obj[:] = pressures
+        obj = dataset.createVariable("forecast_reference_time", "d", ())
+        obj.units = UNITS
+        obj[:] = netCDF4.date2num(reference_time, UNITS)
+        obj = dataset.createVariable("air_temperature", "f", ("time", "dim0"))
+        obj.coordinates = "forecast_reference_time pressure"
+
+
+def _contents(database):
+    return {
+        "files": database.file_names(),
+        "variables": database.variables(),
+        "initial_times": database.initial_times(),
+        "valid_times": database.valid_times(None, None, None),
+        "pressures": database.pressures(),
+        "axes": forest.db.Locator(database.connection).axes(
+            database.file_names()[0], "air_temperature")
+    }
+
+
+def test_extract(tmpdir):
+    path = str(tmpdir / "file.nc")
+    _write_file(path)
+    record = ingest.extract(path)
+    assert record.reference_time == "2019-01-01 00:00:00"
+    assert [v.name for v in record.variables] == ["air_temperature"]
+    variable = record.variables[0]
+    assert variable.time_axis == 0
+    assert variable.pressure_axis == 1
+    assert variable.times == ["2019-01-01 12:00:00", "2019-01-01 13:00:00"]
+    assert variable.pressures == [1000., 850.]
+
+
+def test_extract_stores_oserror(tmpdir):
+    path = str(tmpdir / "file.nc")
+    with open(path, "w"):
+        pass
+    record = ingest.extract(path)
+    assert isinstance(record.error, OSError)
+
+
+def test_ingest_matches_insert_netcdf(tmpdir):
+    path = str(tmpdir / "file.nc")
+    _write_file(path)
+    expect = forest.db.Database.connect(":memory:")
+    expect.insert_netcdf(path)
+    result = forest.db.Database.connect(":memory:")
+    ingest.ingest(result, [path])
+    assert _contents(result) == _contents(expect)
+
+
+def test_ingest_given_jobs(tmpdir):
+    paths = [str(tmpdir / "file_{}.nc".format(i)) for i in range(3)]
+    for i, path in enumerate(paths):
+        _write_file(path, reference_time=dt.datetime(2019, 1, 1, i))
+    database = forest.db.Database.connect(":memory:")
+    records = ingest.ingest(database, paths, jobs=2, batch_size=2)
+    assert sorted(r.path for r in records) == paths
+    assert database.file_names() == paths
+
+
+def test_main_given_jobs(tmpdir):
+    path = str(tmpdir / "file.nc")
+    database_path = str(tmpdir / "file.db")
+    _write_file(path)
+    forest.db.main.main(["--database", database_path, "--jobs", "2", path])
+    with forest.db.Database.connect(database_path) as database:
+        assert database.file_names() == [path]
+
+
+def test_ingest_reports_undecodable_file(tmpdir):
+    good, bad = str(tmpdir / "good.nc"), str(tmpdir / "bad.nc")
+    _write_file(good)
+    with netCDF4.Dataset(bad, "w") as dataset:
+        dataset.createDimension("time", 1)
+        dataset.createVariable("time", "d", ("time",))  # no units
+        dataset.createVariable("air_temperature", "f", ("time",))
+    errors = []
+    database = forest.db.Database.connect(":memory:")
+    ingest.ingest(database, [bad, good], jobs=2, on_error=errors.append)
+    assert [record.path for record in errors] == [bad]
+    assert database.file_names() == [good]
+
+
+def test_ingest_rolls_back_failed_insert(tmpdir):
+    paths = [str(tmpdir / "file_{}.nc".format(i)) for i in range(2)]
+    for path in paths:
+        _write_file(path)
+    records = [ingest.extract(path) for path in paths]
+    records[1].variables[0].pressures = [object()]  # Can not be stored
+    database = forest.db.Database.connect(":memory:")
+    errors = []
+    ingest._write(database, records, errors.append)
+    assert [record.path for record in errors] == [paths[1]]
+    assert database.file_names() == [paths[0]]
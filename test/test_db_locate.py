@@ -29,6 +29,33 @@ def test_locator_file_names_supports_datetime_types(time):
     assert expect == result
 
 
+def _populated_database():
+    database = db.Database.connect(":memory:")
+    for k in range(20):
+        path = "file_{}.nc".format(k)
+        database.insert_file_name(path, "2020-01-{:02d} 00:00:00".format(k + 1))
+        database.insert_times(path, "air_temperature", [
+            "2020-01-01 {:02d}:00:00".format(i) for i in range(6)])
+        database.insert_pressures(path, "air_temperature", [1000., 850.])
+    return database
+
+
+@pytest.mark.parametrize("query", [
+    pytest.param(db.Locator.file_names_query(), id="file_names"),
+    pytest.param(db.Database.valid_times_query("*", "v", "t"), id="valid_times"),
+    pytest.param(db.Database.pressures_query("*", "v", "t"), id="pressures"),
+])
+def test_query_plan_uses_indexes(query):
+    database = _populated_database()
+    plan = database.query_plan(query, dict(
+        pattern="*",
+        variable="air_temperature",
+        initial_time="2020-01-01 00:00:00",
+        valid_time="2020-01-01 01:00:00"))
+    scans = [detail for detail in plan if detail.startswith("SCAN")]
+    assert scans == []
+
+
 class TestLocate(unittest.TestCase):
     def setUp(self):
         self.database = db.Database.connect(":memory:")
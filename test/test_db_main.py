@@ -103,9 +103,9 @@ class TestMain(unittest.TestCase):
 
         connection = sqlite3.connect(self.database_file)
         cursor = connection.cursor()
-        cursor.execute("SELECT DISTINCT value FROM pressure")
+        cursor.execute("SELECT DISTINCT value FROM pressure ORDER BY value")
         result = cursor.fetchall()
-        expect = [(p,) for p in pressures]
+        expect = [(p,) for p in sorted(pressures)]
         self.assertEqual(expect, result)
 
     def test_main_saves_reference_time(self):
@@ -153,3 +153,11 @@ class TestMain(unittest.TestCase):
         result = cursor.fetchall()
         expect = [(0, 0)]
         self.assertEqual(expect, result)
+
+
+def test_database_file_uses_write_ahead_log(tmpdir):
+    path = str(tmpdir / "file.db")
+    with forest.db.Database.connect(path) as database:
+        database.cursor.execute("PRAGMA journal_mode")
+        mode, = database.cursor.fetchone()
+    assert mode == "wal"
@@ -1,9 +1,11 @@
 import unittest
+import unittest.mock
 import datetime as dt
 import numpy as np
 import netCDF4
 import os
 import fnmatch
+import threading
 import pytest
 import forest.drivers
 from forest.drivers import unified_model
@@ -412,3 +414,230 @@ class TestNumpy(unittest.TestCase):
         result = x[pts].shape
         expect = (2, 2)
         self.assertEqual(expect, result)
+
+
+def _write_um_file(path, times, pressures, reference_time):
+    with netCDF4.Dataset(path, "w") as dataset:
+        um = tutorial.UM(dataset)
+        dataset.createDimension("longitude", 1)
+        dataset.createDimension("latitude", 1)
+        var = um.times("time", length=len(times))
+        var[:] = netCDF4.date2num(times, units=var.units)
+        um.forecast_reference_time(reference_time)
+        var = um.pressures("pressure", length=len(pressures))
+        var[:] = pressures
+        dims = ("time", "pressure", "longitude", "latitude")
+        coordinates = "forecast_period_1 forecast_reference_time"
+        var = um.relative_humidity(dims, coordinates=coordinates)
+        var[:] = 100.
+
+
+def test_file_index_reads_coordinates(tmpdir):
+    path = str(tmpdir / "file.nc")
+    reference_time = dt.datetime(2019, 1, 1)
+    times = [dt.datetime(2019, 1, 2), dt.datetime(2019, 1, 2, 3)]
+    pressures = [1000., 950.]
+    _write_um_file(path, times, pressures, reference_time)
+    index = disk.FileIndex()
+    meta = index[path]
+    assert meta.reference_time == reference_time
+    var = meta.variables["relative_humidity"]
+    assert var.dimensions == ("time", "pressure", "longitude", "latitude")
+    np.testing.assert_array_equal(
+        var.coords["time"], np.array(times, dtype="datetime64[s]"))
+    np.testing.assert_array_equal(var.coords["pressure"], pressures)
+
+
+def test_file_index_persists_between_instances(tmpdir):
+    path = str(tmpdir / "file.nc")
+    index_path = str(tmpdir / "index.db")
+    times = [dt.datetime(2019, 1, 2)]
+    _write_um_file(path, times, [1000.], dt.datetime(2019, 1, 1))
+    disk.FileIndex(index_path)[path]
+    with unittest.mock.patch.object(disk.FileMeta, "from_netcdf") as read:
+        meta = disk.FileIndex(index_path)[path]
+    read.assert_not_called()
+    assert meta.reference_time == dt.datetime(2019, 1, 1)
+    np.testing.assert_array_equal(
+        meta.variables["relative_humidity"].coords["time"],
+        np.array(times, dtype="datetime64[s]"))
+
+
+def test_file_index_rereads_modified_file(tmpdir):
+    path = str(tmpdir / "file.nc")
+    index_path = str(tmpdir / "index.db")
+    _write_um_file(path, [dt.datetime(2019, 1, 2)], [1000.],
+                   dt.datetime(2019, 1, 1))
+    disk.FileIndex(index_path)[path]
+    times = [dt.datetime(2019, 1, 3), dt.datetime(2019, 1, 4)]
+    _write_um_file(path, times, [1000.], dt.datetime(2019, 1, 2))
+    meta = disk.FileIndex(index_path)[path]
+    assert meta.reference_time == dt.datetime(2019, 1, 2)
+
+
+def test_file_index_rereads_file_modified_while_in_use(tmpdir):
+    path = str(tmpdir / "file.nc")
+    _write_um_file(path, [dt.datetime(2019, 1, 2)], [1000.],
+                   dt.datetime(2019, 1, 1))
+    index = disk.FileIndex()
+    index[path]
+    times = [dt.datetime(2019, 1, 3), dt.datetime(2019, 1, 4)]
+    _write_um_file(path, times, [1000., 850.], dt.datetime(2019, 1, 2))
+    assert index[path].reference_time == dt.datetime(2019, 1, 2)
+
+
+def test_file_meta_skips_malformed_coordinate(tmpdir):
+    path = str(tmpdir / "file.nc")
+    with netCDF4.Dataset(path, "w") as dataset:
+        dataset.createDimension("time", 1)
+        dataset.createDimension("pressure", 1)
+        dataset.createVariable("time", "d", ("time",))  # missing units
+        var = dataset.createVariable("pressure", "d", ("pressure",))
+        var[:] = 1000.
+        dataset.createVariable("bad", "f", ("time",))
+        dataset.createVariable("good", "f", ("pressure",))
+    meta = disk.FileMeta.from_netcdf(path)
+    assert meta.variables["bad"].coords == {}
+    np.testing.assert_array_equal(
+        meta.variables["good"].coords["pressure"], [1000.])
+
+
+def test_locator_locate_does_not_open_files(tmpdir):
+    path = str(tmpdir / "file.nc")
+    reference_time = dt.datetime(2019, 1, 1)
+    times = [dt.datetime(2019, 1, 2), dt.datetime(2019, 1, 2, 3)]
+    pressures = [1000., 950., 850.]
+    _write_um_file(path, times, pressures, reference_time)
+    locator = unified_model.Locator([path])
+    with unittest.mock.patch("netCDF4.Dataset") as Dataset:
+        result = locator.locate(path, "relative_humidity", reference_time,
+                                times[1], pressures[2])
+    Dataset.assert_not_called()
+    assert result == (path, (1, 2))
+
+
+def test_file_index_rereads_older_format(tmpdir):
+    path = str(tmpdir / "file.nc")
+    index_path = str(tmpdir / "index.db")
+    _write_um_file(path, [dt.datetime(2019, 1, 2)], [1000.],
+                   dt.datetime(2019, 1, 1))
+    index = disk.FileIndex(index_path)
+    index[path]
+    index.cursor.execute("UPDATE file_index SET meta = :meta",
+                         {"meta": '{"reference_time": null, "variables": {}}'})
+    index.connection.commit()
+    meta = disk.FileIndex(index_path)[path]
+    assert meta.reference_time == dt.datetime(2019, 1, 1)
+    assert meta.variables["relative_humidity"].is_data
+
+
+def test_navigator_variables_excludes_coordinates(tmpdir):
+    path = str(tmpdir / "file.nc")
+    _write_um_file(path, [dt.datetime(2019, 1, 2)], [1000.],
+                   dt.datetime(2019, 1, 1))
+    navigator = unified_model.Navigator(path)
+    assert navigator.variables(path) == ["relative_humidity"]
+
+
+def test_navigator_reads_each_file_once(tmpdir):
+    pattern = str(tmpdir / "*.nc")
+    reference_time = dt.datetime(2019, 1, 1)
+    times = [dt.datetime(2019, 1, 2), dt.datetime(2019, 1, 2, 3)]
+    pressures = [1000., 950.]
+    _write_um_file(str(tmpdir / "file.nc"), times, pressures, reference_time)
+    navigator = unified_model.Navigator(pattern)
+    navigator.variables(pattern)
+    with unittest.mock.patch("netCDF4.Dataset") as Dataset:
+        variables = navigator.variables(pattern)
+        initial_times = navigator.initial_times(pattern, variables[0])
+        valid_times = navigator.valid_times(pattern, variables[0],
+                                            reference_time)
+        result = navigator.pressures(pattern, variables[0], reference_time)
+    Dataset.assert_not_called()
+    assert initial_times == [reference_time]
+    np.testing.assert_array_equal(
+        valid_times, np.array(times, dtype="datetime64[s]"))
+    np.testing.assert_array_equal(result, sorted(pressures))
+
+
+def test_coordinate_index_equal_matches_first_position():
+    times = np.array(["2019-01-01T03", "2019-01-01T00", "2019-01-01T03"],
+                     dtype="datetime64[s]")
+    index = disk.CoordinateIndex(times)
+    time = np.datetime64("2019-01-01T03", "s")
+    np.testing.assert_array_equal(index.equal(time), [0, 2])
+    assert index.equal(time)[0] == np.where(disk.time_mask(times, time))[0][0]
+    assert len(index.equal(np.datetime64("2019-01-02", "s"))) == 0
+
+
+@pytest.mark.parametrize("pressure,expect", [
+    (1000., [0, 3]),
+    (850., [1]),
+    (700., []),
+])
+def test_coordinate_index_within_agrees_with_pressure_mask(pressure, expect):
+    pressures = np.array([1000., 850., 500., 1001.])
+    index = disk.CoordinateIndex(pressures)
+    result = disk.coord_positions("pressure", index, pressure)
+    np.testing.assert_array_equal(result, expect)
+    np.testing.assert_array_equal(
+        result, np.where(disk.pressure_mask(pressures, pressure))[0])
+
+
+@pytest.mark.parametrize("values,value,expect", [
+    ([0., 1., 2., 3.], 1.4, 1),
+    ([0., 1., 2., 3.], 1.6, 2),
+    ([3., 2., 1., 0.], 0.2, 3),
+    ([0., 1., 2., 3.], -5., 0),
+    ([0., 1., 2., 3.], 9., 3),
+    ([0., 1., 1., 3.], 1., 1),
+])
+def test_coordinate_index_nearest_agrees_with_argmin(values, value, expect):
+    index = disk.CoordinateIndex(np.array(values))
+    assert index.nearest(value) == expect
+    assert index.nearest(value) == np.argmin(np.abs(np.array(values) - value))
+
+
+def test_file_index_reads_file_without_holding_lock(tmpdir):
+    path = str(tmpdir / "file.nc")
+    _write_um_file(path, [dt.datetime(2019, 1, 2)], [1000.],
+                   dt.datetime(2019, 1, 1))
+    index = disk.FileIndex()
+    acquired = []
+
+    def from_netcdf(path):
+        # Another thread can use the index while this file is read
+        def other():
+            acquired.append(index._lock.acquire(timeout=1))
+            index._lock.release()
+        thread = threading.Thread(target=other)
+        thread.start()
+        thread.join()
+        return disk.FileMeta()
+
+    with unittest.mock.patch.object(disk.FileMeta, "from_netcdf",
+                                    side_effect=from_netcdf):
+        index[path]
+    assert acquired == [True]
+
+
+def test_file_index_stats_file_once(tmpdir):
+    path = str(tmpdir / "file.nc")
+    _write_um_file(path, [dt.datetime(2019, 1, 2)], [1000.],
+                   dt.datetime(2019, 1, 1))
+    index = disk.FileIndex()
+    with unittest.mock.patch("forest.disk.os.stat",
+                             wraps=os.stat) as stat:
+        index[path]
+    stat.assert_called_once_with(path)
+
+
+def test_file_meta_raises_unexpected_errors(tmpdir):
+    path = str(tmpdir / "file.nc")
+    with netCDF4.Dataset(path, "w") as dataset:
+        dataset.createDimension("pressure", 1)
+        dataset.createVariable("pressure", "d", ("pressure",))
+    with unittest.mock.patch.object(disk.FileMeta, "_coords",
+                                    side_effect=MemoryError):
+        with pytest.raises(MemoryError):
+            disk.FileMeta.from_netcdf(path)
@@ -1,15 +1,21 @@
+import os
 import pytest
 import datetime as dt
 import bokeh.models
+import numpy as np
+import forest.cache
+import forest.geo
 import forest.drivers
 from forest.drivers import unified_model
 import forest.db
 import sqlite3
+from unittest.mock import Mock
 import netCDF4
 import iris
 
 
-def test_sync_skips_oserror(tmpdir):
+@pytest.mark.parametrize("sync_jobs", [None, 2])
+def test_sync_skips_oserror(tmpdir, sync_jobs):
     """Files stored in S3 Glacier are inaccessible via goofys"""
     database_path = str(tmpdir / "file.db")
     connection = sqlite3.connect(database_path)
@@ -22,10 +28,14 @@ def test_sync_skips_oserror(tmpdir):
         "locator": "database",
         "pattern": file_name,
         "directory": str(tmpdir),
-        "database_path": database_path
+        "database_path": database_path,
+        "sync_jobs": sync_jobs
     }
     dataset = forest.drivers.get_dataset("unified_model", settings)
     dataset.sync()
+    connection = sqlite3.connect(database_path)
+    health_db = forest.db.health.HealthDB(connection)
+    assert health_db.error_files(file_name) == [file_name]
 
 
 def test_dataset_loader_pattern():
@@ -136,3 +146,136 @@ def insert_lonlat(dataset, lons, lats):
     var[:] = lons
     var = dataset.createVariable("latitude", "f", ("latitude",))
     var[:] = lats
+
+
+def test_loaders_share_image_cache(tmpdir):
+    path = str(tmpdir / "file_20200101.nc")
+    variable = "air_temperature"
+    times = [dt.datetime(2020, 1, 1)]
+    with netCDF4.Dataset(path, "w") as dataset:
+        insert_lonlat(dataset, [0, 1], [0, 1])
+        insert_times(dataset, times)
+        var = dataset.createVariable(variable, "f", ("time", "longitude", "latitude"))
+    cache = forest.cache.ImageCache()
+    locator = unified_model.Locator([path])
+    loaders = [unified_model.Loader(name, path, locator, cache=cache)
+               for name in ("A", "B")]
+    results = [loader._input_output(path, variable, times[0], times[0], None)
+               for loader in loaders]
+    assert [data["name"] for data in results] == [["A"], ["B"]]
+    assert cache.stats.misses == 1
+    assert cache.stats.hits == 1
+    cache.invalidate(path)
+    assert len(cache) == 0
+
+
+def test_load_image_window_reads_visible_region(tmpdir):
+    path = str(tmpdir / "file.nc")
+    variable = "air_temperature"
+    lons, lats = range(0, 360, 10), range(-80, 90, 10)
+    with netCDF4.Dataset(path, "w") as dataset:
+        insert_lonlat(dataset, lons, lats)
+        var = dataset.createVariable(variable, "f", ("longitude", "latitude"))
+        var[:] = 1
+    window = unified_model.Window((-25, 25), (-25, 25))
+    data = unified_model.Loader.load_image(path, variable, (), window=window)
+    assert data["x"][0] < data["x"][0] + data["dw"][0] <= 3.5e6
+    assert data["image"][0].shape[1] <= 7
+
+
+def test_window_runs_crossing_seam():
+    lons = forest.geo.to_180(np.arange(0, 360, 10, dtype="d"))
+    runs = unified_model._window_runs(lons, (-15, 15))
+    assert runs == [(0, 3), (34, 36)]
+
+
+def test_window_runs_given_wrapped_extent():
+    lons = forest.geo.to_180(np.arange(0, 360, 1, dtype="d"))
+    runs = unified_model._window_runs(lons, (170, 190), period=360)
+    assert runs == [(169, 192)]
+
+
+def test_window_from_viewport_across_dateline():
+    x = np.radians([170, 190]) * forest.geo.EARTH_RADIUS
+    viewport = {"x_range": tuple(x), "y_range": (-1e6, 1e6),
+                "width": 100, "height": 100}
+    window = unified_model.Window.from_viewport(viewport)
+    np.testing.assert_allclose(window.lon_range, (170, 190))
+
+
+def test_load_image_window_across_dateline(tmpdir):
+    path = str(tmpdir / "file.nc")
+    variable = "air_temperature"
+    with netCDF4.Dataset(path, "w") as dataset:
+        insert_lonlat(dataset, range(0, 360, 2), range(-10, 12, 2))
+        var = dataset.createVariable(variable, "f", ("longitude", "latitude"))
+        var[:] = 1
+    window = unified_model.Window((170, 190), (-5, 5))
+    data = unified_model.Loader.load_image(path, variable, (), window=window)
+    x0 = np.radians(170) * forest.geo.EARTH_RADIUS
+    x1 = np.radians(190) * forest.geo.EARTH_RADIUS
+    assert x0 - 3e5 < data["x"][0] < x0
+    assert x1 < data["x"][0] + data["dw"][0] < x1 + 3e5
+
+
+@pytest.mark.parametrize("settings,expect", [
+    ({}, False),
+    ({"read_mode": "window"}, True),
+    ({"pyramid_path": "pyramids"}, True),
+])
+def test_dataset_use_viewport(settings, expect):
+    dataset = unified_model.Dataset(pattern="*.nc", **settings)
+    assert dataset.use_viewport == expect
+
+
+@pytest.mark.parametrize("locator", ["file_system", "database"])
+def test_dataset_build_point_stores(tmpdir, locator):
+    path = str(tmpdir / "a.nc")
+    open(path, "w").close()
+    database_path = str(tmpdir / "file.db")
+    sqlite3.connect(database_path).close()
+    dataset = unified_model.Dataset(pattern="*.nc",
+                                    locator=locator,
+                                    directory=str(tmpdir),
+                                    database_path=database_path,
+                                    point_store_path=str(tmpdir / "store"))
+    if locator == "file_system":
+        dataset.pattern = str(tmpdir / "*.nc")
+    dataset.point_store = Mock()
+    dataset.point_store.__contains__ = Mock(return_value=False)
+    dataset.build_point_stores()
+    dataset.point_store.build.assert_called_once_with(path)
+
+
+def test_loader_cache_rereads_modified_file(tmpdir):
+    path = str(tmpdir / "file_20200101.nc")
+    variable = "air_temperature"
+    times = [dt.datetime(2020, 1, 1)]
+    cache = forest.cache.ImageCache()
+    results = []
+    for value in [1, 2]:
+        with netCDF4.Dataset(path, "w") as dataset:
+            insert_lonlat(dataset, [0, 1], [0, 1])
+            insert_times(dataset, times)
+            var = dataset.createVariable(variable, "f",
+                                         ("time", "longitude", "latitude"))
+            var[:] = value
+        os.utime(path, ns=(value * 10 ** 9, value * 10 ** 9))
+        loader = unified_model.Loader("A", path,
+                                      unified_model.Locator([path]),
+                                      cache=cache)
+        data = loader._input_output(path, variable, times[0], times[0], None)
+        results.append(np.nanmax(data["image"][0]))
+    assert results == [1, 2]
+    assert cache.stats.misses == 2
+
+
+def test_sync_given_new_paths_ignores_other_files(tmpdir):
+    database_path = str(tmpdir / "file.db")
+    sqlite3.connect(database_path).close()
+    sync = unified_model.Sync(database_path, "*.nc", str(tmpdir))
+    paths = [str(tmpdir / "file.json")]
+    sync(paths)
+    with forest.db.Database.connect(database_path) as database:
+        assert database.file_names() == []
+    assert sync.directories() == [str(tmpdir)]
@@ -11,3 +11,52 @@ from forest import encode
 ])
 def test_json_serialize_float32(value, expect):
     assert expect == json.dumps(value, cls=encode.NumpyEncoder)
+
+
+def _glyph_data(values):
+    return {"x": [0], "y": [0], "dw": [1], "dh": [1], "image": [values]}
+
+
+def test_encode_image_float32_uses_nan_for_masked_values():
+    values = np.ma.masked_array([[1., 2.], [3., 4.]],
+                                mask=[[False, True], [False, False]])
+    result = encode.encode_image(_glyph_data(values), "float32")
+    image = result["image"][0]
+    assert image.dtype == np.float32
+    assert np.isnan(image[0, 1])
+    np.testing.assert_array_equal(encode.decode_image(result).mask,
+                                  values.mask)
+
+
+@pytest.mark.parametrize("transport", ["uint8", "uint16"])
+def test_encode_image_quantised_round_trip(transport):
+    values = np.ma.masked_invalid(
+        np.array([[np.nan, -5.], [0.25, 20.]]))
+    result = encode.encode_image(_glyph_data(values), transport)
+    image = result["image"][0]
+    assert image.dtype == np.dtype(transport)
+    assert image[0, 0] == encode.sentinel(transport)
+    decoded = encode.decode_image(result)
+    np.testing.assert_array_equal(decoded.mask, values.mask)
+    np.testing.assert_allclose(decoded.compressed(), values.compressed(),
+                               atol=result["scale"][0] / 2)
+
+
+def test_encode_image_does_not_modify_input():
+    values = np.arange(4, dtype="d").reshape(2, 2)
+    data = _glyph_data(values)
+    encode.encode_image(data, "uint8")
+    assert data["image"][0] is values
+    assert "scale" not in data
+
+
+@pytest.mark.parametrize("args", [(), ("float64",)])
+def test_encode_image_float64_passes_through(args):
+    values = np.arange(4, dtype="d").reshape(2, 2)
+    result = encode.encode_image(_glyph_data(values), *args)
+    assert result["image"][0] is values
+
+
+def test_encode_image_given_unknown_transport():
+    with pytest.raises(ValueError):
+        encode.encode_image(_glyph_data(np.zeros((2, 2))), "int4")
@@ -1,5 +1,6 @@
 from unittest.mock import Mock, sentinel
 import forest.gallery
+import forest.redux
 
 
 def test_gallery():
@@ -11,3 +12,14 @@ def test_gallery():
                                                  sentinel.figure)
     gallery.connect(store)
     gallery.render(state)
+
+
+def test_gallery_skips_state_it_does_not_read():
+    store = forest.redux.Store(lambda state, action: {**state, **action})
+    gallery = forest.gallery.Gallery({})
+    gallery.render = Mock()
+    gallery.connect(store)
+    store.dispatch({"valid_time": "2020-01-01 00:00:00"})
+    store.dispatch({"tools": {"profile": True}})
+    gallery.render.assert_called_once_with(
+        {"valid_time": "2020-01-01 00:00:00"})
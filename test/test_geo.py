@@ -0,0 +1,126 @@
+import pytest
+import numpy as np
+cartopy = pytest.importorskip("cartopy")
+from forest import geo
+
+
+@pytest.mark.parametrize("lons,lats", [
+    ([0., 90., -179.9, 179.9], [0., 45., -60., 85.]),
+    ([181., 270., 359.9, -200.], [-85.06, 85.06, 89., -89.]),
+    ([0., 0.], [90., -90.]),
+])
+def test_web_mercator_matches_cartopy(lons, lats):
+    result = geo.web_mercator(lons, lats)
+    expect = geo.transform(lons, lats,
+                           cartopy.crs.PlateCarree(),
+                           cartopy.crs.Mercator.GOOGLE)
+    np.testing.assert_allclose(result, expect, rtol=1e-9, atol=1e-6)
+
+
+def test_plate_carree_matches_cartopy():
+    x = [0., 1e7, -1e7, 3e7]
+    y = [0., 1e7, -2e7, 3e7]
+    result = geo.plate_carree(x, y)
+    expect = geo.transform(x, y,
+                           cartopy.crs.Mercator.GOOGLE,
+                           cartopy.crs.PlateCarree())
+    np.testing.assert_allclose(result, expect, rtol=1e-9, atol=1e-9)
+
+
+def test_web_mercator_given_scalars():
+    x, y = geo.web_mercator(0, 0)
+    assert x.shape == (1,)
+    assert y.shape == (1,)
+
+
+def test_web_mercator_axes_given_1d_grid():
+    lons = np.linspace(-180, 180, 5)
+    lats = np.linspace(-80, 80, 3)
+    gx, gy = geo.web_mercator_axes(lons, lats)
+    np.testing.assert_allclose(gx, geo.web_mercator(lons, np.zeros(5))[0])
+    np.testing.assert_allclose(gy, geo.web_mercator(np.zeros(3), lats)[1])
+
+
+def test_web_mercator_axes_given_2d_grid():
+    lons, lats = np.meshgrid(np.linspace(0, 10, 3), np.linspace(0, 5, 2))
+    gx, gy = geo.web_mercator_axes(lons, lats)
+    assert gx.shape == (2, 3)
+    assert gy.shape == (2, 3)
+
+
+def test_web_mercator_axes_reuses_known_grid():
+    lons = np.linspace(0, 10, 11)
+    lats = np.linspace(0, 5, 6)
+    first = geo.web_mercator_axes(lons, lats)
+    second = geo.web_mercator_axes(lons.copy(), lats.copy())
+    assert first[0] is second[0]
+    assert first[1] is second[1]
+    assert not first[0].flags.writeable
+
+
+def _rotated_grid(ny=20, nx=30, degrees=30):
+    j, i = np.meshgrid(np.arange(ny, dtype="d"), np.arange(nx, dtype="d"),
+                       indexing="ij")
+    angle = np.radians(degrees)
+    gx = i * np.cos(angle) - j * np.sin(angle)
+    gy = i * np.sin(angle) + j * np.cos(angle)
+    return gx, gy
+
+
+def test_curvilinear_regridder_bilinear_reproduces_linear_field():
+    gx, gy = _rotated_grid()
+    values = 2 * gx + 3 * gy
+    x_range = (gx.min(), gx.max())
+    y_range = (gy.min(), gy.max())
+    regridder = geo.CurvilinearRegridder(gx, gy, x_range, y_range, 40, 60,
+                                         method="bilinear")
+    result = regridder(values)
+    px = x_range[0] + (np.arange(60) + 0.5) * (x_range[1] - x_range[0]) / 60
+    py = y_range[0] + (np.arange(40) + 0.5) * (y_range[1] - y_range[0]) / 40
+    px, py = np.meshgrid(px, py)
+    angle = np.radians(30)
+    i = px * np.cos(angle) + py * np.sin(angle)
+    j = -px * np.sin(angle) + py * np.cos(angle)
+    interior = (i > 1) & (i < 28) & (j > 1) & (j < 18)
+    assert not result.mask[interior].any()
+    np.testing.assert_allclose(result[interior], (2 * px + 3 * py)[interior])
+
+
+def test_curvilinear_regridder_masks_pixels_outside_grid():
+    gx, gy = _rotated_grid()
+    regridder = geo.CurvilinearRegridder(gx, gy, (gx.min(), gx.max()),
+                                         (gy.min(), gy.max()), 40, 60)
+    result = regridder(np.ones(gx.shape))
+    assert result.mask[0, 0]
+    assert result.mask.any() and not result.mask.all()
+    np.testing.assert_array_equal(result.compressed(), 1.)
+
+
+def test_curvilinear_regridder_nearest_given_masked_values():
+    gx, gy = np.meshgrid([0., 1.], [0., 1.])
+    values = np.ma.masked_array([[1., 2.], [3., 4.]],
+                                mask=[[False, True], [False, False]])
+    regridder = geo.CurvilinearRegridder(gx, gy, (-0.5, 1.5), (-0.5, 1.5),
+                                         2, 2)
+    result = regridder(values)
+    np.testing.assert_array_equal(result.mask, values.mask)
+    np.testing.assert_array_equal(result.compressed(), [1., 3., 4.])
+
+
+def test_curvilinear_regridder_cached_per_method():
+    gx, gy = _rotated_grid(4, 5)
+    args = (gx, gy, (gx.min(), gx.max()), (gy.min(), gy.max()), 4, 5)
+    nearest = geo.CurvilinearRegridder.cached(*args)
+    assert geo.CurvilinearRegridder.cached(*args) is nearest
+    assert geo.CurvilinearRegridder.cached(*args, method="bilinear") \
+        is not nearest
+
+
+def test_stretch_image_given_2d_lons_lats():
+    lons, lats = np.meshgrid(np.linspace(0, 10, 6), np.linspace(0, 5, 4))
+    values = np.arange(24, dtype="d").reshape(4, 6)
+    result = geo.stretch_image(lons, lats, values,
+                               plot_height=8, plot_width=12)
+    assert result["image"][0].shape == (8, 12)
+    assert result["image"][0].min() == 0
+    assert result["image"][0].max() == 23
@@ -0,0 +1,123 @@
+import threading
+import unittest.mock
+import pytest
+import forest.loading
+import forest.components
+
+
+class FakeDocument:
+    """Document with a session that runs next tick callbacks on demand"""
+    session_context = object()
+
+    def __init__(self):
+        self.callbacks = []
+        self.lock = threading.Lock()
+
+    def add_next_tick_callback(self, callback):
+        with self.lock:
+            self.callbacks.append(callback)
+
+    def tick(self, futures=()):
+        for future in futures:
+            try:
+                future.result(timeout=5)
+            except Exception:
+                pass
+        with self.lock:
+            callbacks, self.callbacks = self.callbacks, []
+        for callback in callbacks:
+            callback()
+
+
+@pytest.fixture
+def executor():
+    executor = forest.loading.Executor(max_workers=1)
+    yield executor
+    executor.pool.shutdown(wait=True)
+
+
+def test_latest_given_document_without_session_loads_synchronously():
+    done = unittest.mock.Mock()
+    latest = forest.loading.Latest()
+    latest(lambda: "data", done, document=unittest.mock.Mock(
+        session_context=None))
+    done.assert_called_once_with("data")
+
+
+def test_latest_hands_result_to_next_tick(executor):
+    document = FakeDocument()
+    done = unittest.mock.Mock()
+    latest = forest.loading.Latest(executor)
+    latest(lambda: "data", done, document=document)
+    future = latest._future
+    assert latest.loading
+    document.tick([future])
+    done.assert_called_once_with("data")
+    assert not latest.loading
+
+
+def test_latest_discards_stale_results(executor):
+    document = FakeDocument()
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(timeout=5)
+        return "stale"
+
+    done = unittest.mock.Mock()
+    latest = forest.loading.Latest(executor)
+    latest(slow, done, document=document)
+    first = latest._future
+    started.wait(timeout=5)
+    latest(lambda: "queued", done, document=document)
+    queued = latest._future
+    latest(lambda: "latest", done, document=document)
+    last = latest._future
+    release.set()
+    document.tick([first, last])
+    assert queued.cancelled()
+    done.assert_called_once_with("latest")
+
+
+def test_latest_given_failed_load(executor):
+    document = FakeDocument()
+    done = unittest.mock.Mock()
+
+    def broken():
+        raise OSError("unreadable")
+
+    latest = forest.loading.Latest(executor)
+    latest(broken, done, document=document)
+    document.tick([latest._future])
+    done.assert_not_called()
+
+
+def test_executor_reports_pending_loads(executor):
+    document = FakeDocument()
+    listener = unittest.mock.Mock()
+    executor.add_listener(document, listener)
+    latest = forest.loading.Latest(executor)
+    latest(lambda: None, unittest.mock.Mock(), document=document)
+    document.tick([latest._future])
+    assert listener.call_args_list == [unittest.mock.call(1),
+                                       unittest.mock.call(0)]
+
+
+@pytest.mark.parametrize("pending,expect", [
+    (0, ""),
+    (2, "<b>Loading...</b>"),
+])
+def test_loading_render(pending, expect):
+    component = forest.components.Loading()
+    component.render(pending)
+    assert component.div.text == expect
+
+
+def test_executor_forgets_loads_of_closed_documents(executor):
+    document = unittest.mock.Mock(session_context=object())
+    document.add_next_tick_callback.side_effect = RuntimeError("destroyed")
+    executor.submit(document, lambda: None, unittest.mock.Mock())
+    executor.pool.shutdown(wait=True)
+    assert executor._pending[document] == 0
@@ -0,0 +1,44 @@
+import datetime as dt
+import threading
+import unittest.mock
+import bokeh.models
+import forest.cache
+import forest.db.control
+import forest.disk
+from forest import map_view
+
+
+def test_image_view_image_holds_netcdf_lock():
+    loader = unittest.mock.Mock()
+    loader.image.return_value = unittest.mock.sentinel.image
+    view = map_view.ImageView(loader, bokeh.models.LinearColorMapper())
+    results = []
+    thread = threading.Thread(target=lambda: results.append(view.image({})))
+    with forest.disk.NETCDF_LOCK:
+        thread.start()
+        thread.join(timeout=0.2)
+        assert thread.is_alive()
+    thread.join(timeout=5)
+    assert results == [unittest.mock.sentinel.image]
+
+
+def test_image_view_render_prefetches_with_locked_image():
+    loader = unittest.mock.Mock()
+    loader.cache = forest.cache.ImageCache()
+    view = map_view.ImageView(loader, bokeh.models.LinearColorMapper())
+    view.latest = unittest.mock.Mock()
+    times = [dt.datetime(2020, 1, 1), dt.datetime(2020, 1, 1, 3)]
+    state = {"valid_time": times[0], "valid_times": times}
+    with unittest.mock.patch("forest.loading.executor") as executor, \
+            unittest.mock.patch("forest.prefetch.prefetcher") as prefetcher:
+        executor.is_async.return_value = True
+        view.render(state)
+    prefetcher.prefetch.assert_called_once_with(
+        view, view.image, forest.db.control.State(valid_time=times[0],
+                                                  valid_times=times))
+
+
+def test_image_view_sends_float64_by_default():
+    view = map_view.ImageView(unittest.mock.Mock(),
+                              bokeh.models.LinearColorMapper())
+    assert view.transport == "float64"
@@ -0,0 +1,78 @@
+import os
+import json
+import pytest
+import numpy as np
+import numpy.testing as npt
+import netCDF4
+import forest.config
+import forest.point_store
+
+
+def _write(path, values):
+    with netCDF4.Dataset(path, "w") as dataset:
+        for name, size in zip(["time", "latitude", "longitude"],
+                              values.shape):
+            dataset.createDimension(name, size)
+        for name in ["latitude", "longitude"]:
+            var = dataset.createVariable(name, "d", (name,))
+            var[:] = np.arange(len(dataset.dimensions[name]))
+        var = dataset.createVariable("air_temperature", "f",
+                                     ("time", "latitude", "longitude"),
+                                     chunksizes=(1,) + values.shape[1:])
+        var[:] = values
+
+
+def test_point_store_given_file_not_built(tmpdir):
+    path = str(tmpdir / "file.nc")
+    _write(path, np.zeros((2, 3, 4)))
+    store = forest.point_store.PointStore(str(tmpdir / "store"))
+    assert path not in store
+    assert store.read(path, "air_temperature", 0, 0) is None
+
+
+def test_point_store_meta_given_modified_file(tmpdir):
+    path = str(tmpdir / "file.nc")
+    _write(path, np.zeros((2, 3, 4)))
+    store = forest.point_store.PointStore(str(tmpdir / "store"))
+    location = store.location(path)
+    os.makedirs(location)
+    stat = os.stat(path)
+    meta = {"version": [stat.st_mtime_ns, stat.st_size], "variables": {}}
+    with open(os.path.join(location, "meta.json"), "w") as stream:
+        json.dump(meta, stream)
+    assert path in store
+    os.utime(path, ns=(0, 0))
+    assert path not in store
+
+
+def test_point_store_is_field(tmpdir):
+    path = str(tmpdir / "file.nc")
+    _write(path, np.zeros((2, 3, 4)))
+    with netCDF4.Dataset(path) as dataset:
+        assert forest.point_store.PointStore.is_field(
+            dataset.variables["air_temperature"])
+        assert not forest.point_store.PointStore.is_field(
+            dataset.variables["latitude"])
+
+
+def test_point_store_build_read(tmpdir):
+    pytest.importorskip("zarr")
+    path = str(tmpdir / "file.nc")
+    values = np.arange(5 * 3 * 4, dtype="f4").reshape(5, 3, 4)
+    _write(path, values)
+    store = forest.point_store.PointStore(str(tmpdir / "store"),
+                                          chunks=(2, 2), max_bytes=1)
+    store.build(path)
+    assert path in store
+    npt.assert_array_equal(store.read(path, "air_temperature", 2, 3),
+                           values[:, 2, 3])
+    assert store.read(path, "latitude", 0, 0) is None
+
+
+def test_from_group():
+    group = forest.config.FileGroup("label", "*.nc",
+                                    point_store_path="/points")
+    store = forest.point_store.from_group(group)
+    assert store.directory == "/points"
+    assert forest.point_store.from_group(
+        forest.config.FileGroup("label", "*.nc")) is None
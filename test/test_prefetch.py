@@ -0,0 +1,109 @@
+import datetime as dt
+import threading
+import unittest.mock
+import pytest
+import numpy as np
+import forest.cache
+import forest.util
+import forest.db.control
+import forest.prefetch
+
+
+@pytest.mark.parametrize("items,item,steps,expect", [
+    ([1, 2, 3, 4, 5], 3, 2, [4, 2, 5, 1]),
+    ([5, 4, 3, 2, 1], 5, 2, [4, 3]),
+    ([1, 2, 3], 4, 1, []),
+    ([1, 2, 3], None, 1, []),
+    (None, 1, 1, []),
+    ([1, 2, 3], 2, 0, []),
+])
+def test_neighbours(items, item, steps, expect):
+    assert forest.prefetch.neighbours(items, item, steps) == expect
+
+
+def test_neighbours_given_mixed_time_types():
+    times = ["2020-01-01 00:00:00", dt.datetime(2020, 1, 1, 1),
+             "2020-01-01 02:00:00"]
+    result = forest.prefetch.neighbours(times, dt.datetime(2020, 1, 1),
+                                        1, key=forest.util.to_datetime)
+    assert result == [dt.datetime(2020, 1, 1, 1)]
+
+
+def test_prefetcher_states():
+    times = [dt.datetime(2020, 1, 1, i) for i in range(4)]
+    state = forest.db.control.State(valid_time=times[1],
+                                    valid_times=times,
+                                    pressure=850.,
+                                    pressures=[1000., 850., 500.])
+    prefetcher = forest.prefetch.Prefetcher(valid_times=1, pressures=1)
+    result = prefetcher.states(state)
+    assert [(s.valid_time, s.pressure) for s in result] == [
+        (times[2], 850.),
+        (times[0], 850.),
+        (times[1], 1000.),
+        (times[1], 500.)]
+
+
+def test_prefetcher_loads_neighbours_in_background():
+    load = unittest.mock.Mock()
+    times = [dt.datetime(2020, 1, 1, i) for i in range(3)]
+    state = forest.db.control.State(valid_time=times[0], valid_times=times)
+    prefetcher = forest.prefetch.Prefetcher(valid_times=2, pressures=0,
+                                            cache=forest.cache.ImageCache())
+    key = unittest.mock.Mock()
+    for future in prefetcher.prefetch(key, load, state):
+        assert future.result(timeout=5)
+    assert [call.args[0].valid_time for call in load.call_args_list] == [
+        times[1], times[2]]
+
+
+def test_prefetcher_cancels_queued_loads():
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow(state):
+        started.set()
+        release.wait(timeout=5)
+
+    times = [dt.datetime(2020, 1, 1, i) for i in range(3)]
+    state = forest.db.control.State(valid_time=times[0], valid_times=times)
+    prefetcher = forest.prefetch.Prefetcher(valid_times=2, pressures=0,
+                                            cache=forest.cache.ImageCache())
+    key = unittest.mock.Mock()
+    running, queued = prefetcher.prefetch(key, slow, state)
+    started.wait(timeout=5)
+    prefetcher.cancel(key)
+    release.set()
+    assert queued.cancelled()
+    assert running.result(timeout=5)
+
+
+def test_prefetcher_backs_off_when_cache_nearly_full():
+    cache = forest.cache.ImageCache(max_bytes=100)
+    cache.put("key", {"image": [np.zeros(10)]})
+    prefetcher = forest.prefetch.Prefetcher(cache=cache, max_fraction=0.5,
+                                            min_available=0)
+    load = unittest.mock.Mock()
+    assert prefetcher.under_pressure()
+    assert not prefetcher._load(load, None)
+    load.assert_not_called()
+
+
+def test_prefetcher_given_no_workers():
+    prefetcher = forest.prefetch.Prefetcher(max_workers=0)
+    state = forest.db.control.State(valid_time=1, valid_times=[1, 2])
+    assert prefetcher.prefetch(unittest.mock.Mock(), print, state) == []
+
+
+def test_prefetcher_reports_low_memory_once(capsys):
+    cache = forest.cache.ImageCache(max_bytes=100)
+    cache.put("key", {"image": [np.zeros(10)]})
+    prefetcher = forest.prefetch.Prefetcher(cache=cache, max_fraction=0.5,
+                                            min_available=0)
+    load = unittest.mock.Mock()
+    for _ in range(3):
+        prefetcher._load(load, None)
+    cache.clear()
+    prefetcher._load(load, None)
+    lines = capsys.readouterr().out.splitlines()
+    assert lines == ["prefetch: skip, low on memory", "prefetch: resume"]
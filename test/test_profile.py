@@ -6,6 +6,7 @@ import numpy as np
 import numpy.testing as npt
 import datetime as dt
 import bokeh.plotting
+import forest.cache
 from forest import screen, redux, rx, config
 from forest import _profile as profile
 
@@ -224,6 +225,82 @@ def variable_surface(
     var[:] = values
 
 
+class ColumnStore:
+    """Reads columns from NetCDF in place of a point store"""
+    def __init__(self):
+        self.reads = 0
+
+    def read(self, path, variable, j, i):
+        self.reads += 1
+        with netCDF4.Dataset(path) as dataset:
+            return dataset.variables[variable][..., j, i]
+
+
+def test_profile_loader_reads_point_store(tmpdir):
+    path = str(tmpdir / "file.nc")
+    times = [dt.datetime(2019, 1, 1), dt.datetime(2019, 1, 1, 6)]
+    pressures = [1000., 500., 250.]
+    values = np.arange(2*3*3*3).reshape(2, 3, 3, 3)
+    with netCDF4.Dataset(path, "w") as dataset:
+        variable_4d(dataset, "air_temperature", times, pressures,
+                    [0, 1, 2], [0, 1, 2], values)
+    store = ColumnStore()
+    loader = profile.ProfileLoader([path], point_store=store)
+    result = loader.profile_file(path, "air_temperature", 2, 1, times[1])
+    assert store.reads == 1
+    npt.assert_array_equal(result["x"], values[1, :, 1, 2])
+    npt.assert_array_equal(result["y"], pressures)
+
+
+def test_profile_loader_reads_point_store_given_dim0(tmpdir):
+    path = str(tmpdir / "file.nc")
+    p0, p1 = 1000, 500
+    t0 = dt.datetime(2019, 1, 1)
+    t1 = dt.datetime(2019, 1, 1, 3)
+    values = np.arange(4*2*2).reshape(4, 2, 2)
+    with netCDF4.Dataset(path, "w") as dataset:
+        variable_dim0(dataset, [p0, p1, p0, p1], [t0, t0, t1, t1],
+                      [0, 1], [0, 1], values)
+    loader = profile.ProfileLoader([path], point_store=ColumnStore())
+    result = loader.profile_file(path, "relative_humidity", 1, 1, t1)
+    npt.assert_array_equal(result["x"], [values[2, 1, 1], values[3, 1, 1]])
+    npt.assert_array_equal(result["y"], [p0, p1])
+
+
+def _write_4d(path, times, values):
+    with netCDF4.Dataset(path, "w") as dataset:
+        variable_4d(dataset, "air_temperature", times, [1000., 500., 250.],
+                    [0, 90, 180, 270], [0, 1, 2], values)
+
+
+def test_profile_loader_caches_coordinates_and_points(tmpdir):
+    path = str(tmpdir / "file.nc")
+    times = [dt.datetime(2019, 1, 1), dt.datetime(2019, 1, 1, 6)]
+    values = np.arange(2*3*3*4).reshape(2, 3, 3, 4)
+    _write_4d(path, times, values)
+    cache = forest.cache.ImageCache()
+    loader = profile.ProfileLoader([path], cache=cache)
+    for _ in range(2):
+        result = loader.profile_file(path, "air_temperature", -85, 1.2,
+                                     times[0])
+        npt.assert_array_equal(result["x"], values[0, :, 1, 3])
+    assert cache.stats.hits == 2
+    assert cache.stats.entries == 2
+
+
+def test_profile_locator_valid_times_without_duplicates(tmpdir):
+    paths = [str(tmpdir / "file_20190101T0000Z_{:03d}.nc".format(i))
+             for i in range(2)]
+    t0, t1, t2 = [dt.datetime(2019, 1, 1, h) for h in (0, 6, 12)]
+    _write_4d(paths[0], [t0, t1], np.zeros((2, 3, 3, 4)))
+    _write_4d(paths[1], [t1, t2], np.zeros((2, 3, 3, 4)))
+    locator = profile.ProfileLocator(paths)
+    for _ in range(3):
+        assert locator.locate(t0, t1) == paths
+        assert locator.locate(t0, t2) == paths[1:]
+    assert locator.valid_times_to_paths[locator.key(t1)] == paths
+
+
 class TestProfile(unittest.TestCase):
     def setUp(self):
         self.path = "test-profile.nc"
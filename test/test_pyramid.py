@@ -0,0 +1,119 @@
+import sqlite3
+import numpy as np
+import numpy.testing as npt
+import netCDF4
+import forest.pyramid
+import forest.state
+from forest.drivers import unified_model
+
+
+def test_downsample_ignores_nan():
+    values = np.array([[1, np.nan, 3],
+                       [1, np.nan, 5]], dtype="f4")
+    result = forest.pyramid.downsample(values)
+    npt.assert_array_equal(result, [[1, 4]])
+
+
+def test_downsample_all_nan_block():
+    values = np.full((2, 2), np.nan)
+    result = forest.pyramid.downsample(values)
+    assert np.isnan(result).all()
+
+
+def _image(nx, ny):
+    return {
+        "x": [0.],
+        "y": [0.],
+        "dw": [float(nx)],
+        "dh": [float(ny)],
+        "image": [np.arange(nx * ny, dtype="f4").reshape(ny, nx)],
+        "units": ["K"]
+    }
+
+
+def test_pyramid_build_writes_levels(tmpdir):
+    path = str(tmpdir / "file.nc")
+    pyramid = forest.pyramid.Pyramid(str(tmpdir / "pyramid"), min_size=2)
+    pyramid.build(path, "air_temperature", (0,), _image(8, 8))
+    assert (path, "air_temperature", (0,)) in pyramid
+    assert (path, "air_temperature", (1,)) not in pyramid
+    meta = pyramid.meta(path, "air_temperature", (0,))
+    assert meta["shapes"] == [[8, 8], [4, 4], [2, 2]]
+
+
+def test_pyramid_image_without_viewport_serves_full_level(tmpdir):
+    path = str(tmpdir / "file.nc")
+    pyramid = forest.pyramid.Pyramid(str(tmpdir / "pyramid"), min_size=2)
+    pyramid.build(path, "air_temperature", (), _image(8, 8))
+    data = pyramid.image(path, "air_temperature", ())
+    assert data["image"][0].shape == (8, 8)
+    assert data["units"] == ["K"]
+
+
+def test_pyramid_image_selects_coarse_level_and_crops(tmpdir):
+    path = str(tmpdir / "file.nc")
+    pyramid = forest.pyramid.Pyramid(str(tmpdir / "pyramid"), min_size=2)
+    pyramid.build(path, "air_temperature", (), _image(8, 8))
+    viewport = forest.state.Viewport(x_range=(0, 4), y_range=(0, 8),
+                                     width=2, height=4)
+    data = pyramid.image(path, "air_temperature", (), viewport)
+    assert data["image"][0].shape == (4, 2)
+    assert data["dw"] == [4.]
+    assert data["dh"] == [8.]
+
+
+def test_pyramid_stale_after_file_modified(tmpdir):
+    path = str(tmpdir / "file.nc")
+    with open(path, "w") as stream:
+        stream.write("a")
+    pyramid = forest.pyramid.Pyramid(str(tmpdir / "pyramid"))
+    pyramid.build(path, "v", (), _image(2, 2))
+    with open(path, "w") as stream:
+        stream.write("ab")
+    assert (path, "v", ()) not in pyramid
+
+
+def test_unified_model_dataset_build_pyramids(tmpdir):
+    path = str(tmpdir / "file.nc")
+    variable = "air_temperature"
+    with netCDF4.Dataset(path, "w") as dataset:
+        dataset.createDimension("time", 2)
+        dataset.createDimension("latitude", 3)
+        dataset.createDimension("longitude", 4)
+        var = dataset.createVariable("latitude", "f", ("latitude",))
+        var[:] = [0, 1, 2]
+        var = dataset.createVariable("longitude", "f", ("longitude",))
+        var[:] = [0, 1, 2, 3]
+        var = dataset.createVariable(
+            variable, "f", ("time", "latitude", "longitude"))
+        var[:] = 1
+    assert list(unified_model.image_fields(path)) == [
+        (variable, (0,)), (variable, (1,))]
+    dataset = unified_model.Dataset(pattern=path,
+                                    pyramid_path=str(tmpdir / "pyramid"))
+    dataset.build_pyramids()
+    assert (path, variable, (1,)) in dataset.pyramid
+
+
+def test_unified_model_dataset_build_pyramids_given_database(tmpdir):
+    path = str(tmpdir / "file.nc")
+    variable = "air_temperature"
+    with netCDF4.Dataset(path, "w") as dataset:
+        dataset.createDimension("latitude", 3)
+        dataset.createDimension("longitude", 4)
+        var = dataset.createVariable("latitude", "f", ("latitude",))
+        var[:] = [0, 1, 2]
+        var = dataset.createVariable("longitude", "f", ("longitude",))
+        var[:] = [0, 1, 2, 3]
+        var = dataset.createVariable(
+            variable, "f", ("latitude", "longitude"))
+        var[:] = 1
+    database_path = str(tmpdir / "file.db")
+    sqlite3.connect(database_path).close()
+    dataset = unified_model.Dataset(pattern="*.nc",
+                                    locator="database",
+                                    directory=str(tmpdir),
+                                    database_path=database_path,
+                                    pyramid_path=str(tmpdir / "pyramid"))
+    dataset.build_pyramids()
+    assert (path, variable, ()) in dataset.pyramid
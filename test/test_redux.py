@@ -1,5 +1,15 @@
+import os
+import pytest
 import unittest.mock
 import copy
+import time
+import datetime as dt
+import numpy as np
+import forest
+import forest.state
+from forest import (
+    redux, db, colors, layers, screen, tools, presets, dimension, actions)
+from forest.components import tiles
 from forest.redux import Store
 from forest.observe import Observable
 
@@ -35,3 +45,160 @@ def test_middleware():
         unittest.mock.call(store, action()),
         unittest.mock.call(store, action()),
     ])
+
+
+def test_set_in_copies_path_only():
+    state = {"a": {"b": 1}, "c": [1, 2, 3]}
+    result = redux.set_in(state, ("a", "d"), 2)
+    assert state == {"a": {"b": 1}, "c": [1, 2, 3]}
+    assert result == {"a": {"b": 1, "d": 2}, "c": [1, 2, 3]}
+    assert result["c"] is state["c"]
+
+
+def test_merge_in_given_missing_branch():
+    result = redux.merge_in({}, ("a", "b"), {"c": 1})
+    assert result == {"a": {"b": {"c": 1}}}
+
+
+def realistic_state():
+    """State similar in size to a multi-dataset session"""
+    start = dt.datetime(2020, 1, 1)
+    state = forest.state.State().to_dict()
+    state.update({
+        "pattern": "*.nc",
+        "variable": "air_temperature",
+        "variables": ["variable_{}".format(i) for i in range(100)],
+        "initial_time": start,
+        "initial_times": [start + dt.timedelta(hours=6 * i)
+                          for i in range(500)],
+        "valid_time": start,
+        "valid_times": [start + dt.timedelta(minutes=15 * i)
+                        for i in range(5000)],
+        "pressure": 1000.,
+        "pressures": [float(p) for p in range(1000, 0, -25)],
+        "dimension": {
+            "dataset_{}".format(i): {
+                "variables": ["variable_{}".format(j) for j in range(100)]}
+            for i in range(20)},
+    })
+    return state
+
+
+ACTIONS = [
+    db.set_value("pressure", 500.),
+    colors.set_palette_name("Viridis"),
+    colors.set_user_high(100.),
+    colors.set_limits_origin("user"),
+    layers.set_figures(2),
+    layers.save_layer(0, {"label": "Model", "variable": "air_temperature"}),
+    layers.set_active(0, [0]),
+    screen.set_position(0, 0),
+    tools.on_toggle_tool("time_series", True),
+    tiles.set_tile("Open street map"),
+    presets.save_preset("default"),
+    dimension.set_variables("label", ["x"]),
+    actions.set_borders_visible(True).to_dict(),
+    actions.html_loaded().to_dict(),
+    actions.update_state({"variable": "relative_humidity"}).to_dict(),
+]
+
+
+@pytest.mark.parametrize("action", ACTIONS)
+def test_reducer_does_not_modify_state(action):
+    state = realistic_state()
+    expect = copy.deepcopy(state)
+    result = forest.reducer(state, action)
+    assert state == expect
+    assert result["valid_times"] is state["valid_times"]
+
+
+@pytest.mark.skipif("FOREST_BENCHMARK" not in os.environ,
+                    reason="timing depends on machine, set FOREST_BENCHMARK")
+def test_dispatch_benchmark():
+    """Dispatch latency should not depend on size of state"""
+    store = Store(forest.reducer, initial_state=realistic_state())
+    repeats = 20
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for action in ACTIONS:
+            store.dispatch(action)
+    seconds = (time.perf_counter() - start) / (repeats * len(ACTIONS))
+    assert seconds < 0.005
+
+
+def test_select_given_missing_key():
+    assert redux.select("a", "b", default=0)({"a": {}}) == 0
+
+
+def test_create_selector_memoises_result():
+    combiner = unittest.mock.Mock(return_value="props")
+    selector = redux.create_selector(redux.select("a"), redux.select("b"),
+                                     combiner=combiner)
+    branch = {"x": 1}
+    assert selector({"a": branch, "b": 2}) == "props"
+    assert selector({"a": branch, "b": 2, "c": 3}) == "props"
+    combiner.assert_called_once_with(branch, 2)
+
+
+def test_select_keys_omits_missing_keys():
+    selector = redux.select_keys("a", "b")
+    assert selector({"a": 1, "c": 2}) == {"a": 1}
+
+
+def test_store_subscribe_skips_unchanged_props():
+    listener = unittest.mock.Mock()
+    store = Store(forest.reducer, initial_state=realistic_state())
+    subscription = store.subscribe(redux.select_keys("borders"), listener)
+    store.dispatch(screen.set_position(0, 0))
+    store.dispatch(actions.set_borders_visible(True).to_dict())
+    store.dispatch(db.set_value("pressure", 500.))
+    store.dispatch(actions.set_borders_visible(True).to_dict())
+    assert listener.call_count == 2
+    assert subscription.renders == 2
+    assert subscription.skipped == 2
+
+
+def test_subscription_given_numpy_props():
+    listener = unittest.mock.Mock()
+    subscription = redux.Subscription(lambda state: state["x"], listener)
+    subscription({"x": np.arange(3)})
+    subscription({"x": np.arange(3)})
+    assert listener.call_count == 2
+
+
+def expand(store, action):
+    yield action
+    yield {"kind": "ACTION", "payload": {"count": len(store.state)}}
+    yield {"kind": "ACTION", "payload": {"last": True}}
+
+
+def test_sync_process_notifies_per_action():
+    listener = unittest.mock.Mock()
+    store = Store(reducer, middlewares=[expand])
+    store.add_subscriber(listener)
+    store.dispatch(action())
+    assert listener.call_count == 3
+
+
+def test_sync_process_given_batch_middleware_notifies_once():
+    listener = unittest.mock.Mock()
+    store = Store(reducer, middlewares=[redux.batch(expand), duplicate])
+    store.add_subscriber(listener)
+    store.dispatch(action())
+    expect = {"key": "value", "count": 1, "last": True}
+    listener.assert_called_once_with(expect)
+    assert store.batch_depth == 0
+
+
+def test_batch_given_class():
+    @redux.batch
+    class Middleware:
+        def __call__(self, store, action):
+            yield from expand(store, action)
+
+    listener = unittest.mock.Mock()
+    store = Store(reducer, middlewares=[Middleware()])
+    store.add_subscriber(listener)
+    store.dispatch(action())
+    store.dispatch(action())
+    assert listener.call_count == 2
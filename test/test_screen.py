@@ -56,3 +56,12 @@ def test_position_draw_mark():
     pos = {"x": 0, "y": 0}
     marker.place_marker(pos)
 
+
+
+def test_viewport_reducer():
+    action = screen.set_viewport((0, 10), (-5, 5), width=100, height=50)
+    state = screen.reducer({}, action)
+    assert state == {"viewport": {"x_range": (0, 10),
+                                  "y_range": (-5, 5),
+                                  "width": 100,
+                                  "height": 50}}
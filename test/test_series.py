@@ -1,5 +1,7 @@
 import pytest
 import unittest
+import unittest.mock
+import threading
 import os
 import netCDF4
 import cftime
@@ -7,6 +9,8 @@ import numpy as np
 import numpy.testing as npt
 import datetime as dt
 import bokeh.plotting
+import forest.cache
+import forest.disk
 from forest import screen, series, redux, rx, config
 
 
@@ -321,6 +325,102 @@ def test_4d_variable(tmpdir):
     npt.assert_array_equal(expect["y"], result["y"])
 
 
+def _surface_file(path, times, values):
+    with netCDF4.Dataset(path, "w") as dataset:
+        variable_surface(
+                dataset,
+                "air_pressure_at_sea_level",
+                times,
+                [0, 1, 2],
+                [0, 1, 2],
+                values)
+
+
+def test_series_loader_caches_points(tmpdir):
+    path = str(tmpdir / "file.nc")
+    times = [dt.datetime(2019, 1, 1), dt.datetime(2019, 1, 1, 12)]
+    values = np.arange(2*3*3).reshape(2, 3, 3)
+    _surface_file(path, times, values)
+    cache = forest.cache.ImageCache()
+    loader = series.SeriesLoader([path], cache=cache)
+    for _ in range(2):
+        result = loader._load_netcdf4(
+                path, "air_pressure_at_sea_level", 0, 1)
+        npt.assert_array_equal(result["x"], times)
+        npt.assert_array_equal(result["y"], values[:, 1, 0])
+    assert cache.stats.hits == 2
+    assert cache.stats.entries == 2
+
+
+def test_series_loader_caches_missing_variable(tmpdir):
+    path = str(tmpdir / "file.nc")
+    _surface_file(path, [dt.datetime(2019, 1, 1)], np.zeros((1, 3, 3)))
+    cache = forest.cache.ImageCache()
+    loader = series.SeriesLoader([path], cache=cache)
+    for _ in range(2):
+        result = loader._load_netcdf4(path, "not_in_file", 0, 1)
+        assert result == {"x": [], "y": []}
+    assert cache.stats.hits == 1
+
+
+def test_series_loader_reads_files_in_order(tmpdir):
+    paths = [str(tmpdir / "a.nc"), str(tmpdir / "b.nc")]
+    t0, t1 = dt.datetime(2019, 1, 1), dt.datetime(2019, 1, 1, 12)
+    _surface_file(paths[0], [t0], np.zeros((1, 3, 3)))
+    _surface_file(paths[1], [t1], np.ones((1, 3, 3)))
+    loader = series.SeriesLoader([], cache=forest.cache.ImageCache())
+    loader.locator = unittest.mock.Mock()
+    loader.locator.locate.return_value = paths
+    result = loader.series(t0, "air_pressure_at_sea_level", 0, 0)
+    assert result == {"x": [t0, t1], "y": [0, 1]}
+
+
+def test_series_loader_reads_while_holding_netcdf_lock(tmpdir):
+    path = str(tmpdir / "file.nc")
+    times = [dt.datetime(2019, 1, 1)]
+    _surface_file(path, times, np.ones((1, 3, 3)))
+    loader = series.SeriesLoader([], cache=forest.cache.ImageCache())
+    loader.locator = unittest.mock.Mock()
+    loader.locator.locate.return_value = [path]
+    results = []
+    thread = threading.Thread(target=lambda: results.append(
+        loader.series(times[0], "air_pressure_at_sea_level", 0, 0)))
+    with forest.disk.NETCDF_LOCK:
+        thread.start()
+        thread.join(timeout=0.2)
+        assert thread.is_alive()
+    thread.join(timeout=5)
+    assert results == [{"x": times, "y": [1]}]
+
+
+def test_series_loader_reads_point_store(tmpdir):
+    path = str(tmpdir / "file.nc")
+    times = [dt.datetime(2019, 1, 1), dt.datetime(2019, 1, 1, 12)]
+    _surface_file(path, times, np.zeros((2, 3, 3)))
+    store = unittest.mock.Mock()
+    store.read.return_value = np.ma.masked_array([4., 5.])
+    loader = series.SeriesLoader([path], cache=forest.cache.ImageCache(),
+                                 point_store=store)
+    result = loader._load_netcdf4(path, "air_pressure_at_sea_level", 2, 1)
+    store.read.assert_called_once_with(path, "air_pressure_at_sea_level",
+                                       1, 2)
+    npt.assert_array_equal(result["y"], [4., 5.])
+
+
+def test_disk_read_point_given_chunked_variable(tmpdir):
+    path = str(tmpdir / "file.nc")
+    values = np.arange(5*3*4).reshape(5, 3, 4)
+    with netCDF4.Dataset(path, "w") as dataset:
+        for name, size in zip(["time", "y", "x"], values.shape):
+            dataset.createDimension(name, size)
+        var = dataset.createVariable("v", "f", ("time", "y", "x"),
+                                     chunksizes=(2, 3, 2))
+        var[:] = values
+    with netCDF4.Dataset(path) as dataset:
+        result = forest.disk.read_point(dataset.variables["v"], 1, 2)
+    npt.assert_array_equal(result, values[:, 1, 2])
+
+
 @pytest.mark.parametrize("value,expect", [
     (dt.datetime(2020, 1, 1), "2020-01-01 00:00:00"),
     (cftime.DatetimeGregorian(2020, 1, 1), "2020-01-01 00:00:00")
@@ -1,4 +1,6 @@
+import threading
 from unittest.mock import Mock, sentinel
+import forest.disk
 import forest.services
 
 
@@ -26,3 +28,69 @@ def test_null_navigator():
     assert navigator.initial_times(pattern, variable) == []
     assert navigator.valid_times(pattern, variable, initial_time) == []
     assert navigator.pressures(pattern, variable, initial_time) == []
+
+
+def test_data_service_shares_answers():
+    service = forest.services.DataService(ttl=60)
+    compute = Mock(return_value=sentinel.value)
+    assert service.call("key", compute) == sentinel.value
+    assert service.call("key", compute) == sentinel.value
+    compute.assert_called_once_with()
+    assert (service.hits, service.misses) == (1, 1)
+
+
+def test_data_service_invalidate():
+    service = forest.services.DataService(ttl=60)
+    compute = Mock(return_value=sentinel.value)
+    service.call("key", compute)
+    service.invalidate()
+    service.call("key", compute)
+    assert compute.call_count == 2
+
+
+def test_data_service_expires_entries():
+    service = forest.services.DataService(ttl=0)
+    compute = Mock(return_value=sentinel.value)
+    service.call("key", compute)
+    service.call("key", compute)
+    assert compute.call_count == 2
+
+
+def test_shared_navigator_shares_between_sessions():
+    service = forest.services.DataService(ttl=60)
+    first = Mock()
+    first.valid_times.return_value = sentinel.times
+    second = Mock()
+    shared = [service.navigator("dataset", navigator)
+              for navigator in (first, second)]
+    for navigator in shared:
+        result = navigator.valid_times("*.nc", "air", initial_time="2020")
+        assert result == sentinel.times
+    first.valid_times.assert_called_once_with("*.nc", "air",
+                                              initial_time="2020")
+    second.valid_times.assert_not_called()
+
+
+def test_shared_navigator_given_unhashable_arguments():
+    service = forest.services.DataService(ttl=60)
+    navigator = Mock()
+    shared = service.navigator("dataset", navigator)
+    shared.pressures("*.nc", ["air"])
+    shared.pressures("*.nc", ["air"])
+    assert navigator.pressures.call_count == 2
+
+
+def test_shared_navigator_holds_netcdf_lock():
+    service = forest.services.DataService(ttl=60)
+    navigator = Mock()
+    navigator.variables.return_value = ["air"]
+    shared = service.navigator("dataset", navigator)
+    results = []
+    thread = threading.Thread(target=lambda: results.append(
+        shared.variables("*.nc")))
+    with forest.disk.NETCDF_LOCK:
+        thread.start()
+        thread.join(timeout=0.2)
+        assert thread.is_alive()
+    thread.join(timeout=5)
+    assert results == [["air"]]
@@ -0,0 +1,89 @@
+import os
+import datetime as dt
+import forest.util
+import forest.watch
+
+
+def touch(path):
+    with open(path, "w"):
+        pass
+
+
+def test_watcher_first_poll_reports_existing_files(tmpdir):
+    touch(str(tmpdir / "a.nc"))
+    watcher = forest.watch.Watcher([str(tmpdir)], use_inotify=False)
+    assert watcher.poll() == [str(tmpdir / "a.nc")]
+
+
+def test_watcher_reports_new_files_only(tmpdir):
+    touch(str(tmpdir / "a.nc"))
+    watcher = forest.watch.Watcher([str(tmpdir)], use_inotify=False)
+    calls = []
+    watcher.add_subscriber(calls.append)
+    watcher.poll()
+    touch(str(tmpdir / "b.nc"))
+    os.utime(str(tmpdir), ns=(10 ** 9, 10 ** 9))  # Ensure mtime changes
+    assert watcher.poll() == [str(tmpdir / "b.nc")]
+    assert calls == [[str(tmpdir / "a.nc")], [str(tmpdir / "b.nc")]]
+
+
+def test_watcher_skips_unchanged_directories(tmpdir, monkeypatch):
+    watcher = forest.watch.Watcher([str(tmpdir)], use_inotify=False)
+    watcher.poll()
+    listdir_calls = []
+    monkeypatch.setattr(os, "listdir",
+                        lambda path: listdir_calls.append(path) or [])
+    assert watcher.poll() == []
+    assert listdir_calls == []
+
+
+def test_directories(tmpdir):
+    os.makedirs(str(tmpdir / "run_1"))
+    os.makedirs(str(tmpdir / "run_2"))
+    pattern = str(tmpdir / "run_*" / "*.nc")
+    assert forest.watch.directories(pattern) == [
+        str(tmpdir / "run_1"), str(tmpdir / "run_2")]
+
+
+def test_invalidate_caches_given_matching_path(tmpdir):
+    calls = []
+
+    @forest.util.timeout_cache(dt.timedelta(hours=1))
+    def find(pattern):
+        calls.append(pattern)
+        return []
+
+    pattern = str(tmpdir / "*.nc")
+    find(pattern)
+    find(pattern)
+    forest.util.invalidate_caches(str(tmpdir / "other.json"))
+    find(pattern)
+    forest.util.invalidate_caches(str(tmpdir / "file.nc"))
+    find(pattern)
+    assert calls == [pattern, pattern]
+
+
+def test_watcher_reports_overwritten_files(tmpdir):
+    path = str(tmpdir / "a.nc")
+    touch(path)
+    watcher = forest.watch.Watcher([str(tmpdir)], use_inotify=False)
+    watcher.poll()
+    with open(path, "w") as stream:
+        stream.write("new contents")
+    os.utime(path, ns=(10 ** 9, 10 ** 9))
+    assert watcher.poll() == [path]
+    assert watcher.poll() == []
+
+
+def test_watcher_watches_new_directories(tmpdir):
+    pattern = str(tmpdir / "run_*" / "*.nc")
+    os.makedirs(str(tmpdir / "run_1"))
+    watcher = forest.watch.Watcher(
+        lambda: forest.watch.directories(pattern),
+        use_inotify=False, expand_interval=0)
+    assert watcher.poll() == []
+    os.makedirs(str(tmpdir / "run_2"))
+    touch(str(tmpdir / "run_2" / "a.nc"))
+    assert watcher.poll() == [str(tmpdir / "run_2" / "a.nc")]
+    assert watcher.directories == [str(tmpdir / "run_1"),
+                                   str(tmpdir / "run_2")]